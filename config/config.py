@@ -20,6 +20,25 @@ class GlobalConfig:
         ORDER_CHECK_INTERVAL = 5.0         # 主动检查间隔（秒）
         ORDER_WATCH_TIMEOUT = 30.0         # 订单监听超时时间（秒）
 
+    # ========== 数据流看门狗配置 ==========
+    class StreamWatchdogConfig:
+        """
+        各websocket数据流（订单簿、订单、持仓、余额、K线）的静默检测和单独重新订阅配置
+        """
+        ENABLED = True                      # 是否启用数据流看门狗
+        CHECK_INTERVAL = 1.0                # 检查间隔（秒）
+        # 持续推送的数据流：静默超过平均消息间隔的倍数判定停滞，判定阈值限制在[最小, 最大]之间
+        STALL_MULTIPLIER = 20.0             # 平均消息间隔的倍数
+        MIN_RATE_SAMPLES = 10               # 使用平均间隔前需要的最少消息数，不足时使用最大阈值
+        BOOK_STALL_MIN = 5.0                # 订单簿停滞阈值下限（秒）
+        BOOK_STALL_MAX = 30.0               # 订单簿停滞阈值上限（秒）
+        OHLCV_STALL_MIN = 30.0              # K线停滞阈值下限（秒）
+        OHLCV_STALL_MAX = 180.0             # K线停滞阈值上限（秒）
+        # 事件驱动的私有数据流：下单、改单、撤单、成交后在该时间内应收到推送
+        EVENT_ACK_TIMEOUT = 10.0            # 订单、持仓、余额推送的等待时间（秒）
+        RESUBSCRIBE_TIMEOUT = 10.0          # 重新订阅后等待消息的时间，超时再次重新订阅（秒）
+        FULL_RESYNC_AFTER = 3               # 同一数据流连续重新订阅失败该次数后才执行全量恢复
+
     # ========== 交易管理器配置 ==========
     class TradeConfig:
         """
@@ -31,6 +50,9 @@ class GlobalConfig:
         # 订单状态监控和恢复机制
         NO_ORDER_TIMEOUT = 60.0            # 无订单超时时间（秒）
         ORDER_CHECK_INTERVAL = 30.0        # 订单检查间隔（秒）
+        ORDER_SWEEP_INTERVAL = 30.0        # 账户级挂单巡检间隔（秒），所有交易对共用一次fetchOpenOrders
+        ORDER_SWEEP_PAGE_SIZE = 100        # 账户级挂单巡检每页订单数（Bitget单页上限100）
+        ORDER_SWEEP_MAX_PAGES = 10         # 账户级挂单巡检最多翻页次数，取满时视为结果可能被截断
 
         # 默认交易参数（可被symbols.json中的配置覆盖）
         DEFAULT_BASE_SPREAD = 0.001         # 默认基础价差
@@ -43,21 +65,38 @@ class GlobalConfig:
         # 默认交易方向：'long'(只做多), 'short'(只做空), 'both'(双向)
         DEFAULT_DIRECTION = 'both'
 
+        # 默认多档报价阶梯参数（可被symbols.json中的ladderLevels等配置覆盖）
+        DEFAULT_LADDER_LEVELS = 1           # 每个方向每种意图的挂单档数
+        DEFAULT_LADDER_SPACING = 0.0005     # 相邻档位的相对价格间距（0.05%）
+        DEFAULT_LADDER_SIZE_MULTIPLIER = 1.0  # 相邻档位的数量倍数
+        DEFAULT_LADDER_TOLERANCE = 0.0002   # 档位价格容差，目标价偏离挂单价不超过此比例时保持不动
+
         # 交易风控参数
         MIN_ORDER_VALUE = 5.5               # 最小订单价值（USDT）
-        PRICE_DEVIATION_FACTOR = 0.5        # 价格偏差阈值系数（相对于基础价差）
+        PRICE_DEVIATION_FACTOR = 0.5        # 价格偏差阈值系数（相对于当前单边价差），基准价偏离超过此范围时刷新报价
+
+        # 报价刷新限制
+        REQUOTE_MIN_LIFETIME = 1.0          # 报价最短存活时间（秒），期间不因价格偏离刷新
+        REQUOTE_MAX_PER_MINUTE = 30         # 每个交易对每分钟因价格偏离刷新报价的次数上限
+        REQUOTE_BURST = 3                   # 刷新次数的突发容量
 
         # 订单数量动态调整开关
         DYNAMIC_ORDER_AMOUNT = False          # 是否启用动态订单数量调整
 
         # ========== 价差模式配置 ==========
-        # 价差模式：'fixed'(固定价差), 'dynamic'(AS模型动态价差), 'hybrid'(混合模式)
+        # 价差模式：'fixed'(固定价差), 'dynamic'(AS模型动态价差), 'hybrid'(混合模式), 'glft'(GLFT闭式最优报价)
         SPREAD_MODE = 'fixed'                # 默认使用固定价差模式
 
         # 混合模式阈值配置
         INVENTORY_SAFE_THRESHOLD = 0.4       # 安全库存阈值（低于此值使用固定价差）
         INVENTORY_RISK_THRESHOLD = 0.7       # 风险库存阈值（高于此值使用动态价差）
 
+        # GLFT模式参数（价格距离均为相对中间价的比例，库存以下单数量为单位）
+        GLFT_GAMMA = 500.0                   # 风险厌恶系数
+        GLFT_A = 1.0                         # 成交强度参数A（距中间价为0处每秒成交次数）
+        GLFT_K = 5000.0                      # 成交强度随相对距离的衰减系数k
+        GLFT_DEFAULT_SIGMA = 6e-5            # 没有波动率数据时使用的每秒相对波动率
+
         # 成本价保护配置
         ENABLE_COST_PROTECTION = True        # 是否启用成本价保护
         MAX_LOSS_RATIO = 0.001              # 最大允许亏损比例（0.1%）
@@ -90,6 +129,32 @@ class GlobalConfig:
         VOLATILITY_SMOOTHING = True         # 是否启用波动率平滑
         SMOOTHING_FACTOR = 0.1              # 平滑因子（用于指数移动平均）
 
+        # 波动率来源：'atr'(K线ATR), 'ewma'(中间价收益率EWMA), 'parkinson'/'garman_klass'(微型K线区间估计)
+        # 非atr来源直接使用盘口中间价计算，不订阅K线
+        VOLATILITY_SOURCE = 'atr'
+        EWMA_HALF_LIFE = 60                 # EWMA方差的半衰期（秒）
+        MICRO_BAR_SECONDS = 5               # 区间估计使用的微型K线时长（秒）
+        RANGE_WINDOW = 24                   # 区间估计的滚动窗口K线数量
+        TICK_UPDATE_INTERVAL = 1.0          # 逐笔估计更新价差参数的最小间隔（秒）
+        MIN_TICK_SAMPLES = 20               # 逐笔估计开始生效所需的最少样本数
+
+    # ========== 成交强度校准配置 ==========
+    class IntensityConfig:
+        """
+        成交强度参数A、k的流式校准配置
+        λ(δ) = A·exp(-k·δ)，δ为成交价距中间价的相对距离
+        """
+        ENABLED = True                      # 是否启用成交强度校准（仅GLFT模式下运行）
+        BUCKET_COUNT = 20                   # 距离直方图桶数量
+        BUCKET_WIDTH = 0.0001               # 每个桶的相对距离宽度（0.01%）
+        HALF_LIFE = 900                     # 成交计数指数衰减的半衰期（秒）
+        PUBLISH_INTERVAL = 30               # 发布新参数的间隔（秒）
+        MIN_WEIGHT = 50                     # 发布前需要的最小衰减成交计数
+        MIN_BUCKETS = 3                     # 拟合需要的最少非空桶数量
+        OWN_FILL_WEIGHT = 1.0               # 自身成交的额外权重（自身成交也会出现在公共成交流中）
+        MIN_K = 100.0                       # k的下限，防止拟合结果退化
+        MAX_K = 100000.0                    # k的上限
+
     # ========== 数据记录器配置 ==========
     class DataRecorderConfig:
         """
@@ -99,6 +164,12 @@ class GlobalConfig:
         RECORD_INTERVAL = 60                # 数据记录间隔（秒）
         MAX_CACHE_SIZE = 1000              # 最大缓存大小
         AUTO_FLUSH_INTERVAL = 300          # 自动刷新间隔（秒）
+        AGGREGATE_BUCKET_SECONDS = 60      # 价格聚合时间桶长度（秒）
+
+        # 数据更新事件总线配置
+        EVENT_QUEUE_SIZE = 1000            # 每个订阅者的队列长度
+        # 队列满时的处理策略：'drop_oldest'(丢弃最旧), 'conflate'(同一交易对只保留最新), 'block'(等待)
+        EVENT_OVERFLOW_POLICY = 'conflate'
 
     # ========== 图表管理器配置 ==========
     class ChartConfig:
@@ -111,6 +182,10 @@ class GlobalConfig:
         CHART_WIDTH = 1200                 # 图表宽度
         CHART_HEIGHT = 600                 # 图表高度
 
+        # 图表渲染进程配置
+        CHART_DPI = 300                    # 图表输出分辨率
+        RENDER_TIMEOUT = 120.0             # 单次渲染超时时间（秒）
+
     # ========== 网络和重试配置 ==========
     class NetworkConfig:
         """
@@ -126,6 +201,11 @@ class GlobalConfig:
         WS_RECONNECT_DELAY = 5.0          # WebSocket重连延迟（秒）
         WS_MAX_RECONNECT_ATTEMPTS = 10    # WebSocket最大重连次数
 
+        # 网络错误恢复（networkHelper）重试配置
+        RECOVERY_BACKOFF_BASE = 0.05      # 初始退避时间（秒），每次失败翻倍
+        RECOVERY_BACKOFF_MAX = 5.0        # 退避时间上限（秒）
+        RECOVERY_BACKOFF_JITTER = 0.5     # 抖动比例，实际等待在[(1-抖动)×退避, 退避]之间随机
+
     # ========== 日志配置 ==========
     class LogConfig:
         """
@@ -155,6 +235,9 @@ class GlobalConfig:
         MAX_MEMORY_USAGE = 512 * 1024 * 1024  # 最大内存使用量（字节）
         GC_THRESHOLD = 100                 # 垃圾回收阈值
 
+        # 启动配置
+        IMPORT_BUDGET_MS = 1500            # main模块导入耗时预算（毫秒），见util/import_budget.py
+
     # ========== 安全配置 ==========
     class SecurityConfig:
         """
@@ -162,12 +245,32 @@ class GlobalConfig:
         """
         # API安全配置
         API_RATE_LIMIT = 100               # API调用频率限制（次/分钟）
-        MAX_POSITION_SIZE = 1000000        # 最大持仓大小限制
-        MAX_ORDER_SIZE = 100000            # 最大订单大小限制
+        MAX_POSITION_SIZE = 1000000        # 最大持仓大小限制（单个交易对单方向的名义价值，计价币种）
+        MAX_ORDER_SIZE = 100000            # 最大订单大小限制（单笔订单名义价值，计价币种）
 
         # 风险控制配置
-        DAILY_LOSS_LIMIT = 0.05            # 日损失限制（比例）
-        MAX_DRAWDOWN_LIMIT = 0.10          # 最大回撤限制（比例）
+        DAILY_LOSS_LIMIT = 0.05            # 日损失限制（比例，相对UTC日初权益）
+        MAX_DRAWDOWN_LIMIT = 0.10          # 最大回撤限制（比例，相对权益峰值）
+        RISK_GATE_ENABLED = True           # 是否在下单前执行风控闸门检查（core/riskGate.py）
+        RISK_CANCEL_TIMEOUT = 2.0          # 风控熔断后撤销所有交易对挂单的时限（秒）
+
+    # ========== 成交历史工具配置 ==========
+    class TradeHistoryConfig:
+        """
+        成交历史下载相关配置（fees.py等离线工具使用）
+        """
+        FETCH_PAGE_LIMIT = 100             # 每页获取的成交记录数
+        FETCH_WINDOW_HOURS = 24            # 长时间范围拆分后的单个窗口长度（小时）
+        FETCH_MAX_CONCURRENCY = 8          # 同时进行的窗口请求数量上限
+        CACHE_DIR = 'cache/trades'         # 本地成交历史缓存目录
+
+    # ========== 市场信息缓存配置 ==========
+    class MarketCacheConfig:
+        """
+        市场信息（精度、下单限制等）磁盘缓存配置
+        """
+        CACHE_DIR = 'cache/markets'        # 市场信息缓存目录
+        TTL = 6 * 3600                     # 缓存有效期（秒），过期后仍先使用旧缓存并在后台刷新
 
 
 # 配置实例
@@ -181,6 +284,11 @@ def get_websocket_config():
     return config.WebSocketConfig
 
 
+def get_stream_watchdog_config():
+    """获取数据流看门狗配置"""
+    return config.StreamWatchdogConfig
+
+
 def get_trade_config():
     """获取交易配置"""
     return config.TradeConfig
@@ -221,6 +329,21 @@ def get_volatility_config():
     return config.VolatilityConfig
 
 
+def get_intensity_config():
+    """获取成交强度校准配置"""
+    return config.IntensityConfig
+
+
+def get_trade_history_config():
+    """获取成交历史工具配置"""
+    return config.TradeHistoryConfig
+
+
+def get_market_cache_config():
+    """获取市场信息缓存配置"""
+    return config.MarketCacheConfig
+
+
 # 配置验证函数
 def validate_config():
     """
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict
+from util.sLogger import logger
+
+
+class BootstrapContext:
+    """
+    启动阶段的共享上下文
+
+    所有交易对使用同一个账户，持仓模式、余额、全部挂单、全部持仓这类账户级请求
+    只需要执行一次：第一个交易对发起请求，其余交易对等待同一个任务的结果。
+    同时记录每个交易对各启动阶段的耗时。
+    """
+
+    def __init__(self, symbol_count: int):
+        self.symbol_count = symbol_count
+        self.start_time = time.monotonic()
+        self._shared: Dict[str, asyncio.Task] = {}
+        self.phase_times: Dict[str, Dict[str, float]] = {}
+        self.ready_times: Dict[str, float] = {}
+        self.failed_symbols = set()
+        self.completed = False
+
+    async def shared(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行一次账户级请求并共享结果
+
+        Args:
+            name: 请求名称，同名请求只执行一次
+            factory: 返回协程的函数，只有第一个调用者会执行
+        """
+        task = self._shared.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._timed('账户', name, factory()))
+            self._shared[name] = task
+        try:
+            # shield避免某个交易对任务被取消时连带取消共享请求
+            return await asyncio.shield(task)
+        except Exception:
+            # 失败的请求不缓存，后续调用者可以重新发起
+            if self._shared.get(name) is task:
+                del self._shared[name]
+            raise
+
+    async def timed(self, symbol: str, phase: str, awaitable: Awaitable[Any]) -> Any:
+        """执行一个启动阶段并记录耗时"""
+        return await self._timed(symbol, phase, awaitable)
+
+    async def _timed(self, owner: str, phase: str, awaitable: Awaitable[Any]) -> Any:
+        start = time.monotonic()
+        try:
+            return await awaitable
+        finally:
+            elapsed = time.monotonic() - start
+            self.phase_times.setdefault(owner, {})[phase] = elapsed
+
+    # ========== 账户级请求 ==========
+
+    async def ensure_position_mode(self, exchange, symbol: str):
+        """设置双向持仓模式，整个账户只设置一次"""
+        return await self.shared('持仓模式', lambda: exchange.set_position_mode(
+            True, symbol, {'productType': 'USDT-FUTURES'}))
+
+    async def fetch_balance(self, exchange):
+        return await self.shared('余额', lambda: exchange.fetchBalance())
+
+    async def fetch_open_orders(self, exchange):
+        return await self.shared('挂单', lambda: exchange.fetchOpenOrders())
+
+    async def fetch_positions(self, exchange):
+        return await self.shared('持仓', lambda: exchange.fetchPositions())
+
+    # ========== 阶段统计 ==========
+
+    def mark_ready(self, symbol: str):
+        """标记交易对已开始挂单，所有交易对就绪后输出汇总并释放共享数据"""
+        self.ready_times[symbol] = time.monotonic() - self.start_time
+        phases = self.phase_times.get(symbol, {})
+        detail = ', '.join(f"{phase} {elapsed * 1000:.0f}ms" for phase, elapsed in phases.items())
+        logger.info(f"交易对 {symbol} 启动完成，距启动 {self.ready_times[symbol]:.2f}秒，阶段耗时: {detail}")
+        self._check_complete()
+
+    def mark_failed(self, symbol: str):
+        """标记交易对启动失败"""
+        self.failed_symbols.add(symbol)
+        self._check_complete()
+
+    def _check_complete(self):
+        if not self.completed and len(self.ready_times) + len(self.failed_symbols) >= self.symbol_count:
+            self.completed = True
+            self.log_summary()
+            # 启动完成后不再复用启动时的快照数据
+            self._shared.clear()
+
+    def log_summary(self):
+        account_phases = self.phase_times.get('账户', {})
+        detail = ', '.join(f"{phase} {elapsed * 1000:.0f}ms" for phase, elapsed in account_phases.items())
+        logger.info(f"账户级请求耗时: {detail}")
+        if self.ready_times:
+            first = min(self.ready_times.values())
+            last = max(self.ready_times.values())
+            logger.info(f"{len(self.ready_times)}个交易对启动完成，首个就绪 {first:.2f}秒，全部就绪 {last:.2f}秒")
+        if self.failed_symbols:
+            logger.warning(f"启动失败的交易对: {sorted(self.failed_symbols)}")
+
+    def get_summary(self) -> Dict[str, Any]:
+        return {
+            'phase_times': {owner: dict(phases) for owner, phases in self.phase_times.items()},
+            'ready_times': dict(self.ready_times),
+        }
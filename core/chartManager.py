@@ -1,126 +1,126 @@
-import matplotlib
-matplotlib.use('Agg')  # 设置为非交互式后端
-import matplotlib.pyplot as plt
-from matplotlib.dates import DateFormatter
-import numpy as np
 from datetime import datetime
 import os
+import time
 import asyncio
-from typing import Dict, List
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from core.dataRecorder import data_recorder
+from core import chartRenderer
 from util.sLogger import logger
+from config.config import get_chart_config
 
 class ChartManager:
-    """图表生成器 - 支持定期生成运行中图表和最终图表"""
-    
+    """图表生成器 - 支持定期生成运行中图表和最终图表
+
+    matplotlib绘图在独立的工作进程中执行，交易事件循环只负责生成数组快照并等待结果，
+    同一时间最多只有一个渲染任务在执行。
+    """
+
     def __init__(self):
-        # 设置matplotlib中文字体
-        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
-        plt.rcParams['axes.unicode_minus'] = False
-        
         # 定期图表生成相关变量
         self.periodic_task = None
         self.is_running = False
-        
+
+        # 渲染进程相关变量
+        self.config = get_chart_config()
+        self._executor = None
+        self._render_task = None        # 当前正在执行的渲染任务
+        self.last_render_time = None    # 最近一次渲染耗时（秒）
+        self.skipped_renders = 0        # 因已有渲染任务而跳过的次数
+
         logger.info("图表生成器初始化完成")
-    
-    def generate_final_charts(self, output_dir="img"):
+
+    def _get_executor(self):
+        """获取渲染进程池（单进程，首次使用时创建）"""
+        if self._executor is None:
+            # 使用spawn避免在带有事件循环和网络线程的进程中fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    async def _render(self, chart_path: str, title: str) -> bool:
+        """
+        生成数据快照并提交到渲染进程
+
+        Returns:
+            是否成功生成图表
+        """
+        if self._render_task and not self._render_task.done():
+            self.skipped_renders += 1
+            logger.info(f"已有图表正在渲染，跳过本次渲染请求（累计跳过{self.skipped_renders}次）")
+            return False
+
+        snapshot = data_recorder.get_chart_snapshot(self.config.MAX_DATA_POINTS)
+        if not len(snapshot['account']['timestamps']) and not snapshot['prices']['symbols']:
+            logger.warning("没有数据可用于生成图表")
+            return False
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        future = loop.run_in_executor(
+            self._get_executor(), chartRenderer.render_report,
+            snapshot, chart_path, title, self.config.CHART_DPI)
+        self._render_task = asyncio.ensure_future(future)
+        try:
+            # shield避免调用方被取消时打断进程中的渲染
+            render_time = await asyncio.wait_for(
+                asyncio.shield(self._render_task), timeout=self.config.RENDER_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"图表渲染超时({self.config.RENDER_TIMEOUT}秒): {chart_path}")
+            return False
+
+        self.last_render_time = render_time
+        total_time = time.perf_counter() - start
+        logger.info(f"图表已保存: {chart_path}，渲染耗时{render_time*1000:.0f}ms，总耗时{total_time*1000:.0f}ms")
+        return True
+
+    async def generate_final_charts(self, output_dir="img"):
         """生成最终的综合图表"""
         try:
             # 创建输出目录
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
                 logger.info(f"创建图表输出目录: {output_dir}")
-            
-            # 获取数据
-            account_data = data_recorder.get_account_data()
-            price_data = data_recorder.get_price_data()
-            summary = data_recorder.get_summary()
-            
-            if not account_data['timestamps'] and not price_data['symbols']:
-                 logger.warning("没有数据可用于生成图表")
-                 return
-            
-            # 创建2x2的子图布局
-            fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-            fig.suptitle('GLFT网格交易运行报告', fontsize=16, fontweight='bold')
-            
-            # 生成各个图表
-            self._plot_equity_chart(axes[0, 0], account_data, summary)
-            self._plot_price_changes_chart(axes[0, 1], price_data)
-            self._plot_combined_chart(axes[1, 0], account_data, price_data, summary)
-            self._plot_volume_chart(axes[1, 1], summary)
-            
-            # 调整布局
-            plt.tight_layout()
-            
-            # 保存图表
+
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = os.path.join(output_dir, f'trading_report_{timestamp}.png')
-            fig.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
-            
-            logger.info(f"交易报告图表已保存: {filename}")
-            
+            await self._render(filename, 'GLFT网格交易运行报告')
+
         except Exception as e:
             logger.error(f"生成图表时出错: {e}")
-    
-    def generate_runtime_charts(self, output_dir="img"):
+
+    async def generate_runtime_charts(self, output_dir="img"):
         """生成运行中图表（固定文件名，会覆盖旧文件）"""
         try:
             # 创建输出目录
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
-            
-            # 获取数据
-            account_data = data_recorder.get_account_data()
-            price_data = data_recorder.get_price_data()
-            summary = data_recorder.get_summary()
-            
-            if not account_data['timestamps'] and not price_data['symbols']:
-                logger.warning("没有数据可用于生成运行中图表")
-                return
-            
-            # 创建2x2的子图布局
-            fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
-            fig.suptitle('交易运行中报告', fontsize=16, fontweight='bold')
-            
-            # 绘制各个图表
-            self._plot_equity_chart(ax1, account_data, summary)
-            self._plot_price_changes_chart(ax2, price_data)
-            self._plot_combined_chart(ax3, account_data, price_data, summary)
-            self._plot_volume_chart(ax4, summary)
-            
-            # 调整布局并保存
-            plt.tight_layout()
+
             chart_path = os.path.join(output_dir, "runtime_report.png")
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            logger.info(f"运行中图表已更新: {chart_path}")
+            await self._render(chart_path, '交易运行中报告')
         except Exception as e:
             logger.error(f"生成运行中图表时出错: {e}")
-    
+
     async def _periodic_chart_generation(self):
         """定期生成运行中图表的异步任务"""
         # 启动时立即生成一次运行中图表
         try:
-            self.generate_runtime_charts()
+            await self.generate_runtime_charts()
         except Exception as e:
             logger.error(f"初始运行中图表生成失败: {e}")
-        
+
         while self.is_running:
             try:
                 await asyncio.sleep(300)  # 等待5分钟（300秒）
                 if self.is_running:  # 再次检查是否仍在运行
-                    self.generate_runtime_charts()
+                    await self.generate_runtime_charts()
             except asyncio.CancelledError:
                 logger.info("定期图表生成任务已取消")
                 break
             except Exception as e:
                 logger.error(f"定期图表生成任务出错: {e}")
                 await asyncio.sleep(60)  # 出错后等待1分钟再重试
-    
+
     def start_charts(self):
         """启动定期图表生成任务"""
         if not self.is_running:
@@ -131,127 +131,36 @@ class ChartManager:
             logger.info("定期图表生成任务已启动，每5分钟更新一次运行中图表")
         else:
             logger.warning("图表生成任务已在运行中")
-    
-    def stop_charts(self):
+
+    async def stop_charts(self):
         """停止定期图表生成任务并生成最终图表"""
         self.is_running = False
-        
+
         # 取消定期任务
         if self.periodic_task and not self.periodic_task.done():
             self.periodic_task.cancel()
             logger.info("定期图表生成任务已停止")
-        
+
+        # 等待正在进行的渲染完成，再生成最终图表
+        if self._render_task and not self._render_task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._render_task), timeout=self.config.RENDER_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"等待运行中图表渲染结束时出错: {e}")
+
         # 生成最终图表
         logger.info("生成最终交易报告...")
-        self.generate_final_charts()
-    
-    def _plot_equity_chart(self, ax, account_data, summary):
-        """绘制账户权益变化图表"""
-        ax.set_title('账户权益变化', fontsize=12, fontweight='bold')
-        ax.set_xlabel('时间')
-        ax.set_ylabel('USDT权益')
-        ax.grid(True, alpha=0.3)
-        
-        if account_data['timestamps']:
-            times = [datetime.fromtimestamp(ts) for ts in account_data['timestamps']]
-            ax.plot(times, account_data['equity'], 'b-', linewidth=2, label='权益')
-            
-            # 添加统计信息
-            initial_equity = summary.get('initial_equity', 0)
-            current_equity = account_data['equity'][-1] if account_data['equity'] else 0
-            change = current_equity - initial_equity
-            change_pct = (change / initial_equity * 100) if initial_equity > 0 else 0
-            
-            info_text = f'初始权益: {initial_equity:.2f} USDT\n当前权益: {current_equity:.2f} USDT\n变化: {change:+.2f} USDT ({change_pct:+.2f}%)'
-            ax.text(0.02, 0.98, info_text, transform=ax.transAxes, verticalalignment='top',
-                   bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
-        
-        ax.legend()
-        
-    def _plot_price_changes_chart(self, ax, price_data):
-        """绘制交易对价格变化百分比图表"""
-        ax.set_title('交易对价格变化 (%)', fontsize=12, fontweight='bold')
-        ax.set_xlabel('时间')
-        ax.set_ylabel('价格变化百分比 (%)')
-        ax.grid(True, alpha=0.3)
-        
-        colors = ['red', 'green', 'blue', 'orange', 'purple', 'brown', 'pink', 'gray']
-        
-        for i, symbol in enumerate(price_data['symbols']):
-             if symbol in price_data['timestamps'] and price_data['timestamps'][symbol]:
-                 times = [datetime.fromtimestamp(ts) for ts in price_data['timestamps'][symbol]]
-                 price_changes = price_data['price_changes_percent'][symbol]
-                 color = colors[i % len(colors)]
-                 ax.plot(times, price_changes, color=color, linewidth=2, label=symbol)
-        
-        ax.legend()
-        ax.axhline(y=0, color='black', linestyle='--', alpha=0.5)
-        
-    def _plot_combined_chart(self, ax, account_data, price_data, summary):
-        """绘制权益和价格变化合并图表"""
-        ax.set_title('权益与价格变化对比 (%)', fontsize=12, fontweight='bold')
-        ax.set_xlabel('时间')
-        ax.set_ylabel('变化百分比 (%)')
-        ax.grid(True, alpha=0.3)
-        
-        # 绘制权益变化百分比
-        if account_data['timestamps']:
-            initial_equity = summary.get('initial_equity', 0)
-            if initial_equity > 0:
-                times = [datetime.fromtimestamp(ts) for ts in account_data['timestamps']]
-                equity_pct = [(eq - initial_equity) / initial_equity * 100 for eq in account_data['equity']]
-                ax.plot(times, equity_pct, 'b-', linewidth=3, label='权益变化', alpha=0.8)
-        
-        # 绘制价格变化百分比
-        colors = ['red', 'green', 'orange', 'purple', 'brown']
-        for i, symbol in enumerate(price_data['symbols']):
-            if symbol in price_data['timestamps'] and price_data['timestamps'][symbol]:
-                times = [datetime.fromtimestamp(ts) for ts in price_data['timestamps'][symbol]]
-                price_changes = price_data['price_changes_percent'][symbol]
-                color = colors[i % len(colors)]
-                ax.plot(times, price_changes, color=color, linewidth=2, 
-                       label=f'{symbol}价格', alpha=0.7, linestyle='--')
-        
-        ax.legend()
-        ax.axhline(y=0, color='black', linestyle='--', alpha=0.5)
-        
-    def _plot_volume_chart(self, ax, summary):
-        """绘制交易额统计图表"""
-        ax.set_title('交易额统计', fontsize=12, fontweight='bold')
-        
-        # 显示总体统计
-        total_volume = summary.get('total_volume', 0)
-        total_trades = summary.get('total_trades', 0)
-        total_fees = summary.get('total_fees', 0)
-        
-        # 创建简单的统计显示
-        stats = [
-            f'总交易次数: {total_trades}',
-            f'总交易额: {total_volume:.2f} USDT',
-            f'总手续费: {total_fees:.2f} USDT',
-            f'平均每笔: {total_volume/total_trades:.2f} USDT' if total_trades > 0 else '平均每笔: 0 USDT'
-        ]
-        
-        # 移除坐标轴
-        ax.set_xticks([])
-        ax.set_yticks([])
-        ax.spines['top'].set_visible(False)
-        ax.spines['right'].set_visible(False)
-        ax.spines['bottom'].set_visible(False)
-        ax.spines['left'].set_visible(False)
-        
-        # 显示统计信息
-        stats_text = '\n'.join(stats)
-        ax.text(0.5, 0.5, stats_text, transform=ax.transAxes, 
-               horizontalalignment='center', verticalalignment='center',
-               fontsize=14, bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
-    
+        await self.generate_final_charts()
+
+        # 关闭渲染进程
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
 
-    
-    def save_chart(self, filename=None):
+    async def save_chart(self, filename=None):
         """兼容性方法 - 现在通过generate_final_charts生成图表"""
         logger.info("请使用generate_final_charts方法生成最终报告")
-        self.generate_final_charts()
+        await self.generate_final_charts()
 
 # 全局图表管理器实例
-chart_manager = ChartManager()
\ No newline at end of file
+chart_manager = ChartManager()
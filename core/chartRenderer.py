@@ -0,0 +1,169 @@
+"""
+图表渲染模块 - 在独立的工作进程中运行
+
+ChartManager通过进程池调用render_report，本模块只依赖传入的数组快照，
+不访问DataRecorder，也不写日志，避免在工作进程中初始化交易相关的全局对象。
+"""
+import time
+from datetime import datetime
+
+# matplotlib在第一次渲染时才导入，主进程引用render_report时不需要加载
+plt = None
+
+
+def _load_matplotlib():
+    global plt
+    if plt is None:
+        import matplotlib
+        matplotlib.use('Agg')  # 设置为非交互式后端
+        import matplotlib.pyplot as pyplot
+
+        # 设置matplotlib中文字体
+        pyplot.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'Arial Unicode MS']
+        pyplot.rcParams['axes.unicode_minus'] = False
+        plt = pyplot
+
+
+def render_report(snapshot: dict, chart_path: str, title: str, dpi: int = 300) -> float:
+    """
+    根据数据快照绘制2x2报告并保存
+
+    Args:
+        snapshot: DataRecorder.get_chart_snapshot()返回的数组快照
+        chart_path: 图表保存路径
+        title: 图表标题
+        dpi: 输出分辨率
+
+    Returns:
+        渲染耗时（秒）
+    """
+    start = time.perf_counter()
+    _load_matplotlib()
+    account_data = snapshot['account']
+    price_data = snapshot['prices']
+    summary = snapshot['summary']
+
+    fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+    try:
+        fig.suptitle(title, fontsize=16, fontweight='bold')
+
+        _plot_equity_chart(ax1, account_data, summary)
+        _plot_price_changes_chart(ax2, price_data)
+        _plot_combined_chart(ax3, account_data, price_data, summary)
+        _plot_volume_chart(ax4, summary)
+
+        fig.tight_layout()
+        fig.savefig(chart_path, dpi=dpi, bbox_inches='tight', facecolor='white')
+    finally:
+        plt.close(fig)
+
+    return time.perf_counter() - start
+
+
+def _to_datetimes(timestamps):
+    return [datetime.fromtimestamp(ts) for ts in timestamps]
+
+
+def _plot_equity_chart(ax, account_data, summary):
+    """绘制账户权益变化图表"""
+    ax.set_title('账户权益变化', fontsize=12, fontweight='bold')
+    ax.set_xlabel('时间')
+    ax.set_ylabel('USDT权益')
+    ax.grid(True, alpha=0.3)
+
+    if len(account_data['timestamps']):
+        times = _to_datetimes(account_data['timestamps'])
+        ax.plot(times, account_data['equity'], 'b-', linewidth=2, label='权益')
+
+        # 添加统计信息
+        initial_equity = summary.get('initial_equity', 0)
+        current_equity = float(account_data['equity'][-1]) if len(account_data['equity']) else 0
+        change = current_equity - initial_equity
+        change_pct = (change / initial_equity * 100) if initial_equity > 0 else 0
+
+        info_text = f'初始权益: {initial_equity:.2f} USDT\n当前权益: {current_equity:.2f} USDT\n变化: {change:+.2f} USDT ({change_pct:+.2f}%)'
+        ax.text(0.02, 0.98, info_text, transform=ax.transAxes, verticalalignment='top',
+                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
+
+    ax.legend()
+
+
+def _plot_price_changes_chart(ax, price_data):
+    """绘制交易对价格变化百分比图表"""
+    ax.set_title('交易对价格变化 (%)', fontsize=12, fontweight='bold')
+    ax.set_xlabel('时间')
+    ax.set_ylabel('价格变化百分比 (%)')
+    ax.grid(True, alpha=0.3)
+
+    colors = ['red', 'green', 'blue', 'orange', 'purple', 'brown', 'pink', 'gray']
+
+    for i, symbol in enumerate(price_data['symbols']):
+        if symbol in price_data['timestamps'] and len(price_data['timestamps'][symbol]):
+            times = _to_datetimes(price_data['timestamps'][symbol])
+            price_changes = price_data['price_changes_percent'][symbol]
+            color = colors[i % len(colors)]
+            ax.plot(times, price_changes, color=color, linewidth=2, label=symbol)
+
+    ax.legend()
+    ax.axhline(y=0, color='black', linestyle='--', alpha=0.5)
+
+
+def _plot_combined_chart(ax, account_data, price_data, summary):
+    """绘制权益和价格变化合并图表"""
+    ax.set_title('权益与价格变化对比 (%)', fontsize=12, fontweight='bold')
+    ax.set_xlabel('时间')
+    ax.set_ylabel('变化百分比 (%)')
+    ax.grid(True, alpha=0.3)
+
+    # 绘制权益变化百分比
+    if len(account_data['timestamps']):
+        initial_equity = summary.get('initial_equity', 0)
+        if initial_equity > 0:
+            times = _to_datetimes(account_data['timestamps'])
+            equity_pct = (account_data['equity'] - initial_equity) / initial_equity * 100
+            ax.plot(times, equity_pct, 'b-', linewidth=3, label='权益变化', alpha=0.8)
+
+    # 绘制价格变化百分比
+    colors = ['red', 'green', 'orange', 'purple', 'brown']
+    for i, symbol in enumerate(price_data['symbols']):
+        if symbol in price_data['timestamps'] and len(price_data['timestamps'][symbol]):
+            times = _to_datetimes(price_data['timestamps'][symbol])
+            price_changes = price_data['price_changes_percent'][symbol]
+            color = colors[i % len(colors)]
+            ax.plot(times, price_changes, color=color, linewidth=2,
+                    label=f'{symbol}价格', alpha=0.7, linestyle='--')
+
+    ax.legend()
+    ax.axhline(y=0, color='black', linestyle='--', alpha=0.5)
+
+
+def _plot_volume_chart(ax, summary):
+    """绘制交易额统计图表"""
+    ax.set_title('交易额统计', fontsize=12, fontweight='bold')
+
+    # 显示总体统计
+    total_volume = summary.get('total_volume', 0)
+    total_trades = summary.get('total_trades', 0)
+    total_fees = summary.get('total_fees', 0)
+
+    # 创建简单的统计显示
+    stats = [
+        f'总交易次数: {total_trades}',
+        f'总交易额: {total_volume:.2f} USDT',
+        f'总手续费: {total_fees:.2f} USDT',
+        f'平均每笔: {total_volume/total_trades:.2f} USDT' if total_trades > 0 else '平均每笔: 0 USDT'
+    ]
+
+    # 移除坐标轴
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+
+    # 显示统计信息
+    stats_text = '\n'.join(stats)
+    ax.text(0.5, 0.5, stats_text, transform=ax.transAxes,
+            horizontalalignment='center', verticalalignment='center',
+            fontsize=14, bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
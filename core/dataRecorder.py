@@ -1,9 +1,13 @@
 import asyncio
 import time
+from array import array
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from util.sLogger import logger
+from config.config import get_data_recorder_config
+from core.eventBus import EventBus, OVERFLOW_CONFLATE
 import threading
 
 @dataclass
@@ -17,53 +21,144 @@ class TradeRecord:
     fee: float
     order_id: str
 
-@dataclass
-class AccountSnapshot:
-    """账户快照数据结构"""
-    timestamp: float
-    usdt_equity: float
-    total_fee: float
-    total_volume: float
-    equity_plus_half_fee: float
 
-@dataclass
-class PriceSnapshot:
-    """价格快照数据结构"""
-    timestamp: float
-    symbol: str
-    price: float
+def _as_numpy(values: array, start: int = 0, end: Optional[int] = None) -> 'np.ndarray':
+    """把array列中的一段复制为numpy数组"""
+    # numpy只在读取数组（图表、分析）时用到，延迟导入以缩短启动时间
+    import numpy as np
+    return np.frombuffer(values, dtype=np.float64)[start:end].copy()
+
+
+class PriceSeries:
+    """
+    单个交易对的价格序列
+
+    时间戳和价格按列存放在array('d')中，时间戳单调递增，可以用二分查找定位时间范围；
+    同时按固定时间桶增量维护OHLC聚合，读取时无需扫描原始数据。
+    """
+
+    def __init__(self, symbol: str, bucket_seconds: float):
+        self.symbol = symbol
+        self.bucket_seconds = bucket_seconds
+        self.initial_price: Optional[float] = None
+        self.timestamps = array('d')
+        self.prices = array('d')
+
+        # 时间桶聚合
+        self.bucket_starts = array('d')
+        self.bucket_open = array('d')
+        self.bucket_high = array('d')
+        self.bucket_low = array('d')
+        self.bucket_close = array('d')
+        self.bucket_count = array('d')
+
+    def append(self, timestamp: float, price: float):
+        if self.initial_price is None:
+            self.initial_price = price
+        self.timestamps.append(timestamp)
+        self.prices.append(price)
+
+        bucket_start = timestamp - timestamp % self.bucket_seconds
+        if self.bucket_starts and self.bucket_starts[-1] == bucket_start:
+            if price > self.bucket_high[-1]:
+                self.bucket_high[-1] = price
+            if price < self.bucket_low[-1]:
+                self.bucket_low[-1] = price
+            self.bucket_close[-1] = price
+            self.bucket_count[-1] += 1
+        else:
+            self.bucket_starts.append(bucket_start)
+            self.bucket_open.append(price)
+            self.bucket_high.append(price)
+            self.bucket_low.append(price)
+            self.bucket_close.append(price)
+            self.bucket_count.append(1)
+
+    def index_range(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Tuple[int, int]:
+        """返回[start_time, end_time]对应的下标区间"""
+        return _index_range(self.timestamps, start_time, end_time)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+
+def _index_range(timestamps: array, start_time: Optional[float], end_time: Optional[float]) -> Tuple[int, int]:
+    start = 0 if start_time is None else bisect_left(timestamps, start_time)
+    end = len(timestamps) if end_time is None else bisect_right(timestamps, end_time)
+    return start, max(start, end)
+
 
 class DataRecorder:
     """实时数据记录器"""
-    
+
+    # 账户快照的列名
+    ACCOUNT_COLUMNS = ('timestamps', 'equity', 'total_fee', 'equity_plus_half_fee', 'total_volume')
+
     def __init__(self):
+        self.config = get_data_recorder_config()
         self.trade_records: List[TradeRecord] = []
-        self.account_snapshots: List[AccountSnapshot] = []
-        self.price_snapshots: List[PriceSnapshot] = []  # 价格快照列表
+        # 账户快照按列存储，时间戳单调递增
+        self.account_columns: Dict[str, array] = {name: array('d') for name in self.ACCOUNT_COLUMNS}
+        self.price_series: Dict[str, PriceSeries] = {}  # 每个交易对的价格序列
         self.symbol_volumes: Dict[str, float] = {}  # 每个交易对的累计成交量
         self.symbol_fees: Dict[str, float] = {}     # 每个交易对的累计手续费
+        self.symbol_trade_counts: Dict[str, int] = {}  # 每个交易对的累计成交笔数
         self.symbol_initial_prices: Dict[str, float] = {}  # 每个交易对的初始价格
+        self.total_trades: int = 0
         self.total_volume: float = 0.0
         self.total_fee: float = 0.0
         self.current_equity: float = 0.0
         self.initial_equity: float = 0.0  # 初始权益
         self.lock = asyncio.Lock()
         self.running = True
-        
-        # 数据更新回调
-        self.data_update_callbacks: List[callable] = []
-        
+
+        # 数据更新事件总线，订阅者在各自的任务中处理事件，不占用记录锁
+        self.event_bus = EventBus('数据记录器')
+
         logger.info("数据记录器初始化完成")
-    
+
     def add_data_update_callback(self, callback):
-        """添加数据更新回调函数"""
-        self.data_update_callbacks.append(callback)
-    
+        """
+        添加数据更新回调函数（无参数）
+
+        回调只表示"数据已更新"，因此使用合并策略，连续的更新只触发一次回调
+        """
+        if asyncio.iscoroutinefunction(callback):
+            async def handler(event):
+                await callback()
+        else:
+            def handler(event):
+                callback()
+        # 所有主题合并为同一个键
+        return self.subscribe(handler, name=getattr(callback, '__name__', None),
+                              maxsize=1, policy=OVERFLOW_CONFLATE, conflate_key=lambda event: None)
+
+    def subscribe(self, callback, name: Optional[str] = None, topics: Optional[List[str]] = None,
+                  maxsize: Optional[int] = None, policy: Optional[str] = None, conflate_key=None):
+        """
+        订阅数据更新事件
+
+        事件主题为'trade'、'price'、'equity'，回调接收Event参数
+
+        Args:
+            callback: 回调函数，可以是协程函数
+            name: 订阅者名称
+            topics: 关注的主题列表，None表示全部
+            maxsize: 队列最大长度，默认使用配置值
+            policy: 队列满时的处理策略，默认使用配置值
+            conflate_key: 合并策略下计算事件键的函数，默认按主题和交易对合并
+        """
+        return self.event_bus.subscribe(
+            callback, name=name, topics=topics,
+            maxsize=maxsize or self.config.EVENT_QUEUE_SIZE,
+            policy=policy or self.config.EVENT_OVERFLOW_POLICY,
+            conflate_key=conflate_key)
+
     async def record_trade(self, symbol: str, side: str, amount: float, price: float, fee: float, order_id: str):
         """记录交易数据"""
         async with self.lock:
             timestamp = time.time()
-            
+
             # 创建交易记录
             trade_record = TradeRecord(
                 timestamp=timestamp,
@@ -74,43 +169,51 @@ class DataRecorder:
                 fee=fee,
                 order_id=order_id
             )
-            
+
             self.trade_records.append(trade_record)
-            
+
             # 更新累计数据
-            if symbol not in self.symbol_volumes:
-                self.symbol_volumes[symbol] = 0.0
-                self.symbol_fees[symbol] = 0.0
-            
-            self.symbol_volumes[symbol] += amount
-            self.symbol_fees[symbol] += fee
-            self.total_volume += amount
-            self.total_fee += fee
-            
+            self._accumulate_trade(symbol, amount, fee)
+
             logger.info(f"记录交易: {symbol} {side} {amount} @ {price}, 手续费: {fee}")
-            
-            # 触发数据更新回调
-            await self._trigger_callbacks()
-    
+
+        # 在锁外发布事件，订阅者处理缓慢不会阻塞记录流程
+        await self.event_bus.publish('trade', {
+            'symbol': symbol, 'side': side, 'amount': amount, 'price': price,
+            'fee': fee, 'order_id': order_id, 'timestamp': timestamp
+        }, key=symbol)
+
+    def _accumulate_trade(self, symbol: str, volume: float, fee: float):
+        """更新成交相关的累计值"""
+        if symbol not in self.symbol_volumes:
+            self.symbol_volumes[symbol] = 0.0
+            self.symbol_fees[symbol] = 0.0
+            self.symbol_trade_counts[symbol] = 0
+
+        self.symbol_volumes[symbol] += volume
+        self.symbol_fees[symbol] += fee
+        self.symbol_trade_counts[symbol] += 1
+        self.total_trades += 1
+        self.total_volume += volume
+        self.total_fee += fee
+
     async def record_price(self, symbol: str, price: float):
         """记录价格数据"""
         async with self.lock:
-            # 记录初始价格（如果是第一次记录该交易对）
-            if symbol not in self.symbol_initial_prices:
+            series = self.price_series.get(symbol)
+            if series is None:
+                # 记录初始价格（如果是第一次记录该交易对）
+                series = PriceSeries(symbol, self.config.AGGREGATE_BUCKET_SECONDS)
+                self.price_series[symbol] = series
                 self.symbol_initial_prices[symbol] = price
                 logger.info(f"记录{symbol}初始价格: {price:.2f}")
-            
-            # 创建价格快照
-            price_snapshot = PriceSnapshot(
-                timestamp=time.time(),
-                symbol=symbol,
-                price=price
-            )
-            
-            self.price_snapshots.append(price_snapshot)
-            
-            # 触发回调
-            await self._trigger_callbacks()
+
+            timestamp = time.time()
+            series.append(timestamp, price)
+
+        await self.event_bus.publish('price', {
+            'symbol': symbol, 'price': price, 'timestamp': timestamp
+        }, key=symbol)
 
     async def update_equity(self, equity: float):
         """更新账户权益"""
@@ -119,134 +222,175 @@ class DataRecorder:
             if self.initial_equity == 0.0:
                 self.initial_equity = equity
                 logger.info(f"记录初始权益: {equity:.2f} USDT")
-            
-            self.current_equity = equity
-            
-            # 创建账户快照
-            timestamp = time.time()
-            equity_plus_half_fee = equity + (self.total_fee * 0.5)
-            
-            snapshot = AccountSnapshot(
-                timestamp=timestamp,
-                usdt_equity=equity,
-                total_fee=self.total_fee,
-                total_volume=self.total_volume,
-                equity_plus_half_fee=equity_plus_half_fee
-            )
-            
-            self.account_snapshots.append(snapshot)
-            
+
+            timestamp = self._append_account_snapshot(equity)
+
             # 限制历史数据长度，避免内存溢出
-            if len(self.account_snapshots) > 10000:
-                self.account_snapshots = self.account_snapshots[-5000:]
-            
             if len(self.trade_records) > 10000:
                 self.trade_records = self.trade_records[-5000:]
-            
-            # 触发数据更新回调
-            await self._trigger_callbacks()
-    
-    async def _trigger_callbacks(self):
-        """触发所有数据更新回调"""
-        for callback in self.data_update_callbacks:
-            try:
-                if asyncio.iscoroutinefunction(callback):
-                    await callback()
-                else:
-                    callback()
-            except Exception as e:
-                logger.error(f"数据更新回调执行失败: {e}")
-    
-    def get_account_data(self) -> Dict:
-        """获取账户数据用于绘图"""
-        if not self.account_snapshots:
-            return {
-                'timestamps': [],
-                'equity': [],
-                'total_fee': [],
-                'equity_plus_half_fee': [],
-                'total_volume': []
-            }
-        
-        timestamps = [snapshot.timestamp for snapshot in self.account_snapshots]
-        equity = [snapshot.usdt_equity for snapshot in self.account_snapshots]
-        total_fee = [snapshot.total_fee for snapshot in self.account_snapshots]
-        equity_plus_half_fee = [snapshot.equity_plus_half_fee for snapshot in self.account_snapshots]
-        total_volume = [snapshot.total_volume for snapshot in self.account_snapshots]
-        
+
+        await self.event_bus.publish('equity', {
+            'equity': equity, 'total_fee': self.total_fee,
+            'total_volume': self.total_volume, 'timestamp': timestamp
+        })
+
+    def _append_account_snapshot(self, equity: float):
+        """追加一条账户快照"""
+        self.current_equity = equity
+        timestamp = time.time()
+        columns = self.account_columns
+        columns['timestamps'].append(timestamp)
+        columns['equity'].append(equity)
+        columns['total_fee'].append(self.total_fee)
+        columns['equity_plus_half_fee'].append(equity + (self.total_fee * 0.5))
+        columns['total_volume'].append(self.total_volume)
+
+        # 限制历史数据长度，避免内存溢出
+        if len(columns['timestamps']) > 10000:
+            for values in columns.values():
+                del values[:-5000]
+        return timestamp
+
+    def get_account_data(self, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Dict:
+        """
+        获取账户数据用于绘图
+
+        Args:
+            start_time: 起始时间戳，None表示不限制
+            end_time: 结束时间戳，None表示不限制
+        """
+        start, end = _index_range(self.account_columns['timestamps'], start_time, end_time)
+        return {name: values[start:end].tolist() for name, values in self.account_columns.items()}
+
+    def get_price_data(self, symbols: Optional[List[str]] = None,
+                       start_time: Optional[float] = None, end_time: Optional[float] = None) -> Dict:
+        """
+        获取价格数据用于绘图
+
+        Args:
+            symbols: 需要的交易对列表，None表示全部
+            start_time: 起始时间戳，None表示不限制
+            end_time: 结束时间戳，None表示不限制
+        """
+        result = {
+            'symbols': [],
+            'timestamps': {},
+            'prices': {},
+            'price_changes_percent': {},
+            'initial_prices': self.symbol_initial_prices.copy()
+        }
+
+        for symbol, timestamps, prices, changes in self._iter_price_arrays(symbols, start_time, end_time):
+            result['symbols'].append(symbol)
+            result['timestamps'][symbol] = timestamps.tolist()
+            result['prices'][symbol] = prices.tolist()
+            result['price_changes_percent'][symbol] = changes.tolist()
+
+        return result
+
+    def _iter_price_arrays(self, symbols: Optional[List[str]], start_time: Optional[float], end_time: Optional[float]):
+        """按交易对生成时间范围内的(时间戳, 价格, 价格变化百分比)数组"""
+        for symbol in (symbols if symbols is not None else list(self.price_series)):
+            series = self.price_series.get(symbol)
+            if series is None or len(series) == 0:
+                continue
+
+            start, end = series.index_range(start_time, end_time)
+            timestamps = _as_numpy(series.timestamps, start, end)
+            prices = _as_numpy(series.prices, start, end)
+
+            # 计算价格变化百分比（只计算请求范围内的点）
+            initial_price = series.initial_price
+            if initial_price and initial_price > 0:
+                changes = (prices - initial_price) / initial_price * 100
+            else:
+                changes = prices * 0.0
+            yield symbol, timestamps, prices, changes
+
+    def get_price_buckets(self, symbol: str, start_time: Optional[float] = None, end_time: Optional[float] = None) -> Dict:
+        """
+        获取按时间桶聚合的价格数据（OHLC和价格更新次数）
+
+        Args:
+            symbol: 交易对
+            start_time: 起始时间戳，None表示不限制
+            end_time: 结束时间戳，None表示不限制
+        """
+        series = self.price_series.get(symbol)
+        if series is None:
+            return {'timestamps': [], 'open': [], 'high': [], 'low': [], 'close': [], 'count': []}
+
+        start, end = _index_range(series.bucket_starts, start_time, end_time)
         return {
-            'timestamps': timestamps,
-            'equity': equity,
-            'total_fee': total_fee,
-            'equity_plus_half_fee': equity_plus_half_fee,
-            'total_volume': total_volume
+            'timestamps': series.bucket_starts[start:end].tolist(),
+            'open': series.bucket_open[start:end].tolist(),
+            'high': series.bucket_high[start:end].tolist(),
+            'low': series.bucket_low[start:end].tolist(),
+            'close': series.bucket_close[start:end].tolist(),
+            'count': [int(c) for c in series.bucket_count[start:end]]
         }
-    
-    def get_price_data(self) -> Dict:
-        """获取价格数据用于绘图"""
-        if not self.price_snapshots:
-            return {
-                'symbols': [],
-                'timestamps': {},
-                'prices': {},
-                'price_changes_percent': {},
-                'initial_prices': self.symbol_initial_prices.copy()
-            }
-        
-        # 按交易对分组价格数据
-        symbol_data = {}
-        for snapshot in self.price_snapshots:
-            if snapshot.symbol not in symbol_data:
-                symbol_data[snapshot.symbol] = {
-                    'timestamps': [],
-                    'prices': []
-                }
-            symbol_data[snapshot.symbol]['timestamps'].append(snapshot.timestamp)
-            symbol_data[snapshot.symbol]['prices'].append(snapshot.price)
-        
-        # 计算价格变化百分比
+
+    def get_chart_snapshot(self, max_points: Optional[int] = None) -> Dict:
+        """
+        获取用于图表渲染的数组快照
+
+        返回的数据只包含numpy数组和基础类型，可以低成本地传递给渲染进程
+
+        Args:
+            max_points: 每条曲线的最大点数，超过时做保形降采样；None表示不降采样
+        """
+        from util.chartUtil import minmax_downsample
+        account_ts, equity = minmax_downsample(
+            _as_numpy(self.account_columns['timestamps']), _as_numpy(self.account_columns['equity']), max_points)
+
+        symbols = []
+        price_timestamps = {}
         price_changes_percent = {}
-        for symbol, data in symbol_data.items():
-            if symbol in self.symbol_initial_prices and self.symbol_initial_prices[symbol] > 0:
-                initial_price = self.symbol_initial_prices[symbol]
-                price_changes_percent[symbol] = [
-                    ((price - initial_price) / initial_price) * 100 
-                    for price in data['prices']
-                ]
-            else:
-                price_changes_percent[symbol] = [0.0] * len(data['prices'])
-        
+        for symbol, timestamps, _, changes in self._iter_price_arrays(None, None, None):
+            symbols.append(symbol)
+            price_timestamps[symbol], price_changes_percent[symbol] = minmax_downsample(
+                timestamps, changes, max_points)
+
         return {
-            'symbols': list(symbol_data.keys()),
-            'timestamps': {symbol: data['timestamps'] for symbol, data in symbol_data.items()},
-            'prices': {symbol: data['prices'] for symbol, data in symbol_data.items()},
-            'price_changes_percent': price_changes_percent,
-            'initial_prices': self.symbol_initial_prices.copy()
+            'account': {
+                'timestamps': account_ts,
+                'equity': equity,
+            },
+            'prices': {
+                'symbols': symbols,
+                'timestamps': price_timestamps,
+                'price_changes_percent': price_changes_percent,
+            },
+            'summary': self.get_summary()
         }
 
     def get_summary(self) -> Dict:
         """获取数据摘要"""
         return {
-            'total_trades': len(self.trade_records),
+            'total_trades': self.total_trades,
             'total_volume': self.total_volume,
             'total_fee': self.total_fee,
             'current_equity': self.current_equity,
             'initial_equity': self.initial_equity,
             'symbol_volumes': self.symbol_volumes.copy(),
-            'symbol_fees': self.symbol_fees.copy()
+            'symbol_fees': self.symbol_fees.copy(),
+            'symbol_trade_counts': self.symbol_trade_counts.copy()
         }
-    
+
     def reset_data(self):
         """重置所有数据"""
         self.trade_records.clear()
-        self.account_snapshots.clear()
+        for values in self.account_columns.values():
+            del values[:]
         self.symbol_volumes.clear()
         self.symbol_fees.clear()
+        self.symbol_trade_counts.clear()
+        self.total_trades = 0
         self.total_volume = 0.0
         self.total_fee = 0.0
         self.current_equity = 0.0
         logger.info("数据记录器数据已重置")
-    
+
     def record_trade_sync(self, symbol: str, side: str, amount: float, price: float, fee: float, order_id: str = ""):
         """同步版本的交易记录方法（用于测试）"""
         trade_record = TradeRecord(
@@ -258,43 +402,25 @@ class DataRecorder:
             fee=fee,
             order_id=order_id or f"test_{len(self.trade_records)}"
         )
-        
+
         self.trade_records.append(trade_record)
-        
+
         # 更新统计数据
         volume = amount * price
-        
-        if symbol not in self.symbol_volumes:
-            self.symbol_volumes[symbol] = 0.0
-            self.symbol_fees[symbol] = 0.0
-        
-        self.symbol_volumes[symbol] += volume
-        self.symbol_fees[symbol] += fee
-        self.total_volume += volume
-        self.total_fee += fee
-        
+        self._accumulate_trade(symbol, volume, fee)
+
         logger.info(f"记录交易: {symbol} {side} {amount} @ {price:.2f}, 手续费: {fee:.4f}")
-    
+
     def update_equity_sync(self, equity: float):
         """同步版本的权益更新方法（用于测试）"""
-        self.current_equity = equity
-        
-        # 创建账户快照
-        snapshot = AccountSnapshot(
-            timestamp=time.time(),
-            usdt_equity=equity,
-            total_fee=self.total_fee,
-            total_volume=self.total_volume,
-            equity_plus_half_fee=equity + (self.total_fee * 0.5)
-        )
-        
-        self.account_snapshots.append(snapshot)
+        self._append_account_snapshot(equity)
         logger.info(f"更新权益: {equity:.2f} USDT")
-    
+
     def stop(self):
         """停止数据记录器"""
         self.running = False
+        self.event_bus.close()
         logger.info("数据记录器已停止")
 
 # 全局数据记录器实例
-data_recorder = DataRecorder()
\ No newline at end of file
+data_recorder = DataRecorder()
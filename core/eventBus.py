@@ -0,0 +1,190 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from util.sLogger import logger
+
+# 队列满时的处理策略
+OVERFLOW_DROP_OLDEST = 'drop_oldest'  # 丢弃最旧的事件
+OVERFLOW_CONFLATE = 'conflate'        # 同一key只保留最新的事件，队列满时丢弃最旧的事件
+OVERFLOW_BLOCK = 'block'              # 发布方等待队列有空位
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE, OVERFLOW_BLOCK)
+
+
+@dataclass
+class Event:
+    """事件数据结构"""
+    topic: str
+    payload: Dict[str, Any]
+    key: Any = None  # 合并(conflate)时使用的键，默认与topic相同
+    timestamp: float = field(default_factory=time.monotonic)
+
+
+class Subscription:
+    """
+    单个订阅者
+
+    每个订阅者拥有独立的有界队列和消费任务，回调在消费任务中执行，
+    不会阻塞发布方，也不会影响其它订阅者。
+    """
+
+    def __init__(self, name: str, callback: Callable, topics: Optional[Iterable[str]] = None,
+                 maxsize: int = 1000, policy: str = OVERFLOW_DROP_OLDEST,
+                 conflate_key: Optional[Callable[[Event], Any]] = None):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"未知的队列溢出策略: {policy}")
+        self.name = name
+        self.callback = callback
+        self.topics = set(topics) if topics else None
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        # 合并策略下计算事件键的函数，默认按(topic, key)合并
+        self.conflate_key = conflate_key or (lambda event: (event.topic, event.key))
+
+        self._pending: 'OrderedDict[Any, Event]' = OrderedDict()
+        self._seq = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.task: Optional[asyncio.Task] = None
+
+        # 统计信息
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.errors = 0
+        self.last_lag = 0.0  # 最近一次事件从发布到开始处理的延迟（秒）
+        self.max_lag = 0.0
+
+    def accepts(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
+
+    def _enqueue(self, event: Event):
+        if self.policy == OVERFLOW_CONFLATE:
+            key = self.conflate_key(event)
+            if key in self._pending:
+                # 保留原有位置，只替换为最新事件
+                self._pending[key] = event
+                self.conflated += 1
+                return
+        else:
+            key = self._seq
+            self._seq += 1
+
+        if len(self._pending) >= self.maxsize:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+        self._pending[key] = event
+        self._not_empty.set()
+        if len(self._pending) >= self.maxsize:
+            self._not_full.clear()
+
+    async def put(self, event: Event):
+        """放入事件，block策略下队列满时等待"""
+        self.published += 1
+        if self.policy == OVERFLOW_BLOCK:
+            while len(self._pending) >= self.maxsize:
+                await self._not_full.wait()
+        self._enqueue(event)
+
+    async def run(self):
+        """消费循环"""
+        while True:
+            await self._not_empty.wait()
+            _, event = self._pending.popitem(last=False)
+            if not self._pending:
+                self._not_empty.clear()
+            self._not_full.set()
+
+            lag = time.monotonic() - event.timestamp
+            self.last_lag = lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+            try:
+                result = self.callback(event)
+                if asyncio.iscoroutine(result):
+                    await result
+                self.delivered += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"事件订阅者{self.name}处理{event.topic}事件失败: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'policy': self.policy,
+            'queue_size': len(self._pending),
+            'published': self.published,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'errors': self.errors,
+            'last_lag_ms': self.last_lag * 1000,
+            'max_lag_ms': self.max_lag * 1000
+        }
+
+
+class EventBus:
+    """
+    异步发布/订阅事件总线
+
+    publish只负责把事件放入各订阅者的队列，订阅者的回调在各自的任务中执行。
+    """
+
+    def __init__(self, name: str = 'event_bus'):
+        self.name = name
+        self.subscriptions: List[Subscription] = []
+
+    def subscribe(self, callback: Callable, name: Optional[str] = None, topics: Optional[Iterable[str]] = None,
+                  maxsize: int = 1000, policy: str = OVERFLOW_DROP_OLDEST,
+                  conflate_key: Optional[Callable[[Event], Any]] = None) -> Subscription:
+        """
+        添加订阅者
+
+        Args:
+            callback: 回调函数，接收Event参数，可以是协程函数
+            name: 订阅者名称，用于日志和统计
+            topics: 关注的主题列表，None表示全部
+            maxsize: 队列最大长度
+            policy: 队列满时的处理策略
+            conflate_key: 合并策略下计算事件键的函数
+        """
+        subscription = Subscription(name or getattr(callback, '__name__', 'subscriber'),
+                                    callback, topics, maxsize, policy, conflate_key)
+        self.subscriptions.append(subscription)
+        logger.info(f"{self.name}添加订阅者{subscription.name}，策略: {policy}，队列长度: {subscription.maxsize}")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """移除订阅者"""
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+        if subscription.task and not subscription.task.done():
+            subscription.task.cancel()
+
+    async def publish(self, topic: str, payload: Dict[str, Any], key: Any = None):
+        """发布事件，必须在事件循环中调用"""
+        if not self.subscriptions:
+            return
+        event = Event(topic=topic, payload=payload, key=key)
+        for subscription in self.subscriptions:
+            if not subscription.accepts(topic):
+                continue
+            # 消费任务在第一次发布时启动，因为订阅可能发生在事件循环启动之前
+            if subscription.task is None or subscription.task.done():
+                subscription.task = asyncio.get_running_loop().create_task(subscription.run())
+            await subscription.put(event)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """获取所有订阅者的统计信息"""
+        return {subscription.name: subscription.get_stats() for subscription in self.subscriptions}
+
+    def close(self):
+        """停止所有订阅者的消费任务"""
+        for subscription in self.subscriptions:
+            if subscription.task and not subscription.task.done():
+                subscription.task.cancel()
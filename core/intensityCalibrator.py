@@ -0,0 +1,195 @@
+import asyncio
+import math
+import time
+from typing import Optional
+
+import numpy as np
+
+from config.config import get_intensity_config
+from util.sLogger import logger
+
+
+class IntensityCalibrator:
+    """
+    成交强度参数流式校准器
+
+    按成交价距中间价的相对距离把公共成交和自身成交计入固定数量的直方图桶，
+    计数按半衰期指数衰减。距离不小于δ的成交频率λ(δ)由桶计数的尾部累加得到，
+    对ln λ(δ) = ln A - k·δ做加权线性回归得到A和k。
+
+    每笔成交只更新一个桶（O(1)），拟合只涉及固定数量的桶，
+    不保存也不回放历史成交；新参数按配置的间隔发布给TradeManager。
+    """
+
+    def __init__(self, symbolName: str, wsExchange, tradeManager=None):
+        self.symbolName = symbolName
+        self.wsExchange = wsExchange
+        self.tradeManager = tradeManager
+        self.run = True
+
+        self.config = get_intensity_config()
+        self.bucket_width = self.config.BUCKET_WIDTH
+        self.bucket_count = self.config.BUCKET_COUNT
+        self.decay_rate = math.log(2) / self.config.HALF_LIFE
+
+        # 计数以t_ref时刻为基准放大保存：新成交权重为exp(rate·(t - t_ref))，读取时再统一衰减，
+        # 这样每笔成交只需更新一个桶，不必每次衰减整个直方图
+        self.counts = np.zeros(self.bucket_count, dtype=np.float64)
+        self.t_ref = time.time()
+        self.start_time = self.t_ref
+        self.last_trade_timestamp = 0  # 最近处理的公共成交时间戳（毫秒），用于跳过重复推送
+
+        self.A: Optional[float] = None
+        self.k: Optional[float] = None
+        self.last_publish_time = 0.0
+        self.trade_count = 0
+        self.own_fill_count = 0
+        self.publish_count = 0
+
+        logger.info(f"{self.symbolName}成交强度校准器初始化完成")
+
+    # ========== 计数 ==========
+
+    def _rebase(self, now: float):
+        """放大倍数过大时把基准时间移到当前时刻"""
+        exponent = self.decay_rate * (now - self.t_ref)
+        if exponent > 50:
+            self.counts *= math.exp(-exponent)
+            self.t_ref = now
+
+    def add_observation(self, price: float, mid: float, weight: float = 1.0, now: Optional[float] = None):
+        """
+        记录一笔成交
+
+        Args:
+            price: 成交价格
+            mid: 成交时的中间价
+            weight: 成交权重
+            now: 成交时间（秒），默认为当前时间
+        """
+        if not mid or mid <= 0 or not price or weight <= 0:
+            return
+        now = time.time() if now is None else now
+        self._rebase(now)
+        bucket = min(int(abs(price - mid) / mid / self.bucket_width), self.bucket_count - 1)
+        self.counts[bucket] += weight * math.exp(self.decay_rate * (now - self.t_ref))
+
+    def on_public_trades(self, trades: list, mid: float):
+        """处理一批公共成交"""
+        now = time.time()
+        for trade in trades:
+            timestamp = trade.get('timestamp') or 0
+            if timestamp < self.last_trade_timestamp:
+                continue
+            self.last_trade_timestamp = timestamp
+            price = trade.get('price')
+            if price:
+                self.add_observation(float(price), mid, 1.0, now)
+                self.trade_count += 1
+
+    def on_own_fills(self, orders: list, mid: float):
+        """处理自身成交订单，没有成交数量的订单（撤销的订单）不计入观测"""
+        weight = self.config.OWN_FILL_WEIGHT
+        if weight <= 0:
+            return
+        now = time.time()
+        for order in orders:
+            if order.filled <= 0:
+                continue
+            price = order.fill_price
+            if price:
+                self.add_observation(price, mid, weight, now)
+                self.own_fill_count += 1
+
+    def decayed_counts(self, now: Optional[float] = None) -> np.ndarray:
+        """当前时刻的衰减后桶计数"""
+        now = time.time() if now is None else now
+        return self.counts * math.exp(-self.decay_rate * (now - self.t_ref))
+
+    def effective_seconds(self, now: Optional[float] = None) -> float:
+        """与衰减计数对应的等效观测时长（秒）"""
+        now = time.time() if now is None else now
+        return (1 - math.exp(-self.decay_rate * (now - self.start_time))) / self.decay_rate
+
+    # ========== 拟合与发布 ==========
+
+    def fit(self, now: Optional[float] = None):
+        """
+        由当前直方图拟合A和k
+
+        Returns:
+            (A, k)，样本不足或拟合结果无效时返回None
+        """
+        now = time.time() if now is None else now
+        counts = self.decayed_counts(now)
+        if counts.sum() < self.config.MIN_WEIGHT:
+            return None
+        seconds = self.effective_seconds(now)
+        if seconds <= 0:
+            return None
+
+        # λ(δ_i)：距离不小于第i个桶下沿的成交频率
+        tail = np.cumsum(counts[::-1])[::-1]
+        mask = tail > 0
+        if np.count_nonzero(counts[mask] > 0) < self.config.MIN_BUCKETS:
+            return None
+        distance = np.arange(self.bucket_count)[mask] * self.bucket_width
+        log_rate = np.log(tail[mask] / seconds)
+        # 尾部计数越大，对数频率的方差越小
+        slope, intercept = np.polyfit(distance, log_rate, 1, w=np.sqrt(tail[mask]))
+        k = -slope
+        if not np.isfinite(k) or k <= 0:
+            return None
+        k = min(max(k, self.config.MIN_K), self.config.MAX_K)
+        return float(math.exp(intercept)), float(k)
+
+    def maybe_publish(self, now: Optional[float] = None) -> bool:
+        """达到发布间隔时重新拟合并把参数发布给TradeManager"""
+        now = time.time() if now is None else now
+        if now - self.last_publish_time < self.config.PUBLISH_INTERVAL:
+            return False
+        self.last_publish_time = now
+        result = self.fit(now)
+        if result is None:
+            return False
+        self.A, self.k = result
+        self.publish_count += 1
+        if self.tradeManager:
+            self.tradeManager.glftA = self.A
+            self.tradeManager.glftK = self.k
+        logger.info(f"{self.symbolName}成交强度参数更新: A={self.A:.4f}, k={self.k:.1f}")
+        return True
+
+    async def watch_trades(self):
+        """监听公共成交流并定期发布参数"""
+        logger.info(f"{self.symbolName}开始监听公共成交")
+        while self.run:
+            try:
+                trades = await self.wsExchange.watch_trades(self.symbolName)
+                mid = self.tradeManager.lastPrice if self.tradeManager else None
+                if mid:
+                    self.on_public_trades(trades, mid)
+                self.maybe_publish()
+            except asyncio.CancelledError:
+                logger.info(f"{self.symbolName}公共成交监听任务已取消")
+                self.run = False
+                break
+            except Exception as e:
+                logger.error(f"{self.symbolName}公共成交监听错误: {e}")
+                await asyncio.sleep(5)
+
+    def get_calibration_info(self) -> dict:
+        """获取校准状态"""
+        return {
+            'A': self.A,
+            'k': self.k,
+            'trade_count': self.trade_count,
+            'own_fill_count': self.own_fill_count,
+            'publish_count': self.publish_count,
+            'decayed_weight': float(self.decayed_counts().sum()),
+        }
+
+    def stop(self):
+        """停止校准"""
+        self.run = False
+        logger.info(f"{self.symbolName}成交强度校准器已停止")
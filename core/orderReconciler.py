@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+挂单对账
+把期望报价集合与实际挂单按方向、意图(开仓/平仓)、价格和数量比较，
+生成最小的保持/改单/撤单/新挂计划，由TradeManager并发执行。
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from util.records import OrderRecord
+
+
+@dataclass
+class ReconcilePlan:
+    """对账计划"""
+    keep: List[Tuple[dict, OrderRecord]] = field(default_factory=list)   # (期望, 挂单)
+    amend: List[Tuple[dict, OrderRecord]] = field(default_factory=list)  # (期望, 待修改的挂单)
+    place: List[dict] = field(default_factory=list)                      # 期望
+    cancel: List[OrderRecord] = field(default_factory=list)              # 挂单
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.amend or self.place or self.cancel)
+
+    def summary(self) -> str:
+        return f"保持{len(self.keep)}, 改单{len(self.amend)}, 新挂{len(self.place)}, 撤单{len(self.cancel)}"
+
+
+def _intent(side: str, reduce_only) -> Tuple[str, bool]:
+    return side, bool(reduce_only)
+
+
+def _order_price(order: OrderRecord) -> float:
+    return order.price
+
+
+def reconcile(desired: List[dict], live: List[OrderRecord], price_tolerance: float,
+              amount_tolerance: float) -> ReconcilePlan:
+    """
+    生成对账计划
+
+    Args:
+        desired: 期望订单，每项包含side、reduce_only、price、amount
+        live: 实际挂单记录（使用side、reduceOnly、price、amount）
+        price_tolerance: 相对价格容差，挂单价与期望价偏差不超过容差时保持不动以保留排队位置
+        amount_tolerance: 数量容差（绝对值）
+
+    按方向和意图分组后：
+    1. 价格和数量都在容差内的挂单与期望订单配对并保持，每次选价格最接近的一对；
+    2. 剩余的期望订单与剩余挂单按价格顺序配对改单（改单比撤单+新挂少一次请求）；
+    3. 多出的期望订单新挂，多出的挂单撤销。
+    """
+    plan = ReconcilePlan()
+    groups: Dict[Tuple[str, bool], Tuple[List[dict], List[dict]]] = {}
+    for target in desired:
+        groups.setdefault(_intent(target['side'], target['reduce_only']), ([], []))[0].append(target)
+    for order in live:
+        groups.setdefault(_intent(order.side, order.reduceOnly), ([], []))[1].append(order)
+
+    for (side, _), (targets, orders) in groups.items():
+        # 候选配对按价格偏差从小到大处理，贪心得到偏差最小的保持集合
+        candidates = []
+        for i, target in enumerate(targets):
+            for j, order in enumerate(orders):
+                deviation = abs(order.price - target['price'])
+                if (order.price > 0 and deviation <= price_tolerance * target['price']
+                        and abs(order.amount - target['amount']) <= amount_tolerance):
+                    candidates.append((deviation, i, j))
+        candidates.sort()
+        used_targets, used_orders = set(), set()
+        for _, i, j in candidates:
+            if i not in used_targets and j not in used_orders:
+                used_targets.add(i)
+                used_orders.add(j)
+                plan.keep.append((targets[i], orders[j]))
+
+        # 剩余的按价格从优到劣排列后依次配对改单
+        reverse = side == 'buy'
+        rest_targets = sorted((t for i, t in enumerate(targets) if i not in used_targets),
+                              key=lambda t: t['price'], reverse=reverse)
+        rest_orders = sorted((o for j, o in enumerate(orders) if j not in used_orders),
+                             key=_order_price, reverse=reverse)
+        paired = min(len(rest_targets), len(rest_orders))
+        plan.amend.extend(zip(rest_targets[:paired], rest_orders[:paired]))
+        plan.place.extend(rest_targets[paired:])
+        plan.cancel.extend(rest_orders[paired:])
+    return plan
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单流分发器
+每个交易所连接只有一个watchOrders消费者：每批推送只规范化一次（转换为订单记录，按交易对、订单ID建索引），
+再按交易对依次分发给订阅者的两个阶段：
+watchOrders每次返回完整的订单缓存（最多上千个订单），订单记录按订单ID缓存，
+只有更新时间、成交数量、状态、价格或数量变化的订单才重新转换。
+
+1. 挂单簿更新（该交易对的未成交订单列表）
+2. 成交检测（该交易对本批全部订单，按订单ID索引）
+每个阶段的耗时记录到性能监控器。
+"""
+
+import asyncio
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import ccxt
+
+from util.performanceMonitor import get_performance_monitor
+from util.records import OrderRecord
+from util.sLogger import logger
+
+BookHandler = Callable[[List[OrderRecord]], Awaitable[None]]
+UpdateHandler = Callable[[Dict[str, OrderRecord]], Awaitable[None]]
+ErrorHandler = Callable[[Exception], Awaitable[None]]
+
+
+class _Subscriber:
+    __slots__ = ('on_book', 'on_updates', 'on_error')
+
+    def __init__(self, on_book: BookHandler, on_updates: UpdateHandler, on_error: Optional[ErrorHandler]):
+        self.on_book = on_book
+        self.on_updates = on_updates
+        self.on_error = on_error
+
+
+class OrderStreamDispatcher:
+    """单个交易所连接的订单流分发器"""
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self.subscribers: Dict[str, _Subscriber] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.batch_count = 0
+        # 订单ID -> (变更签名, 订单记录)
+        self._records: Dict[str, Tuple[tuple, OrderRecord]] = {}
+        self.converted_count = 0
+
+    def subscribe(self, symbol: str, on_book: BookHandler, on_updates: UpdateHandler,
+                  on_error: Optional[ErrorHandler] = None):
+        self.subscribers[symbol] = _Subscriber(on_book, on_updates, on_error)
+
+    def unsubscribe(self, symbol: str):
+        self.subscribers.pop(symbol, None)
+        if not self.subscribers and self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def normalize(self, batch: List[dict]) -> Dict[str, Dict[str, OrderRecord]]:
+        """
+        转换为订单记录并按交易对和订单ID建索引，同一订单保留本批中最后一次更新
+
+        未变化的订单复用上一批的记录，已从ccxt缓存中移除的订单同时移出记录缓存。
+        """
+        previous = self._records
+        records: Dict[str, Tuple[tuple, OrderRecord]] = {}
+        by_symbol: Dict[str, Dict[str, OrderRecord]] = {}
+        for order in batch:
+            order_id = str(order.get('id'))
+            signature = (order.get('lastUpdateTimestamp'), order.get('timestamp'), order.get('filled'),
+                         order.get('status'), order.get('price'), order.get('amount'))
+            cached = previous.get(order_id)
+            if cached is not None and cached[0] == signature:
+                record = cached[1]
+            else:
+                record = OrderRecord.from_ccxt(order)
+                self.converted_count += 1
+            records[order_id] = (signature, record)
+            symbol_orders = by_symbol.get(record.symbol)
+            if symbol_orders is None:
+                symbol_orders = by_symbol[record.symbol] = {}
+            symbol_orders[order_id] = record
+        self._records = records
+        return by_symbol
+
+    async def dispatch(self, batch: List[dict]):
+        """分发一批订单推送：先更新挂单簿，再做成交检测"""
+        monitor = get_performance_monitor()
+        start = time.perf_counter()
+        by_symbol = self.normalize(batch)
+        monitor.record_stage_time('订单流-规范化', (time.perf_counter() - start) * 1000)
+
+        for symbol, subscriber in list(self.subscribers.items()):
+            orders = by_symbol.get(symbol, {})
+            start = time.perf_counter()
+            await subscriber.on_book([order for order in orders.values() if order.status == 'open'])
+            book_done = time.perf_counter()
+            monitor.record_stage_time('订单流-挂单簿', (book_done - start) * 1000)
+            await subscriber.on_updates(orders)
+            monitor.record_stage_time('订单流-成交检测', (time.perf_counter() - book_done) * 1000)
+        self.batch_count += 1
+
+    async def _consume(self):
+        # 返回完整订单缓存而不是增量，成交检测需要看到本交易对的全部订单
+        self.exchange.newUpdates = False
+        while self.subscribers:
+            try:
+                batch = await self.exchange.watchOrders()
+                await self.dispatch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                for subscriber in list(self.subscribers.values()):
+                    if subscriber.on_error:
+                        await subscriber.on_error(e)
+                if not isinstance(e, ccxt.NetworkError):
+                    await asyncio.sleep(0.1)
+
+    async def run(self):
+        """启动（或加入）共享的消费任务，直到任务结束"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._consume())
+        # shield避免某个订阅者的任务被取消时连带取消共享消费任务
+        await asyncio.shield(self._task)
+
+
+_dispatchers: 'weakref.WeakKeyDictionary' = weakref.WeakKeyDictionary()
+
+
+def get_order_dispatcher(exchange) -> OrderStreamDispatcher:
+    """获取交易所连接对应的订单流分发器"""
+    dispatcher = _dispatchers.get(exchange)
+    if dispatcher is None:
+        dispatcher = OrderStreamDispatcher(exchange)
+        _dispatchers[exchange] = dispatcher
+    return dispatcher
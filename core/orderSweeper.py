@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+账户级挂单巡检
+所有交易对使用同一个账户，定期巡检只需要一次不带交易对的fetchOpenOrders：
+按交易对分组后并发分发给各TradeManager做状态检查和恢复，
+N个交易对的周期性REST查询从O(N)降为O(1)。
+账户级查询按游标翻页，取满最大页数时结果可能被截断：此时只分发查到订单的交易对，
+不把空结果当作"没有挂单"，也不提供快照。
+最近一次完整结果作为快照保留，供订单监听的主动检查复用。
+进程级的统计（事件总线）也在每次巡检时输出一次，而不是由每个交易对各输出一遍。
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from config.config import get_trade_config
+from core.dataRecorder import data_recorder
+from util.sLogger import logger
+
+
+class OrderSweeper:
+    """进程内共享的挂单巡检器"""
+
+    def __init__(self, interval: Optional[float] = None):
+        trade_config = get_trade_config()
+        self.interval = trade_config.ORDER_SWEEP_INTERVAL if interval is None else interval
+        self.page_size = trade_config.ORDER_SWEEP_PAGE_SIZE
+        self.max_pages = trade_config.ORDER_SWEEP_MAX_PAGES
+        self.managers: Dict[str, object] = {}
+        # 最近一次巡检结果：交易对 -> 未成交订单列表，以及对应的请求发起时间
+        self.snapshot_orders: Dict[str, List[dict]] = {}
+        self.snapshot_time: Optional[float] = None
+        self.snapshot_complete = False
+        self.sweep_count = 0
+        self.error_count = 0
+        self.truncated_count = 0
+
+    def register(self, trade_manager):
+        self.managers[trade_manager.symbolName] = trade_manager
+
+    def unregister(self, symbol: str):
+        self.managers.pop(symbol, None)
+        self.snapshot_orders.pop(symbol, None)
+
+    def snapshot(self, symbol: str, since: float = 0.0) -> Optional[List[dict]]:
+        """
+        获取交易对在最近一次巡检中的未成交订单
+
+        Args:
+            since: 只接受在该时间（time.time()）之后发起的巡检结果
+
+        Returns:
+            订单列表；没有满足条件的巡检结果（或最近一次结果可能被截断）时返回None
+        """
+        if (symbol not in self.managers or not self.snapshot_complete or self.snapshot_time is None
+                or self.snapshot_time < since):
+            return None
+        return self.snapshot_orders.get(symbol, [])
+
+    async def _fetch_all(self) -> List[dict]:
+        """用任一交易对的连接按游标翻页查询账户全部挂单，连接失败时依次换下一个"""
+        params = {'paginate': True, 'paginationCalls': self.max_pages, 'maxEntriesPerRequest': self.page_size}
+        last_error = None
+        for trade_manager in list(self.managers.values()):
+            try:
+                return await trade_manager.wsExchange.fetchOpenOrders(None, None, None, params)
+            except Exception as e:
+                last_error = e
+                logger.warning(f"使用{trade_manager.symbolName}的连接巡检挂单失败: {e}")
+        raise last_error
+
+    async def sweep(self):
+        """执行一次巡检并分发结果"""
+        if not self.managers:
+            return
+        request_time = time.time()
+        all_orders = await self._fetch_all()
+        complete = len(all_orders) < self.page_size * self.max_pages
+
+        by_symbol: Dict[str, List[dict]] = {symbol: [] for symbol in self.managers}
+        for order in all_orders:
+            orders = by_symbol.get(order.get('symbol'))
+            if orders is not None:
+                orders.append(order)
+        self.snapshot_orders = by_symbol
+        self.snapshot_time = request_time
+        self.snapshot_complete = complete
+        self.sweep_count += 1
+
+        managers = [(symbol, trade_manager) for symbol, trade_manager in self.managers.items()]
+        if not complete:
+            # 结果可能被截断，没有查到订单的交易对无法判断是否真的没有挂单，本轮跳过
+            self.truncated_count += 1
+            managers = [(symbol, trade_manager) for symbol, trade_manager in managers if by_symbol[symbol]]
+            logger.warning(f"账户级挂单巡检取满{self.max_pages}页共{len(all_orders)}个订单，结果可能被截断，"
+                           f"只分发{len(managers)}个查到订单的交易对")
+        results = await asyncio.gather(
+            *(trade_manager.applyOrderSweep(by_symbol[symbol]) for symbol, trade_manager in managers),
+            return_exceptions=True
+        )
+        for (symbol, _), result in zip(managers, results):
+            if isinstance(result, Exception):
+                logger.error(f"{symbol}处理挂单巡检结果时发生错误: {result}")
+        logger.info(f"事件总线统计（队列、丢弃、合并、延迟）: {data_recorder.event_bus.get_stats()}")
+
+    async def run(self):
+        """按固定间隔巡检，直到任务被取消"""
+        logger.info(f"账户级挂单巡检启动，间隔: {self.interval}秒")
+        while True:
+            try:
+                await asyncio.sleep(self.interval)
+                await self.sweep()
+            except asyncio.CancelledError:
+                logger.info("账户级挂单巡检任务被取消")
+                break
+            except Exception as e:
+                self.error_count += 1
+                logger.error(f"账户级挂单巡检发生错误: {e}")
+
+    def get_stats(self) -> Dict[str, float]:
+        return {
+            'symbols': len(self.managers),
+            'sweeps': self.sweep_count,
+            'errors': self.error_count,
+            'truncated': self.truncated_count,
+            'snapshot_age': time.time() - self.snapshot_time if self.snapshot_time else None,
+        }
+
+
+_order_sweeper: Optional[OrderSweeper] = None
+
+
+def get_order_sweeper() -> OrderSweeper:
+    """获取全局挂单巡检器实例"""
+    global _order_sweeper
+    if _order_sweeper is None:
+        _order_sweeper = OrderSweeper()
+    return _order_sweeper
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多交易对报价引擎
+所有交易对的库存、价差参数和中间价以列数组(struct-of-arrays)形式保存，
+一次向量化计算得到全部交易对的买卖价差、价格和下单数量。
+"""
+
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from config.config import get_trade_config
+from util.sLogger import logger
+
+# 交易方向编码
+DIRECTION_CODES = {'both': 0, 'long': 1, 'short': -1}
+
+# 输入列：名称 -> 默认值
+_INPUT_FIELDS = {
+    'base_spread': 0.0,       # 基础价差（单边）
+    'min_spread': 0.0,        # 最小价差（单边）
+    'max_spread': 0.0,        # 最大价差（单边）
+    'max_stock_ratio': 1.0,   # 最大持仓比例
+    'stock_ratio': 0.0,       # 当前总持仓比例（双向模式使用）
+    'long_size': 0.0,         # 多头持仓数量
+    'short_size': 0.0,        # 空头持仓数量
+    'balance': np.nan,        # 可用余额
+    'mid': np.nan,            # 最新中间价
+    'base_price': np.nan,     # 计算报价使用的基准价
+    'order_amount': 0.0,      # 期望下单数量
+    'min_amount': 0.0,        # 最小下单数量
+    'min_value': 0.0,         # 最小订单价值
+    'price_scale': 1.0,       # 10 ** 价格精度小数位数
+    'amount_scale': 1.0,      # 10 ** 数量精度小数位数
+    'inventory': 0.0,         # 净库存，以下单数量为单位
+    'sigma': 0.0,             # 每秒相对波动率
+    'glft_gamma': np.nan,     # GLFT风险厌恶系数
+    'glft_a': np.nan,         # GLFT成交强度参数A
+    'glft_k': np.nan,         # GLFT成交强度衰减参数k
+    'glft_c1': np.nan,        # GLFT缓存系数c1
+    'glft_c2': np.nan,        # GLFT缓存系数c2
+}
+
+# 输出列
+_OUTPUT_FIELDS = ('ratio', 'buy_spread', 'sell_spread', 'buy_price', 'sell_price', 'buy_size', 'sell_size')
+
+
+class QuoteEngine:
+    """
+    报价引擎
+
+    每个交易对占用一个槽位(slot)，状态更新只是对数组元素赋值；
+    compute()对所有槽位做一次向量化计算，结果在下一次状态变化之前一直有效。
+    """
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = capacity
+        self.count = 0
+        self.symbols = []
+        self.slots: Dict[str, int] = {}
+        self.direction = np.zeros(capacity, dtype=np.int8)
+        self.inputs = {name: np.full(capacity, default, dtype=np.float64) for name, default in _INPUT_FIELDS.items()}
+        self.outputs = {name: np.zeros(capacity, dtype=np.float64) for name in _OUTPUT_FIELDS}
+        self.dirty = True
+        self.coefficients_dirty = False  # 是否有槽位的GLFT参数发生变化
+        self.coefficient_updates = 0     # GLFT系数重新计算的次数
+        self.compute_count = 0
+        self.last_compute_time = 0.0  # 最近一次计算耗时（秒）
+        self._warned_modes = set()
+
+    def _grow(self):
+        new_capacity = self.capacity * 2
+        self.direction = np.concatenate([self.direction, np.zeros(self.capacity, dtype=np.int8)])
+        for name, default in _INPUT_FIELDS.items():
+            self.inputs[name] = np.concatenate([self.inputs[name], np.full(self.capacity, default)])
+        for name in _OUTPUT_FIELDS:
+            self.outputs[name] = np.concatenate([self.outputs[name], np.zeros(self.capacity)])
+        self.capacity = new_capacity
+
+    def register(self, symbol: str, direction: str = 'both') -> int:
+        """注册交易对，返回槽位编号；重复注册返回原槽位"""
+        if symbol in self.slots:
+            slot = self.slots[symbol]
+        else:
+            if self.count >= self.capacity:
+                self._grow()
+            slot = self.count
+            self.count += 1
+            self.symbols.append(symbol)
+            self.slots[symbol] = slot
+        self.direction[slot] = DIRECTION_CODES.get(direction, 0)
+        self.dirty = True
+        return slot
+
+    def set_params(self, slot: int, base_spread: float, min_spread: float, max_spread: float,
+                   max_stock_ratio: float, min_amount: float, price_precision: int, amount_precision: int,
+                   min_value: float):
+        """更新价差参数和下单限制"""
+        inputs = self.inputs
+        inputs['base_spread'][slot] = base_spread
+        inputs['min_spread'][slot] = min_spread
+        inputs['max_spread'][slot] = max_spread
+        inputs['max_stock_ratio'][slot] = max_stock_ratio
+        inputs['min_amount'][slot] = min_amount
+        inputs['price_scale'][slot] = 10.0 ** price_precision
+        inputs['amount_scale'][slot] = 10.0 ** amount_precision
+        inputs['min_value'][slot] = min_value
+        self.dirty = True
+
+    def set_glft_params(self, slot: int, gamma: float, a: float, k: float):
+        """更新GLFT参数，只有参数变化时才标记系数需要重新计算"""
+        inputs = self.inputs
+        if inputs['glft_gamma'][slot] == gamma and inputs['glft_a'][slot] == a and inputs['glft_k'][slot] == k:
+            return
+        inputs['glft_gamma'][slot] = gamma
+        inputs['glft_a'][slot] = a
+        inputs['glft_k'][slot] = k
+        inputs['glft_c1'][slot] = np.nan
+        self.coefficients_dirty = True
+        self.dirty = True
+
+    def set_sigma(self, slot: int, sigma: float):
+        """更新每秒相对波动率"""
+        self.inputs['sigma'][slot] = sigma
+        self.dirty = True
+
+    def _update_glft_coefficients(self, n: int):
+        """
+        重新计算参数发生变化的槽位的GLFT系数
+
+        库存以下单数量为单位（Δ=1），ξ=γ：
+            c1 = ln(1 + γ/k) / γ
+            c2 = sqrt(γ / (2Ak) * (1 + γ/k)^(k/γ + 1))
+        """
+        inputs = self.inputs
+        stale = np.isnan(inputs['glft_c1'][:n])
+        if stale.any():
+            gamma = inputs['glft_gamma'][:n][stale]
+            a = inputs['glft_a'][:n][stale]
+            k = inputs['glft_k'][:n][stale]
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                ratio = gamma / k
+                c1 = np.log1p(ratio) / gamma
+                c2 = np.sqrt(gamma / (2 * a * k) * np.exp((k / gamma + 1) * np.log1p(ratio)))
+            valid = (gamma > 0) & (a > 0) & (k > 0) & np.isfinite(c1) & np.isfinite(c2)
+            # 参数无效的槽位系数记为inf，报价时退回基础价差，同时避免每次都重新计算
+            inputs['glft_c1'][:n][stale] = np.where(valid, c1, np.inf)
+            inputs['glft_c2'][:n][stale] = np.where(valid, c2, np.inf)
+            self.coefficient_updates += 1
+        self.coefficients_dirty = False
+
+    def set_state(self, slot: int, stock_ratio: float, long_size: float, short_size: float,
+                  balance: Optional[float], mid: Optional[float], base_price: Optional[float],
+                  order_amount: Optional[float], inventory: float = 0.0):
+        """更新库存、余额、价格和期望下单数量"""
+        inputs = self.inputs
+        inputs['stock_ratio'][slot] = stock_ratio
+        inputs['long_size'][slot] = long_size or 0.0
+        inputs['short_size'][slot] = short_size or 0.0
+        inputs['balance'][slot] = np.nan if balance is None else balance
+        inputs['mid'][slot] = np.nan if mid is None else mid
+        inputs['base_price'][slot] = np.nan if base_price is None else base_price
+        inputs['order_amount'][slot] = order_amount or 0.0
+        inputs['inventory'][slot] = inventory
+        self.dirty = True
+
+    def set_mid(self, slot: int, mid: float):
+        """行情更新时只更新中间价"""
+        self.inputs['mid'][slot] = mid
+        self.dirty = True
+
+    def compute(self, spread_mode: Optional[str] = None):
+        """对所有交易对做一次向量化报价计算"""
+        start = time.perf_counter()
+        trade_config = get_trade_config()
+        if spread_mode is None:
+            spread_mode = getattr(trade_config, 'SPREAD_MODE', 'fixed')
+
+        n = self.count
+        inp = {name: values[:n] for name, values in self.inputs.items()}
+        direction = self.direction[:n]
+        base, min_spread, max_spread = inp['base_spread'], inp['min_spread'], inp['max_spread']
+
+        # 持仓比例：双向模式使用总持仓比例，单向模式只考虑对应方向的持仓价值
+        with np.errstate(divide='ignore', invalid='ignore'):
+            side_value = np.where(direction == 1, np.abs(inp['long_size'] * inp['mid']),
+                                  np.abs(inp['short_size'] * inp['mid']))
+            total_value = inp['balance'] + side_value
+            single_ratio = np.where(total_value > 0, side_value / total_value / inp['max_stock_ratio'], 0.0)
+            both_ratio = inp['stock_ratio'] / inp['max_stock_ratio']
+        ratio = np.nan_to_num(np.where(direction == 0, both_ratio, single_ratio))
+
+        if spread_mode in ('dynamic', 'hybrid'):
+            # AS模型动态价差：ratio从0到0.5时由min(或max)线性过渡到base，从0.5到1时由base过渡到max(或min)
+            low = ratio < 0.5
+            rising = np.where(low, 2 * (base - min_spread) * ratio + min_spread,
+                              2 * (max_spread - base) * (ratio - 0.5) + base)
+            falling = np.where(low, 2 * (base - max_spread) * ratio + max_spread,
+                               2 * (min_spread - base) * (ratio - 0.5) + base)
+            # 做多和双向：持仓越多买单价差越大；只做空：持仓越多卖单价差越大
+            dynamic_buy = np.where(direction == -1, falling, rising)
+            dynamic_sell = np.where(direction == -1, rising, falling)
+
+        if spread_mode == 'dynamic':
+            buy_spread, sell_spread = dynamic_buy, dynamic_sell
+        elif spread_mode == 'hybrid':
+            # 低库存使用固定价差，高库存使用动态价差，中间线性插值
+            safe = getattr(trade_config, 'INVENTORY_SAFE_THRESHOLD', 0.4)
+            risk = getattr(trade_config, 'INVENTORY_RISK_THRESHOLD', 0.7)
+            factor = np.clip((ratio - safe) / (risk - safe), 0.0, 1.0)
+            buy_spread = base * (1 - factor) + dynamic_buy * factor
+            sell_spread = base * (1 - factor) + dynamic_sell * factor
+        elif spread_mode == 'glft':
+            # GLFT闭式解：半价差 = c1 + σ·c2/2，库存偏移 = σ·c2·q
+            if self.coefficients_dirty:
+                self._update_glft_coefficients(n)
+            c1, c2, sigma = inp['glft_c1'], inp['glft_c2'], inp['sigma']
+            with np.errstate(invalid='ignore'):
+                half_spread = c1 + 0.5 * sigma * c2
+                skew = sigma * c2 * inp['inventory']
+                valid = np.isfinite(half_spread) & np.isfinite(skew)
+            buy_spread = np.where(valid, half_spread + skew, base)
+            sell_spread = np.where(valid, half_spread - skew, base)
+        else:
+            if spread_mode != 'fixed' and spread_mode not in self._warned_modes:
+                self._warned_modes.add(spread_mode)
+                logger.warning(f"未知价差模式'{spread_mode}'，使用固定价差")
+            buy_spread = sell_spread = base
+
+        # 确保价差在合理范围内
+        buy_spread = np.maximum(min_spread, np.minimum(max_spread, buy_spread))
+        sell_spread = np.maximum(min_spread, np.minimum(max_spread, sell_spread))
+
+        # 价格按精度取整
+        price_scale = inp['price_scale']
+        buy_price = np.round(inp['base_price'] * (1 - buy_spread) * price_scale) / price_scale
+        sell_price = np.round(inp['base_price'] * (1 + sell_spread) * price_scale) / price_scale
+
+        # 下单数量：按精度取整，不低于最小数量，订单价值不足时向上取整到最小价值
+        amount_scale = inp['amount_scale']
+        amount = np.maximum(np.round(inp['order_amount'] * amount_scale) / amount_scale, inp['min_amount'])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buy_min = np.ceil(inp['min_value'] / buy_price * amount_scale) / amount_scale
+            sell_min = np.ceil(inp['min_value'] / sell_price * amount_scale) / amount_scale
+        buy_size = np.where(amount * buy_price < inp['min_value'], buy_min, amount)
+        sell_size = np.where(amount * sell_price < inp['min_value'], sell_min, amount)
+
+        out = self.outputs
+        out['ratio'][:n] = ratio
+        out['buy_spread'][:n] = buy_spread
+        out['sell_spread'][:n] = sell_spread
+        out['buy_price'][:n] = buy_price
+        out['sell_price'][:n] = sell_price
+        out['buy_size'][:n] = buy_size
+        out['sell_size'][:n] = sell_size
+
+        self.dirty = False
+        self.compute_count += 1
+        self.last_compute_time = time.perf_counter() - start
+
+    def quote(self, slot: int) -> Dict[str, float]:
+        """获取单个交易对的报价，状态有变化时先重新计算全部交易对"""
+        if self.dirty:
+            self.compute()
+        return {name: float(values[slot]) for name, values in self.outputs.items()}
+
+    def get_all_quotes(self) -> Dict[str, Dict[str, float]]:
+        """获取所有交易对的报价"""
+        if self.dirty:
+            self.compute()
+        return {symbol: self.quote(slot) for symbol, slot in self.slots.items()}
+
+
+# 全局报价引擎实例
+_quote_engine = None
+
+
+def get_quote_engine() -> QuoteEngine:
+    """获取全局报价引擎实例"""
+    global _quote_engine
+    if _quote_engine is None:
+        _quote_engine = QuoteEngine()
+    return _quote_engine
+
+
+if __name__ == "__main__":
+    # 计算耗时测试
+    engine = QuoteEngine()
+    rng = np.random.default_rng(0)
+    directions = ['both', 'long', 'short']
+    for i in range(200):
+        slot = engine.register(f"SYM{i}/USDT:USDT", directions[i % 3])
+        engine.set_params(slot, 0.0005, 0.0004, 0.0015, 0.25, 0.001, 2, 3, 5.5)
+        price = float(rng.uniform(1, 50000))
+        engine.set_state(slot, float(rng.uniform(0, 0.3)), float(rng.uniform(0, 1)), float(rng.uniform(0, 1)),
+                         1000.0, price, price, 0.01)
+
+        engine.set_glft_params(slot, 500.0, 1.0, 5000.0)
+        engine.set_sigma(slot, 6e-5)
+
+    for mode in ('fixed', 'dynamic', 'hybrid', 'glft'):
+        rounds = 1000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            engine.set_mid(0, engine.inputs['mid'][0])
+            engine.compute(mode)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"{mode}: {engine.count}个交易对，单次计算 {elapsed * 1e6:.1f}us")
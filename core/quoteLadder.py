@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多档报价阶梯
+由报价引擎给出的第一档买卖价格和数量，按间距和数量倍数展开为每个方向、每种意图(开仓/平仓)的N档目标订单，
+与实际挂单的比较由orderReconciler完成。
+"""
+
+from typing import Dict, List, Optional
+
+
+def build_ladder(expected_orders: List[dict], buy_price: float, sell_price: float,
+                 buy_size: float, sell_size: float, levels: int, spacing: float,
+                 size_multiplier: float, price_precision: int, amount_precision: int,
+                 min_amount: float, reduce_capacity: Optional[Dict[str, float]] = None) -> List[dict]:
+    """
+    展开目标阶梯
+
+    Args:
+        expected_orders: _calculate_expected_orders()返回的每种意图的订单
+        buy_price/sell_price: 第一档价格
+        buy_size/sell_size: 第一档数量
+        levels: 每种意图的档数
+        spacing: 相邻档位的相对价格间距
+        size_multiplier: 相邻档位的数量倍数
+        reduce_capacity: 只减仓订单可用的持仓数量 {'buy': 空头持仓, 'sell': 多头持仓}，
+            累计数量超过持仓的平仓档位不再挂出
+
+    Returns:
+        目标订单列表，每项包含side、reduce_only、type、level、price、amount
+    """
+    reduce_capacity = reduce_capacity or {}
+    targets = []
+    for order_info in expected_orders:
+        side = order_info['side']
+        reduce_only = order_info['reduce_only']
+        first_price = buy_price if side == 'buy' else sell_price
+        first_size = buy_size if side == 'buy' else sell_size
+        direction = -1 if side == 'buy' else 1
+        remaining = reduce_capacity.get(side) if reduce_only else None
+
+        for level in range(levels):
+            price = round(first_price * (1 + direction * spacing * level), price_precision)
+            amount = round(max(first_size * size_multiplier ** level, min_amount), amount_precision)
+            if remaining is not None:
+                if remaining < min_amount:
+                    break
+                # 平仓档位总量不超过持仓，第一档保持原有行为
+                if level > 0 and amount > remaining:
+                    break
+                remaining -= amount
+            targets.append({
+                'side': side,
+                'reduce_only': reduce_only,
+                'type': order_info['type'] if level == 0 else f"{order_info['type']}{level + 1}档",
+                'level': level,
+                'price': price,
+                'amount': amount,
+            })
+    return targets
+
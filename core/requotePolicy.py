@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报价刷新策略
+基准价偏离上次报价基准超过偏差带（PRICE_DEVIATION_FACTOR × 当前单边价差）时刷新报价，
+同时限制报价最短存活时间和每个交易对的刷新频率（令牌桶），并统计被抑制的刷新次数。
+"""
+
+import time
+from typing import Dict, Optional
+
+from config.config import get_trade_config
+
+
+class RequotePolicy:
+    """单个交易对的报价刷新策略"""
+
+    def __init__(self, symbol: str, deviation_factor: Optional[float] = None,
+                 min_lifetime: Optional[float] = None, max_per_minute: Optional[float] = None,
+                 burst: Optional[int] = None):
+        trade_config = get_trade_config()
+        self.symbol = symbol
+        self.deviation_factor = trade_config.PRICE_DEVIATION_FACTOR if deviation_factor is None else deviation_factor
+        self.min_lifetime = trade_config.REQUOTE_MIN_LIFETIME if min_lifetime is None else min_lifetime
+        self.refill_rate = (trade_config.REQUOTE_MAX_PER_MINUTE if max_per_minute is None else max_per_minute) / 60.0
+        self.burst = trade_config.REQUOTE_BURST if burst is None else burst
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        # 最近一次报价的基准价、单边价差和时间
+        self.quoted_base: Optional[float] = None
+        self.quoted_spread = 0.0
+        self.quoted_at = 0.0
+
+        self.counters: Dict[str, int] = {
+            'requotes': 0,              # 因价格偏离触发的刷新
+            'within_band': 0,           # 偏离未超过偏差带
+            'suppressed_lifetime': 0,   # 报价存活时间不足被抑制
+            'suppressed_rate': 0,       # 超过刷新频率上限被抑制
+        }
+
+    def on_quoted(self, base_price: float, spread: float, now: Optional[float] = None):
+        """记录一次报价（无论由成交、恢复还是价格偏离触发）"""
+        self.quoted_base = base_price
+        self.quoted_spread = spread
+        self.quoted_at = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.refill_rate)
+        self.last_refill = now
+
+    def deviation_band(self) -> float:
+        return self.deviation_factor * self.quoted_spread
+
+    def should_requote(self, base_price: float, now: Optional[float] = None) -> bool:
+        """
+        判断是否需要刷新报价，返回True时消耗一个令牌
+
+        Args:
+            base_price: 当前报价会使用的基准价
+        """
+        if self.quoted_base is None or not base_price:
+            return False
+        deviation = abs(base_price - self.quoted_base) / self.quoted_base
+        if deviation <= self.deviation_band():
+            self.counters['within_band'] += 1
+            return False
+
+        now = time.monotonic() if now is None else now
+        if now - self.quoted_at < self.min_lifetime:
+            self.counters['suppressed_lifetime'] += 1
+            return False
+        self._refill(now)
+        if self.tokens < 1:
+            self.counters['suppressed_rate'] += 1
+            return False
+        self.tokens -= 1
+        self.counters['requotes'] += 1
+        return True
+
+    def get_stats(self) -> Dict[str, float]:
+        return dict(self.counters, tokens=self.tokens, deviation_band=self.deviation_band())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+下单前风控闸门
+在placeOrder中同步检查SecurityConfig中的限额：单笔订单名义价值、单个交易对持仓名义价值、
+日内亏损和最大回撤。限额在创建时读入，权益的日初值、峰值和对应的止损线在权益推送时增量更新，
+每次检查只有几次比较，不做任何I/O。只减仓订单始终放行。
+
+日内亏损或回撤触线后闸门进入熔断状态，只放行只减仓订单，
+同时并发撤销所有交易对的挂单，整体耗时受RISK_CANCEL_TIMEOUT限制。
+日内亏损熔断在下一个UTC日自动解除，回撤熔断需要调用reset()解除。
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+from config.config import get_security_config
+from util.sLogger import logger
+
+CancelHandler = Callable[[], Awaitable[object]]
+
+_SECONDS_PER_DAY = 86400
+
+
+class RiskGate:
+    """进程内共享的风控闸门（所有交易对使用同一个账户）"""
+
+    def __init__(self, max_order_notional: Optional[float] = None, max_position_notional: Optional[float] = None,
+                 daily_loss_limit: Optional[float] = None, max_drawdown_limit: Optional[float] = None,
+                 cancel_timeout: Optional[float] = None):
+        security_config = get_security_config()
+        self.enabled = security_config.RISK_GATE_ENABLED
+        self.max_order_notional = float(security_config.MAX_ORDER_SIZE if max_order_notional is None
+                                        else max_order_notional)
+        self.max_position_notional = float(security_config.MAX_POSITION_SIZE if max_position_notional is None
+                                           else max_position_notional)
+        self.daily_loss_limit = security_config.DAILY_LOSS_LIMIT if daily_loss_limit is None else daily_loss_limit
+        self.max_drawdown_limit = (security_config.MAX_DRAWDOWN_LIMIT if max_drawdown_limit is None
+                                   else max_drawdown_limit)
+        self.cancel_timeout = security_config.RISK_CANCEL_TIMEOUT if cancel_timeout is None else cancel_timeout
+
+        # 权益状态，在on_equity中增量更新
+        self.equity: Optional[float] = None
+        self.day: Optional[int] = None
+        self.day_start_equity = 0.0
+        self.peak_equity = 0.0
+        self.daily_floor = float('-inf')      # 日初权益 × (1 - 日亏损限制)
+        self.drawdown_floor = float('-inf')   # 峰值权益 × (1 - 最大回撤限制)
+
+        self.halted = False
+        self.halt_kind: Optional[str] = None  # 'daily' 或 'drawdown'
+        self.halt_reason: Optional[str] = None
+
+        self.cancel_handlers: Dict[str, CancelHandler] = {}
+        self._cancel_task: Optional[asyncio.Task] = None
+        self.last_cancel_ms: Optional[float] = None
+        self.counters: Dict[str, int] = {
+            'checks': 0,
+            'rejected_halted': 0,
+            'rejected_order_size': 0,
+            'rejected_position_size': 0,
+            'breaches': 0,
+        }
+
+    # ========== 注册 ==========
+
+    def register(self, symbol: str, cancel_all: CancelHandler):
+        """登记交易对的撤销全部挂单协程函数，熔断时调用"""
+        self.cancel_handlers[symbol] = cancel_all
+
+    def unregister(self, symbol: str):
+        self.cancel_handlers.pop(symbol, None)
+
+    # ========== 下单检查（热路径） ==========
+
+    def check(self, side: str, amount: float, price: float, reduce_only: bool,
+              long_size: float = 0.0, short_size: float = 0.0, pending: float = 0.0) -> Optional[str]:
+        """
+        检查一笔订单是否允许下单
+
+        Args:
+            long_size/short_size: 交易对当前多头、空头持仓数量，用于计算开仓后的持仓名义价值
+            pending: 同方向其它开仓挂单（或同一阶梯中已放行的档位）的数量，全部成交时同样计入持仓
+
+        Returns:
+            None表示放行，否则为拒绝原因
+        """
+        self.counters['checks'] += 1
+        if reduce_only or not self.enabled:
+            return None
+        if self.halted:
+            self.counters['rejected_halted'] += 1
+            return self.halt_reason
+        notional = amount * price
+        if notional > self.max_order_notional:
+            self.counters['rejected_order_size'] += 1
+            return f"订单名义价值{notional:.2f}超过单笔限额{self.max_order_notional}"
+        worst = ((long_size if side == 'buy' else short_size) + pending + amount) * price
+        if worst > self.max_position_notional:
+            self.counters['rejected_position_size'] += 1
+            return f"开仓挂单全部成交后持仓名义价值{worst:.2f}超过限额{self.max_position_notional}"
+        return None
+
+    # ========== 权益更新 ==========
+
+    def on_equity(self, equity: Optional[float], now: Optional[float] = None):
+        """
+        权益推送（包含已实现和未实现盈亏），增量更新日初值、峰值和止损线并检查是否触线
+        """
+        if not self.enabled or equity is None or equity <= 0:
+            return
+        now = time.time() if now is None else now
+        day = int(now // _SECONDS_PER_DAY)
+        if day != self.day:
+            self.day = day
+            self.day_start_equity = equity
+            self.daily_floor = equity * (1 - self.daily_loss_limit)
+            if self.halt_kind == 'daily':
+                logger.info(f"风控闸门：进入新的UTC日，解除日内亏损熔断，日初权益: {equity}")
+                self._clear_halt()
+        if equity > self.peak_equity:
+            self.peak_equity = equity
+            self.drawdown_floor = equity * (1 - self.max_drawdown_limit)
+        self.equity = equity
+
+        if self.halted:
+            return
+        if equity <= self.daily_floor:
+            self._trip('daily', f"日内亏损超过限制{self.daily_loss_limit:.2%}"
+                                f"（日初权益{self.day_start_equity}，当前{equity}）")
+        elif equity <= self.drawdown_floor:
+            self._trip('drawdown', f"回撤超过限制{self.max_drawdown_limit:.2%}"
+                                   f"（峰值权益{self.peak_equity}，当前{equity}）")
+
+    def _trip(self, kind: str, reason: str):
+        self.halted = True
+        self.halt_kind = kind
+        self.halt_reason = f"风控熔断: {reason}"
+        self.counters['breaches'] += 1
+        logger.error(f"{self.halt_reason}，只允许只减仓订单，撤销所有交易对挂单")
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._cancel_task is None or self._cancel_task.done():
+            self._cancel_task = loop.create_task(self.cancel_all())
+
+    def _clear_halt(self):
+        self.halted = False
+        self.halt_kind = None
+        self.halt_reason = None
+
+    def reset(self):
+        """手动解除熔断，并以当前权益作为新的峰值"""
+        self._clear_halt()
+        if self.equity is not None:
+            self.peak_equity = self.equity
+            self.drawdown_floor = self.equity * (1 - self.max_drawdown_limit)
+        logger.info("风控闸门：熔断已手动解除")
+
+    async def cancel_all(self) -> bool:
+        """并发撤销所有交易对的挂单，返回是否在时限内全部完成"""
+        start = time.perf_counter()
+        handlers = list(self.cancel_handlers.items())
+        tasks = [asyncio.ensure_future(handler()) for _, handler in handlers]
+        completed = True
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.cancel_timeout) if tasks else (set(), set())
+            for task in pending:
+                task.cancel()
+            failed = [symbol for (symbol, _), task in zip(handlers, tasks)
+                      if task in pending or task.cancelled() or task.exception() is not None
+                      or task.result() is False]
+            completed = not failed
+            if failed:
+                logger.error(f"风控熔断撤单未在{self.cancel_timeout}秒内全部完成，失败的交易对: {failed}")
+        finally:
+            self.last_cancel_ms = (time.perf_counter() - start) * 1000
+        logger.warning(f"风控熔断撤单完成，{len(handlers)}个交易对，耗时{self.last_cancel_ms:.0f}ms")
+        return completed
+
+    def get_stats(self) -> Dict[str, object]:
+        return dict(self.counters, halted=self.halted, halt_reason=self.halt_reason, equity=self.equity,
+                    daily_floor=self.daily_floor, drawdown_floor=self.drawdown_floor,
+                    last_cancel_ms=self.last_cancel_ms)
+
+
+_risk_gate: Optional[RiskGate] = None
+
+
+def get_risk_gate() -> RiskGate:
+    """获取全局风控闸门实例"""
+    global _risk_gate
+    if _risk_gate is None:
+        _risk_gate = RiskGate()
+    return _risk_gate
+
+
+if __name__ == "__main__":
+    # 检查耗时测试
+    gate = RiskGate(max_order_notional=100000, max_position_notional=1000000,
+                    daily_loss_limit=0.05, max_drawdown_limit=0.10)
+    gate.on_equity(10000.0)
+    rounds = 1000000
+
+    cases = {
+        '放行': ('buy', 0.01, 50000.0, False),
+        '只减仓': ('sell', 0.01, 50000.0, True),
+        '超单笔限额': ('buy', 10.0, 50000.0, False),
+    }
+    for name, (side, amount, price, reduce_only) in cases.items():
+        start = time.perf_counter()
+        for _ in range(rounds):
+            gate.check(side, amount, price, reduce_only, 0.1, 0.05)
+        elapsed = (time.perf_counter() - start) / rounds
+        print(f"check({name}): {elapsed * 1e9:.0f}ns")
+
+    start = time.perf_counter()
+    for i in range(rounds):
+        gate.on_equity(10000.0 + (i & 7))
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"on_equity: {elapsed * 1e9:.0f}ns")
+
+    async def breach():
+        async def cancel(delay):
+            await asyncio.sleep(delay)
+            return True
+        for i in range(20):
+            gate.register(f"SYM{i}/USDT:USDT", lambda d=0.001 * i: cancel(d))
+        gate.on_equity(8000.0)
+        await gate._cancel_task
+        print(f"熔断撤单: {len(gate.cancel_handlers)}个交易对，耗时{gate.last_cancel_ms:.1f}ms")
+        print(f"check(熔断): 拒绝原因 {gate.check('buy', 0.01, 50000.0, False)}")
+
+    asyncio.run(breach())
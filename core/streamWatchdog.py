@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据流看门狗
+记录每个交易对各websocket数据流（订单簿、订单、持仓、余额、K线）的最后消息时间和消息频率，
+检测没有报错但不再推送的静默停滞，只对停滞的数据流重新订阅，不做全量状态恢复。
+
+- 持续推送的数据流（book、ohlcv）：静默时间超过 STALL_MULTIPLIER × 平均消息间隔 判定停滞
+- 事件驱动的数据流（orders、positions、balance）：发送下单、改单、撤单请求之前（成交则在订单推送报告成交时）
+  通过expect()登记，登记时间之后的任何一条消息都视为确认，推送可能早于REST响应到达；
+  请求失败时用cancel_expect()撤回登记。超过EVENT_ACK_TIMEOUT仍未收到推送判定停滞，
+  收到消息前连续的超时累计为重新订阅失败
+
+重新订阅：删除ccxt连接上该数据流的订阅记录，并以StreamStalled拒绝正在等待的future，
+数据流循环收到异常后再次调用watch方法，ccxt会重新发送订阅请求。
+同一数据流连续重新订阅失败FULL_RESYNC_AFTER次后，才交给TradeManager.networkHelper全量恢复。
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config.config import get_stream_watchdog_config
+from util.sLogger import logger
+
+# 各数据流在ccxt订阅/消息哈希中对应的频道名（哈希按':'分段匹配）
+STREAM_CHANNELS: Dict[str, Tuple[str, ...]] = {
+    'book': ('orderbook',),
+    'orders': ('order',),
+    'positions': ('positions',),
+    'balance': ('balance',),
+    'ohlcv': ('candles', 'kline'),
+}
+# 持续推送、按消息频率判断停滞的数据流
+RATE_STREAMS = ('book', 'ohlcv')
+
+
+class StreamStalled(Exception):
+    """数据流静默停滞，由看门狗注入到等待中的watch调用"""
+
+
+class _StreamState:
+    __slots__ = ('name', 'last_message', 'message_count', 'interval_ewma', 'ack_deadline', 'pending_acks',
+                 'stalled_at', 'resubscribed_at', 'attempts', 'stall_count')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.last_message: Optional[float] = None
+        self.message_count = 0
+        self.interval_ewma = 0.0
+        self.ack_deadline: Optional[float] = None   # 事件驱动数据流等待推送的截止时间
+        self.pending_acks = 0                       # 登记后尚未确认的请求数
+        self.stalled_at: Optional[float] = None     # 本次停滞的检测时间，恢复后清空
+        self.resubscribed_at = 0.0
+        self.attempts = 0                           # 本次停滞已重新订阅的次数，收到消息后清零
+        self.stall_count = 0
+
+
+class StreamWatchdog:
+    """单个交易对的数据流看门狗"""
+
+    # 平均消息间隔的EWMA系数
+    INTERVAL_ALPHA = 0.05
+
+    def __init__(self, symbolName: str, wsExchange, full_resync: Optional[Callable] = None,
+                 symbol_filter: bool = True):
+        """
+        Args:
+            full_resync: 重新订阅多次失败后调用的全量恢复协程函数（TradeManager.networkHelper）
+            symbol_filter: 公共数据流只重新订阅哈希中包含本交易对的订阅
+        """
+        self.symbolName = symbolName
+        self.wsExchange = wsExchange
+        self.full_resync = full_resync
+        self.symbol_filter = symbol_filter
+        self.config = get_stream_watchdog_config()
+        self.streams: Dict[str, _StreamState] = {}
+        self.run = True
+
+        self.recovery_times: List[float] = []
+        self.resubscribe_count = 0
+        self.full_resync_count = 0
+
+    def _state(self, stream: str) -> _StreamState:
+        state = self.streams.get(stream)
+        if state is None:
+            state = _StreamState(stream)
+            self.streams[stream] = state
+        return state
+
+    # ========== 数据流循环调用 ==========
+
+    def touch(self, stream: str, now: Optional[float] = None):
+        """数据流收到一条消息"""
+        now = time.monotonic() if now is None else now
+        state = self._state(stream)
+        if state.last_message is not None:
+            dt = now - state.last_message
+            if state.message_count <= 1:
+                state.interval_ewma = dt
+            else:
+                state.interval_ewma += self.INTERVAL_ALPHA * (dt - state.interval_ewma)
+        state.last_message = now
+        state.message_count += 1
+        state.ack_deadline = None
+        state.pending_acks = 0
+        if state.stalled_at is not None:
+            recovery = now - state.stalled_at
+            self.recovery_times.append(recovery)
+            logger.info(f"{self.symbolName}数据流{stream}已恢复，耗时{recovery:.2f}秒，重新订阅{state.attempts}次")
+            state.stalled_at = None
+            state.attempts = 0
+
+    def last_message(self, stream: str) -> Optional[float]:
+        state = self.streams.get(stream)
+        return state.last_message if state is not None else None
+
+    def expect(self, stream: str, timeout: Optional[float] = None, now: Optional[float] = None,
+               since: Optional[float] = None):
+        """
+        登记一次应当收到的推送，已有等待时保留较早的截止时间
+
+        Args:
+            since: 确认窗口的起点（默认为当前时间），该时间之后已收到过消息时视为已确认，不再登记
+        """
+        now = time.monotonic() if now is None else now
+        state = self._state(stream)
+        if since is not None and state.last_message is not None and state.last_message >= since:
+            return
+        state.pending_acks += 1
+        if state.ack_deadline is None:
+            state.ack_deadline = now + (self.config.EVENT_ACK_TIMEOUT if timeout is None else timeout)
+
+    def cancel_expect(self, stream: str):
+        """请求失败时撤回一次登记，没有其它等待中的请求时取消截止时间"""
+        state = self.streams.get(stream)
+        if state is None or state.pending_acks == 0:
+            return
+        state.pending_acks -= 1
+        if state.pending_acks == 0:
+            state.ack_deadline = None
+
+    # ========== 停滞检测 ==========
+
+    def stall_threshold(self, stream: str) -> float:
+        """持续推送数据流的静默阈值"""
+        state = self.streams[stream]
+        if stream == 'book':
+            low, high = self.config.BOOK_STALL_MIN, self.config.BOOK_STALL_MAX
+        else:
+            low, high = self.config.OHLCV_STALL_MIN, self.config.OHLCV_STALL_MAX
+        if state.message_count < self.config.MIN_RATE_SAMPLES:
+            return high
+        return min(max(self.config.STALL_MULTIPLIER * state.interval_ewma, low), high)
+
+    def _is_silent(self, state: _StreamState, now: float) -> bool:
+        if state.name in RATE_STREAMS:
+            if state.stalled_at is not None:
+                # 已判定停滞：重新订阅后等待一段时间仍无消息才算失败
+                return now - state.resubscribed_at >= self.config.RESUBSCRIBE_TIMEOUT
+            return state.last_message is not None and now - state.last_message > self.stall_threshold(state.name)
+        # 事件驱动的数据流没有新事件时本来就不推送，只在下一次应收推送超时时再次判定
+        return state.ack_deadline is not None and now > state.ack_deadline
+
+    def find_stalled(self, now: Optional[float] = None) -> List[str]:
+        now = time.monotonic() if now is None else now
+        return [name for name, state in self.streams.items() if self._is_silent(state, now)]
+
+    # ========== 恢复 ==========
+
+    def _matches(self, stream: str, message_hash) -> bool:
+        if not isinstance(message_hash, str):
+            return False
+        parts = message_hash.split(':')
+        if not any(channel in parts for channel in STREAM_CHANNELS[stream]):
+            return False
+        if self.symbol_filter and stream in RATE_STREAMS:
+            return self.symbolName in message_hash
+        return True
+
+    def resubscribe(self, stream: str) -> int:
+        """
+        删除数据流的订阅记录并唤醒等待中的watch调用
+
+        Returns:
+            被拒绝的等待中future数量
+        """
+        error = StreamStalled(f"{self.symbolName}数据流{stream}静默停滞，重新订阅")
+        rejected = 0
+        for client in list(getattr(self.wsExchange, 'clients', {}).values()):
+            for message_hash in [h for h in client.subscriptions if self._matches(stream, h)]:
+                del client.subscriptions[message_hash]
+            for message_hash in [h for h in client.futures if self._matches(stream, h)]:
+                client.reject(error, message_hash)
+                rejected += 1
+        return rejected
+
+    async def handle_stall(self, stream: str, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        state = self.streams[stream]
+        if state.stalled_at is None:
+            state.stalled_at = now
+            state.stall_count += 1
+        state.ack_deadline = None
+        state.pending_acks = 0
+
+        if state.attempts >= self.config.FULL_RESYNC_AFTER and self.full_resync is not None:
+            logger.warning(
+                f"{self.symbolName}数据流{stream}重新订阅{state.attempts}次仍无消息，执行全量恢复")
+            self.full_resync_count += 1
+            state.attempts = 0
+            state.resubscribed_at = now
+            await self.full_resync()
+            return
+
+        state.attempts += 1
+        state.resubscribed_at = now
+        self.resubscribe_count += 1
+        rejected = self.resubscribe(stream)
+        silence = f"最后消息距今{now - state.last_message:.1f}秒" if state.last_message is not None else "尚未收到消息"
+        logger.warning(
+            f"{self.symbolName}数据流{stream}静默停滞（{silence}），"
+            f"第{state.attempts}次重新订阅，唤醒{rejected}个等待中的请求")
+
+    async def check(self, now: Optional[float] = None):
+        """检查一次所有数据流"""
+        for stream in self.find_stalled(now):
+            await self.handle_stall(stream, now)
+
+    async def watch(self, is_recovering: Optional[Callable[[], bool]] = None):
+        """
+        看门狗主循环
+
+        Args:
+            is_recovering: 返回True时（全量恢复进行中）跳过检查
+        """
+        logger.info(f"{self.symbolName}数据流看门狗启动，检查间隔: {self.config.CHECK_INTERVAL}秒")
+        while self.run:
+            try:
+                await asyncio.sleep(self.config.CHECK_INTERVAL)
+                if is_recovering is not None and is_recovering():
+                    continue
+                await self.check()
+            except asyncio.CancelledError:
+                logger.info(f"{self.symbolName}数据流看门狗任务已取消")
+                self.run = False
+            except Exception as e:
+                logger.error(f"{self.symbolName}数据流看门狗发生错误: {e}")
+
+    def stop(self):
+        self.run = False
+
+    def get_stats(self) -> Dict[str, object]:
+        """各数据流的消息频率和恢复统计"""
+        now = time.monotonic()
+        streams = {}
+        for name, state in self.streams.items():
+            streams[name] = {
+                'messages': state.message_count,
+                'rate': 1.0 / state.interval_ewma if state.interval_ewma > 0 else 0.0,
+                'silence': now - state.last_message if state.last_message is not None else None,
+                'stalls': state.stall_count,
+                'stalled': state.stalled_at is not None,
+            }
+        return {
+            'streams': streams,
+            'resubscribes': self.resubscribe_count,
+            'full_resyncs': self.full_resync_count,
+            'mttr': sum(self.recovery_times) / len(self.recovery_times) if self.recovery_times else None,
+        }
@@ -1,19 +1,27 @@
+from collections import deque
 from decimal import Decimal
+import random
 import sys
 import time
-from turtle import up
 from util.sLogger import logger
 from util import tradeUtil
 import asyncio
 from core.dataRecorder import data_recorder
-from core.volatilityManager import VolatilityManager
 from util.performanceMonitor import get_performance_monitor, LatencyTracker
 import ccxt.pro
-from config.config import get_trade_config
+from config.config import get_trade_config, get_intensity_config, get_stream_watchdog_config, get_network_config
+from util.marketCache import get_market_cache
+from core.quoteEngine import get_quote_engine
+from core import quoteLadder
+from core.orderReconciler import reconcile
+from core.requotePolicy import RequotePolicy
+from core.streamWatchdog import StreamWatchdog
+from core.riskGate import get_risk_gate
+from util.records import to_order, to_positions
 
 
 class TradeManager:
-    def __init__(self,  symbolName: str, wsExchange: ccxt.pro.Exchange, baseSpread=0.001, minSpread=0.0008, maxSpread=0.003, orderCoolDown=0.1, maxStockRadio=0.25, orderAmountRatio=0.05, coin='USDT', direction='both'):
+    def __init__(self,  symbolName: str, wsExchange: ccxt.pro.Exchange, baseSpread=0.001, minSpread=0.0008, maxSpread=0.003, orderCoolDown=0.1, maxStockRadio=0.25, orderAmountRatio=0.05, coin='USDT', direction='both', ladderLevels=1, ladderSpacing=0.0005, ladderSizeMultiplier=1.0, ladderTolerance=0.0002):
         self.symbolName = symbolName
         self.wsExchange = wsExchange
         # 价差需要除以2，因为是双边应用
@@ -49,6 +57,15 @@ class TradeManager:
         self.netPosition = 0.0  # 净持仓数量
         self.longSize = 0.0     # 做多数量
         self.shortSize = 0.0    # 做空数量
+        # 多档报价阶梯
+        self.ladderLevels = max(1, int(ladderLevels))  # 每个方向每种意图的挂单档数
+        self.ladderSpacing = ladderSpacing  # 相邻档位的相对价格间距
+        self.ladderSizeMultiplier = ladderSizeMultiplier  # 相邻档位的数量倍数
+        self.ladderTolerance = ladderTolerance  # 档位价格容差
+        self.liveOrders = {}  # 订单ID -> 认为仍在挂单中的订单（本程序挂出的和交易所推送的）
+        self.retiredOrderIds = deque(maxlen=200)  # 最近撤销或改单替换的订单ID
+        self.lastTargets = None  # 最近一次同步的目标阶梯
+        self._reconcile_lock = asyncio.Lock()
         # 从配置文件读取配置项
         trade_config = get_trade_config()
 
@@ -66,21 +83,79 @@ class TradeManager:
         self.dynamicOrderAmount = trade_config.DYNAMIC_ORDER_AMOUNT  # 是否启用动态订单数量调整
         self.initialOrderAmount = None  # 存储程序第一次运行时计算出的订单数量
 
-        # 波动率管理器
-        self.volatilityManager = VolatilityManager(
-            symbolName, wsExchange, self)
+        # 波动率管理器，在启动波动率监控时才创建
+        self.volatilityManager = None
         self.volatilityEnabled = True  # 是否启用波动率自动调节
         
+        # 报价引擎：所有交易对共享，本交易对占用一个槽位
+        self.quoteEngine = get_quote_engine()
+        self.quoteSlot = self.quoteEngine.register(symbolName, direction)
+        self.lastQuote = None
+        # 报价刷新策略：价格偏离上次报价基准超过偏差带时刷新
+        self.requotePolicy = RequotePolicy(symbolName)
+        self._requoting = False
+
+        # GLFT模式参数，A和k可由成交强度校准更新
+        self.glftGamma = trade_config.GLFT_GAMMA
+        self.glftA = trade_config.GLFT_A
+        self.glftK = trade_config.GLFT_K
+        # 成交强度校准器，GLFT模式下启动时才创建
+        self.intensityCalibrator = None
+
+        # 数据流看门狗：单个数据流静默时只重新订阅该数据流，多次失败才全量恢复
+        self.streamWatchdog = StreamWatchdog(symbolName, wsExchange, full_resync=self.networkHelper)
+        self.fullResyncCount = 0  # networkHelper全量恢复次数
+
+        # 下单前风控闸门（进程内共享），熔断时由闸门并发撤销所有交易对的挂单
+        self.riskGate = get_risk_gate()
+        self.riskGate.register(symbolName, self.cancelAllOrder)
+
         # 初始化性能监控器
         self.performance_monitor = get_performance_monitor()
         logger.info(f"{self.symbolName}性能监控器已启动")
 
     # 创建完对象后必须调用这个函数
-    async def initSymbolInfo(self):
+    async def initSymbolInfo(self, bootstrap=None):
+        """
+        初始化余额、市场信息、价格、挂单和持仓
+
+        市场信息从进程内共享的磁盘缓存读取，其余四个请求互不依赖，并发执行；
+        传入bootstrap时，余额、挂单、持仓这类账户级请求由所有交易对共享同一次请求结果。
+        """
         e = self.wsExchange
+        # 其它请求在ccxt内部都会先调用loadMarkets，因此先从缓存加载市场信息
+        try:
+            symbolInfo = e.markets or await get_market_cache().load_markets(e)
+        except Exception as ex:
+            symbolInfo = ex
+
+        if bootstrap is not None:
+            balanceRequest = bootstrap.fetch_balance(e)
+            ordersRequest = bootstrap.fetch_open_orders(e)
+            positionsRequest = bootstrap.fetch_positions(e)
+
+            def timed(phase, awaitable):
+                return bootstrap.timed(self.symbolName, phase, awaitable)
+        else:
+            balanceRequest = e.fetchBalance()
+            ordersRequest = e.fetchOpenOrders()
+            positionsRequest = e.fetchPositions()
+
+            def timed(phase, awaitable):
+                return awaitable
+
+        balance, ticker, allOrder, allPosition = await asyncio.gather(
+            timed('余额', balanceRequest),
+            timed('价格', e.fetchTicker(self.symbolName)),
+            timed('挂单', ordersRequest),
+            timed('持仓', positionsRequest),
+            return_exceptions=True
+        )
+
         # 初始化余额
         try:
-            balance = await e.fetchBalance()
+            if isinstance(balance, Exception):
+                raise balance
             logger.info(f"{self.symbolName}当前余额: {balance}")
 
             # 处理SUSDT余额问题，如果无法获取正确数量则使用假定值
@@ -102,7 +177,8 @@ class TradeManager:
 
         # 初始化交易对信息
         try:
-            symbolInfo = await e.loadMarkets(self.symbolName)
+            if isinstance(symbolInfo, Exception):
+                raise symbolInfo
             self.minOrderAmount = symbolInfo[self.symbolName]['limits']['amount']['min']
             pricePrecision = symbolInfo[self.symbolName]['precision']['price']
             amountPrecision = symbolInfo[self.symbolName]['precision']['amount']
@@ -128,7 +204,8 @@ class TradeManager:
 
         # 获取交易对价格
         try:
-            ticker = await e.fetchTicker(self.symbolName)
+            if isinstance(ticker, Exception):
+                raise ticker
             self.lastPrice = float(ticker['last'])
             logger.info(f"{self.symbolName}当前价格: {self.lastPrice}")
         except Exception as e:
@@ -137,9 +214,14 @@ class TradeManager:
 
         # 初始化未成交的订单信息
         try:
-            allOrder = await e.fetchOpenOrders()
+            if isinstance(allOrder, Exception):
+                raise allOrder
             openOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
             self.openOrders = openOrder
+            # 重启前遗留的挂单加入挂单簿，首次对账时保持、改单或撤销，避免重复挂出整套阶梯
+            self._mergeLiveOrders(openOrder)
+            if self.liveOrders:
+                logger.info(f"{self.symbolName}发现{len(self.liveOrders)}个遗留挂单，纳入挂单对账")
             # logger.info(f"{self.symbolName}当前订单: {self.openOrders}")
         except Exception as e:
             logger.error(f"{self.symbolName}初始化获取订单信息失败，终止程序: {e}")
@@ -147,7 +229,8 @@ class TradeManager:
 
         # 初始化持仓信息
         try:
-            allPosition = await e.fetchPositions()
+            if isinstance(allPosition, Exception):
+                raise allPosition
             await self.updatePosition(allPosition)
             # logger.info(f"{self.symbolName}当前持仓: {self.position}")
         except Exception as e:
@@ -161,7 +244,7 @@ class TradeManager:
     async def bindWebsocketManager(self, websocketManager):
         self.websocketManager = websocketManager
 
-    async def onOrderFilled(self, filled_orders=None):
+    async def onOrderFilled(self, filled_orders=None, missing_order_ids=None):
         """
         处理订单成交后的逻辑 - 优化版本，减少延迟
         """
@@ -170,9 +253,14 @@ class TradeManager:
 
         logger.info(f"{self.symbolName}处理订单成交事件，成交订单数量: {len(filled_orders)}")
 
-        # 清空当前挂单列表，因为它们已经成交
-        logger.info(f"{self.symbolName}订单成交，清空本地挂单列表: {len(self.openOrders)} -> 0")
-        self.openOrders = []
+        # 只移除成交或消失的订单，其余挂单保持不动
+        gone_ids = {order.id for order in filled_orders}
+        gone_ids.update(str(order_id) for order_id in missing_order_ids or [])
+        for order_id in gone_ids:
+            self.liveOrders.pop(order_id, None)
+        remaining = [order for order in self.openOrders if order.id not in gone_ids]
+        logger.info(f"{self.symbolName}订单成交，更新本地挂单列表: {len(self.openOrders)} -> {len(remaining)}")
+        self.openOrders = remaining
 
         # 使用性能监控器测量整个订单处理延迟
         monitor = get_performance_monitor()
@@ -185,6 +273,9 @@ class TradeManager:
             # 异步记录成交订单数据（不阻塞主流程）
             asyncio.create_task(self._record_filled_orders_async(filled_orders))
 
+            if self.intensityCalibrator:
+                self.intensityCalibrator.on_own_fills(filled_orders, self.lastPrice)
+
             # 更新订单状态和持仓信息
             try:
                 # 优化1：移除fetchOpenOrders调用，因为WebSocket已提供实时订单更新
@@ -221,26 +312,26 @@ class TradeManager:
         """
         try:
             for order in filled_orders:
-                if order and 'filled' in order and order['filled'] > 0:
+                if order and order.filled > 0:
                     # 更新最近成交订单价格
-                    transaction_price = order['average'] or order['price']
+                    transaction_price = order.fill_price
                     if transaction_price:
-                        self.lastTransactionOrderPrice = float(transaction_price)
+                        self.lastTransactionOrderPrice = transaction_price
                         logger.info(f"{self.symbolName}更新最近成交价格: {self.lastTransactionOrderPrice}")
 
                     # 计算手续费（如果订单中没有手续费信息，使用估算值）
-                    fee = order.get('fee', {}).get('cost', 0)
-                    if fee == 0 and 'cost' in order and order['cost'] is not None:
+                    fee = order.fee
+                    if fee == 0 and order.cost:
                         # 估算手续费为成交金额的0.1%
-                        fee = order['cost'] * 0.0002
+                        fee = order.cost * 0.0002
 
                     await data_recorder.record_trade(
                         symbol=self.symbolName,
-                        side=order['side'],
-                        amount=order['filled'],
+                        side=order.side,
+                        amount=order.filled,
                         price=transaction_price,
                         fee=fee,
-                        order_id=order['id']
+                        order_id=order.id
                     )
         except Exception as e:
             logger.error(f"{self.symbolName}异步记录交易数据时发生错误: {e}")
@@ -265,9 +356,12 @@ class TradeManager:
             logger.error(f"{self.symbolName}异步更新持仓信息时发生错误: {e}")
 
     # 检查和恢复订单监听状态
-    async def checkAndRecoverOrderWatch(self):
+    async def checkAndRecoverOrderWatch(self, allOrder: list = None):
         """
         检查订单监听状态并在需要时恢复
+
+        Args:
+            allOrder: 已查询到的未成交订单（来自账户级巡检），为None时自行查询
         """
         try:
             if self.websocketManager:
@@ -275,15 +369,13 @@ class TradeManager:
                 if not await self.websocketManager.isOrderWatchActive():
                     logger.warning(f"{self.symbolName}订单监听已断开，尝试恢复")
                     # 获取当前未成交订单
-                    allOrder = await self.wsExchange.fetchOpenOrders(self.symbolName)
+                    if allOrder is None:
+                        allOrder = await self.wsExchange.fetchOpenOrders(self.symbolName)
                     targetOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
 
                     if len(targetOrder) > 0:
                         # 重新启动订单监听
-                        if len(targetOrder) == 2:
-                            await self.websocketManager.runOpenOrderWatch(targetOrder[0], targetOrder[1])
-                        else:
-                            await self.websocketManager.runOpenOrderWatch(targetOrder[0])
+                        await self.websocketManager.runOpenOrderWatch(*targetOrder)
                         logger.info(f"{self.symbolName}订单监听恢复成功")
                     else:
                         logger.info(f"{self.symbolName}当前无未成交订单，无需恢复监听")
@@ -294,28 +386,36 @@ class TradeManager:
             # 如果恢复失败，触发网络重连
             await self.networkHelper()
 
-    async def checkAndRecoverTrading(self):
+    async def checkAndRecoverTrading(self, allOrder: list = None):
         """
         检查交易状态并在需要时自动恢复挂单
         这个方法用于检测长时间无订单的情况并自动恢复
+
+        Args:
+            allOrder: 已查询到的未成交订单（来自账户级巡检），此时检查节奏由巡检器控制；
+                为None时按订单检查间隔自行查询
         """
         try:
             import time
             current_time = time.time()
 
-            # 更新检查时间
-            if self.lastOrderCheckTime is None:
-                self.lastOrderCheckTime = current_time
-                return
+            if allOrder is None:
+                # 更新检查时间
+                if self.lastOrderCheckTime is None:
+                    self.lastOrderCheckTime = current_time
+                    return
 
-            # 检查是否到了检查间隔
-            if (current_time - self.lastOrderCheckTime) < self.orderCheckInterval:
-                return
+                # 检查是否到了检查间隔
+                if (current_time - self.lastOrderCheckTime) < self.orderCheckInterval:
+                    return
 
             self.lastOrderCheckTime = current_time
+            logger.info(f"{self.symbolName}报价刷新统计: {self.requotePolicy.get_stats()}")
+            logger.info(f"{self.symbolName}数据流统计: {self.getStreamStats()}")
 
             # 获取当前未成交订单
-            allOrder = await self.wsExchange.fetchOpenOrders(self.symbolName)
+            if allOrder is None:
+                allOrder = await self.wsExchange.fetchOpenOrders(self.symbolName)
             targetOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
 
             # 检查是否长时间无订单
@@ -339,8 +439,7 @@ class TradeManager:
                 # 检查websocket监听状态
                 if self.websocketManager and await self.websocketManager.isOrderWatchActive():
                     logger.info(f"{self.symbolName}停止无效的订单监听")
-                    self.websocketManager.inWatchOpenOrder = False
-                    self.websocketManager.openOrders = []
+                    self.websocketManager.stopOrderWatch()
 
                 # 重新执行交易逻辑
                 await self.runTrade()
@@ -354,20 +453,32 @@ class TradeManager:
                 # 有订单但没有监听，尝试恢复监听
                 if self.websocketManager and not await self.websocketManager.isOrderWatchActive():
                     logger.warning(f"{self.symbolName}发现有订单但无监听，恢复订单监听")
-                    if len(targetOrder) == 2:
-                        await self.websocketManager.runOpenOrderWatch(targetOrder[0], targetOrder[1])
-                    else:
-                        await self.websocketManager.runOpenOrderWatch(targetOrder[0])
+                    await self.websocketManager.runOpenOrderWatch(*targetOrder)
                     logger.info(f"{self.symbolName}订单监听恢复成功")
 
         except Exception as e:
             logger.error(f"{self.symbolName}检查和恢复交易状态时发生错误: {e}")
             # 不触发networkHelper，避免过度重连
 
+    async def applyOrderSweep(self, allOrder: list):
+        """
+        处理账户级挂单巡检分发的本交易对未成交订单
+
+        订单监听已断开时按监听恢复逻辑处理（无订单立即重新挂单），
+        否则按交易状态检查处理（长时间无订单超时后恢复）。
+        """
+        if self.networkError:
+            return
+        if self.websocketManager and not await self.websocketManager.isOrderWatchActive():
+            await self.checkAndRecoverOrderWatch(allOrder)
+        else:
+            await self.checkAndRecoverTrading(allOrder)
+
     # 更新余额
     async def updateBalance(self, balance: float, equity: float):
         self.balance = balance
         self.equity = equity
+        self.riskGate.on_equity(equity)
         logger.info(
             f"{self.symbolName}当前余额: {self.balance},当前权益: {self.equity}")
 
@@ -381,6 +492,9 @@ class TradeManager:
     async def updateLastPrice(self, lastPrice: float):
         if self.lastPrice != lastPrice:
             self.lastPrice = lastPrice
+            self.quoteEngine.set_mid(self.quoteSlot, lastPrice)
+            if self.volatilityManager:
+                self.volatilityManager.on_mid(lastPrice)
 
             # 记录价格数据到数据记录器
             try:
@@ -388,62 +502,17 @@ class TradeManager:
             except Exception as e:
                 logger.error(f"{self.symbolName}记录价格数据时发生错误: {e}")
 
-        # 初始化价格触发冷却时间
-        if not hasattr(self, '_last_price_trigger_time'):
-            self._last_price_trigger_time = 0
-
-        # 只在单边交易模式（只做多或只做空）且无持仓时才进行追单
-        # 双向模式下不需要追单，因为价格两边都能挂单
-        if (self.direction in ['long', 'short'] and
-                await tradeUtil.positionMarginSize(self.position, self.symbolName) == 0):
-
-            # 检查是否有相应的价格记录
-            has_price_record = False
-            if self.direction == 'long' and self.lastBuyPrice != 0.0:
-                has_price_record = True
-            elif self.direction == 'short' and hasattr(self, 'lastSellPrice') and self.lastSellPrice != 0.0:
-                has_price_record = True
-
-            if not has_price_record:
-                return
-
-            import time
-            current_time = time.time()
-
-            # 增加冷却机制，避免频繁触发（至少间隔5秒）
-            if current_time - self._last_price_trigger_time < 5:
-                return
-
-            # 只做多模式：当价格超过最新买单价一定范围时重新挂买单
-            # 只做空模式：当价格低于最新卖单价一定范围时重新挂卖单
-            should_retrade = False
-            if self.direction == 'long' and lastPrice > self.lastBuyPrice * (1 + self.baseSpread):
-                logger.info(
-                    f"{self.symbolName}只做多模式，无持仓且最新价格{lastPrice}超过最新买单价{self.lastBuyPrice}*(1+{self.baseSpread})，重新挂买单")
-                should_retrade = True
-            elif (self.direction == 'short' and hasattr(self, 'lastSellPrice') and
-                  self.lastSellPrice != 0.0 and lastPrice < self.lastSellPrice * (1 - self.baseSpread)):
-                logger.info(
-                    f"{self.symbolName}只做空模式，无持仓且最新价格{lastPrice}低于最新卖单价{self.lastSellPrice}*(1-{self.baseSpread})，重新挂卖单")
-                should_retrade = True
-
-            if should_retrade:
-                # 计算期望订单，检查是否真的需要重新下单
-                expected_orders = self._calculate_expected_orders()
-                if not self._check_orders_match_expected(expected_orders):
-                    logger.info(f"{self.symbolName}订单状态不符合预期，执行重新挂单")
-                    self._last_price_trigger_time = current_time
-                    await self.runTrade()
-                else:
-                    logger.debug(f"{self.symbolName}虽然价格触发条件满足，但订单状态符合预期，跳过挂单")
-
-        # 定期检查订单监听状态（每100次价格更新检查一次）
-        if not hasattr(self, '_price_update_counter'):
-            self._price_update_counter = 0
-        self._price_update_counter += 1
-
-        if self._price_update_counter % 100 == 0:
-            await self.checkAndRecoverOrderWatch()
+        # 基准价偏离上次报价基准超过偏差带时刷新报价，由刷新策略限制存活时间和频率
+        if (self.lastQuote is not None and not self.networkError and not self._requoting
+                and self.requotePolicy.should_requote(self.currentBasePrice())):
+            logger.info(
+                f"{self.symbolName}价格偏离上次报价基准{self.requotePolicy.quoted_base}超过偏差带"
+                f"{self.requotePolicy.deviation_band():.6f}，刷新报价")
+            self._requoting = True
+            try:
+                await self.runTrade()
+            finally:
+                self._requoting = False
 
     def setUseTransactionPrice(self, enabled: bool):
         """
@@ -477,6 +546,8 @@ class TradeManager:
 
     # 更新持仓
     async def updatePosition(self, position):
+        # 推送和查询结果包含账户全部持仓，只把本交易对的持仓转换为记录
+        position = to_positions(position, self.symbolName)
         self.position = position
 
         # 获取双向持仓信息
@@ -572,13 +643,15 @@ class TradeManager:
         async with self._update_lock:  # 使用锁保护
             oldOrderInfo = []
             for order in self.openOrders:
-                oldOrderInfo.append({'id': order['id'], 'side': order['side']})
+                oldOrderInfo.append({'id': order.id, 'side': order.side})
 
             self.openOrders = orders
-            # 使用新的订单检查逻辑，支持动态订单数量
-            expected_orders = self._calculate_expected_orders()
-            self.checkOrder = self._check_orders_match_expected(
-                expected_orders)
+            self._mergeLiveOrders(orders)
+            # 与最近一次同步的目标阶梯对账，判断挂单是否符合预期
+            if self.lastTargets is not None:
+                self.checkOrder = reconcile(
+                    self.lastTargets, list(self.liveOrders.values()),
+                    self.ladderTolerance, self._amountTolerance()).is_noop
 
     # 计算下单数量
 
@@ -635,155 +708,68 @@ class TradeManager:
 
     # 计算买卖单价格
     async def calculateOrderPrice(self):
-        # 获取交易配置
+        """
+        通过报价引擎计算买卖价格和下单数量
+
+        最新状态写入本交易对的槽位后，由引擎对所有交易对做一次向量化计算，
+        完整报价（价差、价格、数量）保存在self.lastQuote中供下单使用。
+        """
         trade_config = get_trade_config()
         spread_mode = getattr(trade_config, 'SPREAD_MODE', 'fixed')
-        
-        # 根据交易方向和库存数量计算持仓比例
-        if self.direction == 'both':
-            # 双向持仓：使用总持仓比例
-            ratio = self.nowStockRadio/self.maxStockRadio
-        elif self.direction == 'long':
-            # 只做多：只考虑多头持仓比例
-            long_margin = abs(
-                self.longSize * self.lastPrice) if self.longSize else 0
-            total_value = self.balance + long_margin
-            ratio = (long_margin / total_value /
-                     self.maxStockRadio) if total_value > 0 else 0
-        elif self.direction == 'short':
-            # 只做空：只考虑空头持仓比例
-            short_margin = abs(
-                self.shortSize * self.lastPrice) if self.shortSize else 0
-            total_value = self.balance + short_margin
-            ratio = (short_margin / total_value /
-                     self.maxStockRadio) if total_value > 0 else 0
-        else:
-            ratio = 0
-
-        # 根据价差模式计算买卖价差
-        if spread_mode == 'fixed':
-            # 固定价差模式：始终使用基础价差
-            buySpread = sellSpread = self.baseSpread
-            logger.debug(f"{self.symbolName}使用固定价差模式: {self.baseSpread:.6f}")
-            
-        elif spread_mode == 'dynamic':
-            # 动态价差模式：使用AS模型逻辑
-            buySpread, sellSpread = self._calculateDynamicSpread(ratio)
-            logger.debug(f"{self.symbolName}使用动态价差模式: 买单{buySpread:.6f}, 卖单{sellSpread:.6f}")
-            
-        elif spread_mode == 'hybrid':
-            # 混合模式：根据库存水平选择价差策略
-            safe_threshold = getattr(trade_config, 'INVENTORY_SAFE_THRESHOLD', 0.4)
-            risk_threshold = getattr(trade_config, 'INVENTORY_RISK_THRESHOLD', 0.7)
-            
-            if ratio < safe_threshold:
-                # 低库存：使用固定价差
-                buySpread = sellSpread = self.baseSpread
-                logger.debug(f"{self.symbolName}混合模式-低库存({ratio:.3f}<{safe_threshold}): 使用固定价差")
-                
-            elif ratio >= risk_threshold:
-                # 高库存：使用动态价差
-                buySpread, sellSpread = self._calculateDynamicSpread(ratio)
-                logger.debug(f"{self.symbolName}混合模式-高库存({ratio:.3f}>={risk_threshold}): 使用动态价差")
-                
-            else:
-                # 过渡区间：线性插值
-                fixed_spread = self.baseSpread
-                dynamic_buy_spread, dynamic_sell_spread = self._calculateDynamicSpread(ratio)
-                
-                # 计算过渡因子
-                transition_factor = (ratio - safe_threshold) / (risk_threshold - safe_threshold)
-                
-                # 线性插值
-                buySpread = fixed_spread * (1 - transition_factor) + dynamic_buy_spread * transition_factor
-                sellSpread = fixed_spread * (1 - transition_factor) + dynamic_sell_spread * transition_factor
-                
-                logger.debug(f"{self.symbolName}混合模式-过渡区间({ratio:.3f}): 插值因子{transition_factor:.3f}")
-        else:
-            # 未知模式，默认使用固定价差
-            buySpread = sellSpread = self.baseSpread
-            logger.warning(f"{self.symbolName}未知价差模式'{spread_mode}'，使用固定价差")
 
-        # 确保价差在合理范围内
-        buySpread = max(self.minSpread, min(self.maxSpread, buySpread))
-        sellSpread = max(self.minSpread, min(self.maxSpread, sellSpread))
+        # 确定用于计算价格的基准价
+        basePrice = self.currentBasePrice()
+        if self.useTransactionPrice and self.lastTransactionOrderPrice is not None:
+            logger.info(f"{self.symbolName}使用成交价作为基准价: {basePrice}")
+        elif self.useTransactionPrice:
+            logger.warning(
+                f"{self.symbolName}启用了成交价基准但无成交记录，使用实时价格: {basePrice}")
+
+        # 价差参数可能被波动率管理器调整，每次报价前同步
+        self.quoteEngine.set_params(
+            self.quoteSlot, self.baseSpread, self.minSpread, self.maxSpread, self.maxStockRadio,
+            self.minOrderAmount, self.pricePrecision, self.amountPrecision,
+            getattr(trade_config, 'MIN_ORDER_VALUE', 5.5))
+        # GLFT库存以下单数量为单位
+        inventory = self.netPosition / self.orderAmount if self.orderAmount else 0.0
+        self.quoteEngine.set_state(
+            self.quoteSlot, self.nowStockRadio, self.longSize, self.shortSize,
+            self.balance, self.lastPrice, basePrice, self.orderAmount, inventory)
+        if spread_mode == 'glft':
+            # 参数不变时引擎不会重新计算GLFT系数
+            self.quoteEngine.set_glft_params(self.quoteSlot, self.glftGamma, self.glftA, self.glftK)
+            self.quoteEngine.set_sigma(self.quoteSlot, self.getSigmaPerSecond())
+        quote = self.quoteEngine.quote(self.quoteSlot)
+        self.lastQuote = quote
+        self.requotePolicy.on_quoted(basePrice, (quote['buy_spread'] + quote['sell_spread']) / 2)
 
         logger.info(
-            f"{self.symbolName} 模式:{spread_mode}, 持仓比例:{ratio:.4f}, 买单价差:{buySpread:.6f}, 卖单价差:{sellSpread:.6f}")
+            f"{self.symbolName} 模式:{spread_mode}, 持仓比例:{quote['ratio']:.4f}, 买单价差:{quote['buy_spread']:.6f}, 卖单价差:{quote['sell_spread']:.6f}")
+        return quote['buy_price'], quote['sell_price']
 
-        # 确定用于计算价格的基准价
+    def currentBasePrice(self):
+        """报价基准价：启用成交价基准且有成交记录时使用最近成交价，否则使用实时价格"""
         if self.useTransactionPrice and self.lastTransactionOrderPrice is not None:
-            # 使用最近成交订单价格作为基准价
-            basePrice = self.lastTransactionOrderPrice
-            logger.info(f"{self.symbolName}使用成交价作为基准价: {basePrice}")
-        else:
-            # 使用实时价格作为基准价
-            basePrice = self.lastPrice
-            if self.useTransactionPrice and self.lastTransactionOrderPrice is None:
-                logger.warning(
-                    f"{self.symbolName}启用了成交价基准但无成交记录，使用实时价格: {basePrice}")
-
-        # 计算买卖价格
-        buyPrice = basePrice * (1 - buySpread)
-        sellPrice = basePrice * (1 + sellSpread)
-        return buyPrice, sellPrice
-    
-    def _calculateDynamicSpread(self, ratio):
-        """
-        计算AS模型的动态价差
-        """
-        balanceRatio = 0.5
-        buySpread, sellSpread = self.baseSpread, self.baseSpread
-        
-        '''
-        AS模型价差计算逻辑：
-        - 当 ratio = 0 时, spread = minSpread
-        - 当 0 < ratio <= 0.5 时, spread 从 minSpread 线性增长到 baseSpread
-        - 当 0.5 < ratio <= 1 时, spread 从 baseSpread 线性增长到 maxSpread
-        
-        对于单向交易：
-        - long模式：持仓越多，买单价差越大（降低买入积极性），卖单价差越小（提高卖出积极性）
-        - short模式：持仓越多，卖单价差越大（降低卖出积极性），买单价差越小（提高买入积极性）
-        '''
+            return self.lastTransactionOrderPrice
+        return self.lastPrice
 
-        if self.direction == 'long':
-            # 只做多：持仓越多，买单价差越大，卖单价差越小
-            if ratio < balanceRatio:
-                buySpread = 2 * (self.baseSpread-self.minSpread) * \
-                    ratio + self.minSpread
-                sellSpread = 2 * (self.baseSpread -
-                                  self.maxSpread) * ratio + self.maxSpread
-            else:
-                buySpread = 2 * (self.maxSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-                sellSpread = 2 * (self.minSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-        elif self.direction == 'short':
-            # 只做空：持仓越多，卖单价差越大，买单价差越小
-            if ratio < balanceRatio:
-                sellSpread = 2 * (self.baseSpread -
-                                  self.minSpread) * ratio + self.minSpread
-                buySpread = 2 * (self.baseSpread-self.maxSpread) * \
-                    ratio + self.maxSpread
-            else:
-                sellSpread = 2 * (self.maxSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-                buySpread = 2 * (self.minSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-        else:
-            # 双向持仓：原有逻辑
-            if ratio < balanceRatio:
-                buySpread = 2 * (self.baseSpread-self.minSpread) * \
-                    ratio + self.minSpread
-                sellSpread = 2 * (self.baseSpread -
-                                  self.maxSpread) * ratio + self.maxSpread
-            else:
-                buySpread = 2 * (self.maxSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-                sellSpread = 2 * (self.minSpread-self.baseSpread) * \
-                    (ratio - balanceRatio) + self.baseSpread
-        
-        return buySpread, sellSpread
+    def getRequoteStats(self) -> dict:
+        """获取报价刷新统计"""
+        return self.requotePolicy.get_stats()
+
+    def getSigmaPerSecond(self):
+        """GLFT模式使用的每秒相对波动率，波动率管理器尚无数据时使用默认值"""
+        if self.volatilityManager:
+            sigma = self.volatilityManager.get_sigma_per_second()
+            if sigma > 0:
+                return sigma
+        return get_trade_config().GLFT_DEFAULT_SIGMA
+
+    def quoteAmount(self, side):
+        """最近一次报价中指定方向的下单数量"""
+        if self.lastQuote is None:
+            return self.orderAmount
+        return self.lastQuote['buy_size'] if side == 'buy' else self.lastQuote['sell_size']
 
     # 下单
     async def placeOrder(self, amount, price, side, reduceOnly):
@@ -793,10 +779,18 @@ class TradeManager:
             logger.warning(
                 f"订单数量不能小于最小订单数量{self.minOrderAmount}，已设置为该交易对的最小订单数量")
             amount = self.minOrderAmount
+        reason = self.riskGate.check(side, amount, price, reduceOnly, self.longSize, self.shortSize,
+                                     self._restingOpenAmount(side))
+        if reason is not None:
+            logger.warning(f"{self.symbolName}风控拒绝下单: {side} {amount} @ {price}, {reason}")
+            return None
+        # 发送请求前登记，订单推送可能早于REST响应到达
+        self.streamWatchdog.expect('orders')
         try:
             order = await self.wsExchange.create_order(self.symbolName, "limit", side, amount, price, {"reduceOnly": reduceOnly, "hedged": True})
         except Exception as e:
             logger.error(f"{self.symbolName}下单失败: {e}")
+            self.streamWatchdog.cancel_expect('orders')
             return None
         else:
             logger.info(
@@ -809,15 +803,198 @@ class TradeManager:
 
     # 取消全部订单
     async def cancelAllOrder(self):
+        # 持有对账锁，避免进行中的对账在撤单后又挂出新订单
+        async with self._reconcile_lock:
+            # 先停止监听，避免被撤销的订单消失后被误判为成交
+            orders = list(self.liveOrders.values())
+            self._retireOrders(orders)
+            if orders:
+                self.streamWatchdog.expect('orders')
+            try:
+                await self.wsExchange.cancelAllOrders(self.symbolName)
+            except Exception as e:
+                logger.error(f"{self.symbolName}取消全部订单失败: {e}")
+                if orders:
+                    self.streamWatchdog.cancel_expect('orders')
+                self._restoreOrders(orders)
+                if self.websocketManager and self.liveOrders:
+                    await self.websocketManager.runOpenOrderWatch(*self.liveOrders.values())
+                return False
+            else:
+                logger.info(f"{self.symbolName}取消全部订单成功")
+                return True
+
+    async def cancelOrder(self, order):
+        """撤销单个订单"""
+        self.streamWatchdog.expect('orders')
         try:
-            await self.wsExchange.cancelAllOrders(self.symbolName)
+            await self.wsExchange.cancel_order(order.id, self.symbolName)
         except Exception as e:
-            logger.error(f"{self.symbolName}取消全部订单失败: {e}")
+            logger.error(f"{self.symbolName}撤单失败: {order.id}, {e}")
+            self.streamWatchdog.cancel_expect('orders')
             return False
         else:
-            logger.info(f"{self.symbolName}取消全部订单成功")
+            logger.info(f"{self.symbolName}撤单成功: {order.id}")
             return True
 
+    async def amendOrder(self, order, amount, price, side, reduceOnly):
+        """
+        修改挂单价格和数量，交易所不支持或改单失败时撤单后重新下单
+
+        Returns:
+            修改后的订单（可能是新订单ID），失败返回None
+        """
+        amount = round(amount, self.amountPrecision)
+        price = round(price, self.pricePrecision)
+        reason = self.riskGate.check(side, amount, price, reduceOnly, self.longSize, self.shortSize,
+                                     self._restingOpenAmount(side, exclude=order.id))
+        if reason is not None:
+            logger.warning(f"{self.symbolName}风控拒绝改单: {order.id} -> {side} {amount} @ {price}, {reason}")
+            self._restoreOrders([order])
+            return None
+        if self.wsExchange.has.get('editOrder'):
+            self.streamWatchdog.expect('orders')
+            try:
+                edited = await self.wsExchange.edit_order(order.id, self.symbolName, "limit", side, amount, price)
+            except Exception as e:
+                logger.warning(f"{self.symbolName}改单失败，改为撤单重挂: {order.id}, {e}")
+                self.streamWatchdog.cancel_expect('orders')
+            else:
+                logger.info(f"{self.symbolName}改单成功: {order.id} -> {edited.get('id')}, 数量: {amount}, 价格: {price}")
+                return edited
+        if not await self.cancelOrder(order):
+            self._restoreOrders([order])
+            return None
+        return await self.placeOrder(amount, price, side, reduceOnly)
+
+    def _restingOpenAmount(self, side, exclude=None):
+        """同方向开仓挂单的未成交数量"""
+        return sum(order.amount - order.filled for order in self.liveOrders.values()
+                   if order.side == side and not order.reduceOnly and order.id != exclude)
+
+    def _buildLadderTargets(self, expected_orders, buyPrice, sellPrice):
+        """
+        根据期望订单和第一档报价展开目标阶梯，风控闸门拒绝的档位不进入目标（对应挂单会被撤销）
+
+        目标阶梯替代全部现有挂单，持仓限额按同方向已放行的开仓档位累计检查。
+        """
+        targets = quoteLadder.build_ladder(
+            expected_orders, buyPrice, sellPrice, self.quoteAmount('buy'), self.quoteAmount('sell'),
+            self.ladderLevels, self.ladderSpacing, self.ladderSizeMultiplier,
+            self.pricePrecision, self.amountPrecision, self.minOrderAmount,
+            reduce_capacity={'buy': self.shortSize, 'sell': self.longSize})
+        allowed = []
+        pending = {'buy': 0.0, 'sell': 0.0}
+        for target in targets:
+            reason = self.riskGate.check(target['side'], target['amount'], target['price'], target['reduce_only'],
+                                         self.longSize, self.shortSize, pending[target['side']])
+            if reason is None:
+                allowed.append(target)
+                if not target['reduce_only']:
+                    pending[target['side']] += target['amount']
+            else:
+                logger.warning(f"{self.symbolName}风控移除目标档位{target['type']}: {reason}")
+        return allowed
+
+    @staticmethod
+    def _liveOrderRecord(order, target):
+        """下单或改单后的挂单记录，价格和数量以目标值为准（下单回报中可能缺失）"""
+        record = to_order(order)
+        record.side = target['side']
+        record.price = target['price']
+        record.amount = target['amount']
+        record.reduceOnly = target['reduce_only']
+        return record
+
+    def _amountTolerance(self):
+        return 0.5 * 10 ** -self.amountPrecision
+
+    def _mergeLiveOrders(self, orders):
+        """
+        合并交易所推送的挂单
+
+        已知订单用交易所数据更新价格和数量；未知订单（例如重启前遗留的订单）加入挂单簿参与对账。
+        刚撤销的订单可能仍出现在推送中，不再加入。
+        """
+        retired = {str(order_id) for order_id in self.retiredOrderIds}
+        for order in orders:
+            order_id = order.id
+            if order_id in retired:
+                continue
+            known = self.liveOrders.get(order_id)
+            if known is None:
+                self.liveOrders[order_id] = order
+            elif order.price or order.amount:
+                self.liveOrders[order_id] = known.replace(price=order.price or known.price,
+                                                          amount=order.amount or known.amount)
+
+    def _retireOrders(self, orders):
+        """撤单或改单前将旧订单移出挂单簿并停止监听，避免旧订单消失被误判为成交"""
+        order_ids = [order.id for order in orders]
+        for order_id in order_ids:
+            self.liveOrders.pop(order_id, None)
+        self.retiredOrderIds.extend(order_ids)
+        if self.websocketManager:
+            self.websocketManager.untrackOrders(order_ids)
+
+    def _restoreOrders(self, orders):
+        """改单或撤单失败时旧订单仍在交易所挂着，放回挂单簿（对账结束时重新加入监听）"""
+        for order in orders:
+            self.liveOrders[order.id] = order
+            try:
+                self.retiredOrderIds.remove(order.id)
+            except ValueError:
+                pass
+
+    async def reconcileOrders(self, targets):
+        """
+        将实际挂单对账到目标阶梯
+
+        按方向、意图、价格和数量生成最小的保持/改单/撤单/新挂计划，计划中的全部交易所请求并发执行。
+
+        Returns:
+            是否全部执行成功
+        """
+        async with self._reconcile_lock:
+            self.lastTargets = targets
+            plan = reconcile(targets, list(self.liveOrders.values()), self.ladderTolerance, self._amountTolerance())
+
+            if plan.is_noop:
+                logger.info(f"{self.symbolName}当前挂单符合目标阶梯({len(plan.keep)}档)，跳过挂单")
+                self.checkOrder = True
+                if (self.websocketManager and self.liveOrders
+                        and not await self.websocketManager.isOrderWatchActive()):
+                    await self.websocketManager.runOpenOrderWatch(*self.liveOrders.values())
+                return True
+
+            logger.info(f"{self.symbolName}挂单对账: {plan.summary()}")
+            self._retireOrders([order for _, order in plan.amend] + plan.cancel)
+
+            amend_calls = [self.amendOrder(order, target['amount'], target['price'], target['side'], target['reduce_only'])
+                           for target, order in plan.amend]
+            place_calls = [self.placeOrder(target['amount'], target['price'], target['side'], target['reduce_only'])
+                           for target in plan.place]
+            cancel_calls = [self.cancelOrder(order) for order in plan.cancel]
+            results = await asyncio.gather(*amend_calls, *place_calls, *cancel_calls, return_exceptions=True)
+
+            success = True
+            created_targets = [target for target, _ in plan.amend] + plan.place
+            for target, result in zip(created_targets, results):
+                if result is None or isinstance(result, Exception):
+                    success = False
+                else:
+                    record = self._liveOrderRecord(result, target)
+                    self.liveOrders[record.id] = record
+            for order, result in zip(plan.cancel, results[len(created_targets):]):
+                if result is not True:
+                    self._restoreOrders([order])
+                    success = False
+            self.checkOrder = success
+
+            if self.websocketManager and self.liveOrders:
+                await self.websocketManager.runOpenOrderWatch(*self.liveOrders.values())
+            return success
+
     # 运行流程
     async def runTrade(self):
         try:
@@ -841,75 +1018,20 @@ class TradeManager:
             logger.info(
                 f"{self.symbolName}期望订单数量: {len(expected_orders)}, 详情: {[o['type'] for o in expected_orders]}")
 
-            # 检查当前订单是否符合期望
-            if self._check_orders_match_expected(expected_orders):
-                logger.info(f"{self.symbolName}当前订单状态符合预期，跳过挂单")
-                return
-
-            # 取消所有不符合预期的订单
-            if len(self.openOrders) > 0:
-                logger.info(f"{self.symbolName}当前订单状态不符合预期，取消所有订单")
-                try:
-                    await self.cancelAllOrder()
-                    # 等待取消完成
-                    await asyncio.sleep(0.5)
-                except Exception as e:
-                    logger.error(f"{self.symbolName}取消全部订单失败: {e}")
-
             try:
                 buyPrice, sellPrice = await self.calculateOrderPrice()
                 logger.info(
                     f"{self.symbolName}计算订单价格: 买入={buyPrice}, 卖出={sellPrice}, 数量={self.orderAmount}")
-                orders_to_place = []
 
-                # 根据期望订单列表下单
-                for order_info in expected_orders:
-                    side = order_info['side']
-                    reduce_only = order_info['reduce_only']
-                    price = buyPrice if side == 'buy' else sellPrice
-                    logger.info(
-                        f"{self.symbolName}准备下单: {side} {self.orderAmount} @ {price} (reduce_only={reduce_only})")
-                    orders_to_place.append(self.placeOrder(
-                        self.orderAmount, price, side, reduce_only))
-
-                # 执行下单
-                if len(orders_to_place) == 0:
+                # 展开目标阶梯，只对价格离开容差带或数量变化的档位改单
+                targets = self._buildLadderTargets(expected_orders, buyPrice, sellPrice)
+                if not targets:
+                    # 所有档位都被过滤时仍需对账，撤销遗留的挂单
                     logger.warning(f"{self.symbolName}没有需要下单的订单")
+                if not await self.reconcileOrders(targets):
+                    logger.warning(f"{self.symbolName}挂单对账部分失败")
+                    await self.networkHelper()
                     return
-                elif len(orders_to_place) == 1:
-                    logger.info(f"{self.symbolName}执行单个订单下单")
-                    order = await orders_to_place[0]
-                    if not order:
-                        logger.warning(f"{self.symbolName}订单下单失败")
-                        await self.networkHelper()
-                        return
-                    logger.info(
-                        f"{self.symbolName}订单下单成功: {order.get('id', 'unknown')}")
-                    if self.websocketManager and order:
-                        await self.websocketManager.runOpenOrderWatch(order)
-                elif len(orders_to_place) > 1:
-                    logger.info(
-                        f"{self.symbolName}执行批量订单下单，数量: {len(orders_to_place)}")
-                    results = await asyncio.gather(*orders_to_place, return_exceptions=True)
-                    successful_orders = [
-                        r for r in results if r is not None and not isinstance(r, Exception)]
-                    failed_orders = [
-                        r for r in results if isinstance(r, Exception)]
-
-                    if failed_orders:
-                        logger.error(
-                            f"{self.symbolName}部分订单下单失败: {[str(e) for e in failed_orders]}")
-
-                    if len(successful_orders) != len(orders_to_place):
-                        logger.warning(
-                            f"{self.symbolName}部分订单下单失败，成功: {len(successful_orders)}/{len(orders_to_place)}")
-                        await self.networkHelper()
-                        return
-
-                    logger.info(
-                        f"{self.symbolName}批量订单下单成功，数量: {len(successful_orders)}")
-                    if self.websocketManager and successful_orders:
-                        await self.websocketManager.runOpenOrderWatch(*successful_orders)
 
             except Exception as e:
                 logger.error(f"{self.symbolName}下单失败: {e}")
@@ -986,95 +1108,23 @@ class TradeManager:
 
         return orders
 
-    def _check_orders_match_expected(self, expected_orders):
-        """检查当前订单是否符合期望"""
-        if len(self.openOrders) != len(expected_orders):
-            return False
-
-        # 统计期望订单的类型
-        expected_buy_open = sum(
-            1 for o in expected_orders if o['side'] == 'buy' and not o['reduce_only'])
-        expected_buy_close = sum(
-            1 for o in expected_orders if o['side'] == 'buy' and o['reduce_only'])
-        expected_sell_open = sum(
-            1 for o in expected_orders if o['side'] == 'sell' and not o['reduce_only'])
-        expected_sell_close = sum(
-            1 for o in expected_orders if o['side'] == 'sell' and o['reduce_only'])
-
-        # 统计当前订单的类型
-        current_buy_open = sum(1 for o in self.openOrders if o.get('side') == 'buy' and not o.get('reduceOnly', False))
-        current_buy_close = sum(1 for o in self.openOrders if o.get('side') == 'buy' and o.get('reduceOnly', False))
-        current_sell_open = sum(1 for o in self.openOrders if o.get('side') == 'sell' and not o.get('reduceOnly', False))
-        current_sell_close = sum(1 for o in self.openOrders if o.get('side') == 'sell' and o.get('reduceOnly', False))
-
-        # 检查各类订单数量是否完全匹配
-        if (expected_buy_open != current_buy_open or
-            expected_buy_close != current_buy_close or
-            expected_sell_open != current_sell_open or
-            expected_sell_close != current_sell_close):
-            return False
-
-        # 增加价格偏差检查：如果当前价格与订单价格偏差过大，需要重新下单
-        if hasattr(self, 'lastPrice') and self.lastPrice:
-            # 从配置文件读取价格偏差阈值系数
-            trade_config = get_trade_config()
-            deviation_factor = getattr(
-                trade_config, 'PRICE_DEVIATION_FACTOR', 0.5)  # 默认0.5
-            price_deviation_threshold = self.baseSpread * deviation_factor  # 价格偏差阈值
-
-            # 检查所有订单的价格偏差
-            for order in self.openOrders:
-                order_price = float(order.get('price', 0))
-                if order_price > 0:
-                    price_diff = abs(self.lastPrice - order_price) / self.lastPrice
-                    if price_diff > price_deviation_threshold:
-                        logger.info(
-                            f"{self.symbolName}订单价格偏差过大: 当前价格{self.lastPrice}, 订单价格{order_price}, 偏差{price_diff:.4f}")
-                        return False
-
-        return True
-
     # 恢复模式下的交易流程（不触发networkHelper）
     async def runTradeInRecovery(self):
         """在恢复模式下执行交易逻辑，失败时不会再次触发networkHelper"""
         try:
-            # 使用新的订单检查逻辑
-            expected_orders = self._calculate_expected_orders()
-            if self._check_orders_match_expected(expected_orders):
-                logger.info(f"{self.symbolName}当前订单状态符合预期，跳过挂单")
-                return
-
-            if len(self.openOrders) != 0:
-                logger.info(f"{self.symbolName}当前订单状态不符合预期，继续挂单")
-                try:
-                    await self.cancelAllOrder()
-                except Exception as e:
-                    logger.error(f"{self.symbolName}取消全部订单失败: {e}")
-                    raise e
+            # refreshAllStatus刚从交易所获取了挂单，以此为准剔除恢复期间已成交或被撤销的订单
+            live_ids = {order.id for order in self.openOrders}
+            for order_id in list(self.liveOrders):
+                if order_id not in live_ids:
+                    del self.liveOrders[order_id]
 
+            expected_orders = self._calculate_expected_orders()
             try:
                 buyPrice, sellPrice = await self.calculateOrderPrice()
-                orderBuy = self.placeOrder(
-                    self.orderAmount, buyPrice, "buy", False)
-                orderSell = None
-                if self.nowStockRadio != 0:
-                    orderSell = self.placeOrder(
-                        self.orderAmount, sellPrice, "sell", True)
-                    b, s = await asyncio.gather(orderBuy, orderSell)
-                    # 检查是否有订单下单失败
-                    if not b or not s:
-                        logger.error(
-                            f"{self.symbolName}恢复模式下部分订单下单失败，买单: {b is not None}, 卖单: {s is not None}")
-                        raise Exception("恢复模式下订单下单失败")
-                    if self.websocketManager and b and s:
-                        await self.websocketManager.runOpenOrderWatch(b, s)
-                else:
-                    b = await orderBuy
-                    if not b:
-                        logger.error(f"{self.symbolName}恢复模式下买单下单失败")
-                        raise Exception("恢复模式下买单下单失败")
-                    if self.websocketManager and b:
-                        await self.websocketManager.runOpenOrderWatch(b)
+                targets = self._buildLadderTargets(expected_orders, buyPrice, sellPrice)
+                if not await self.reconcileOrders(targets):
+                    logger.error(f"{self.symbolName}恢复模式下部分订单下单失败")
+                    raise Exception("恢复模式下订单下单失败")
 
             except Exception as e:
                 logger.error(f"{self.symbolName}恢复模式下单失败: {e}")
@@ -1086,60 +1136,98 @@ class TradeManager:
 
     # 网络重连函数
     async def networkHelper(self):
+        """
+        网络错误恢复：刷新状态后在恢复模式下重新报价，失败时按带抖动的指数退避重试，
+        从进入恢复到重新报价完成的未报价时间记录到性能监控器
+        """
         if not self.networkError:
             self.networkError = True
-            logger.info(f"{self.symbolName}开始网络错误恢复流程")
+            self.fullResyncCount += 1
+            logger.info(f"{self.symbolName}开始网络错误恢复流程（第{self.fullResyncCount}次全量恢复）")
+            network_config = get_network_config()
+            started = time.monotonic()
+            attempt = 0
             while self.networkError:
+                # 退避从几十毫秒开始，每次失败翻倍，实际等待在[(1-抖动)×退避, 退避]之间随机
+                backoff = min(network_config.RECOVERY_BACKOFF_BASE * 2 ** attempt,
+                              network_config.RECOVERY_BACKOFF_MAX)
+                await asyncio.sleep(backoff * (1 - network_config.RECOVERY_BACKOFF_JITTER * random.random()))
+                attempt += 1
                 try:
-                    # 等待一段时间后重新尝试交易
-                    await asyncio.sleep(5)
                     # 重新获取最新状态
                     await self.refreshAllStatus()
                     # 重新执行交易逻辑（在恢复模式下执行）
                     await self.runTradeInRecovery()
                 except Exception as e:
-                    logger.error(f"{self.symbolName}恢复过程中发生错误，5s后重试: {e}")
-                    await asyncio.sleep(5)
+                    logger.error(f"{self.symbolName}恢复过程中发生错误（第{attempt}次尝试），退避后重试: {e}")
                 else:
-                    logger.info(f"{self.symbolName}网络错误恢复成功")
+                    unquoted = time.monotonic() - started
+                    self.performance_monitor.record_stage_time('恢复-未报价时间', unquoted * 1000)
+                    logger.info(
+                        f"{self.symbolName}网络错误恢复成功，尝试{attempt}次，未报价时间: {unquoted * 1000:.0f}ms")
                     self.networkError = False
         else:
             logger.info(f"{self.symbolName}已经在处理网络错误中")
 
     # 刷新所有状态信息
     async def refreshAllStatus(self):
-        """刷新余额、订单、持仓等所有状态信息"""
-        try:
-            # 重新获取余额信息
-            balance = await self.wsExchange.fetchBalance()
-            await self.updateBalance(balance[self.coin]['free'], balance[self.coin]['total'])
+        """
+        刷新余额、订单、持仓等所有状态信息
 
-            # 重新获取订单信息
-            allOrder = await self.wsExchange.fetchOpenOrders(self.symbolName)
-            targetOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
-            await self.updateOrders(targetOrder)
+        四个请求同时发出，报价必需的挂单和持仓先发出并先处理，任一失败则本次刷新失败；
+        余额和价格尽力刷新，失败时沿用websocket推送的最新值。
+        """
+        start = time.perf_counter()
+        # 挂单和持仓先进入请求队列，限流时优先发出
+        critical = [
+            asyncio.ensure_future(self.wsExchange.fetchOpenOrders(self.symbolName)),
+            asyncio.ensure_future(self.wsExchange.fetchPositions()),
+        ]
+        secondary = [
+            asyncio.ensure_future(self.wsExchange.fetchBalance()),
+            asyncio.ensure_future(self.wsExchange.fetchTicker(self.symbolName)),
+        ]
+        try:
+            allOrder, allPosition = await asyncio.gather(*critical)
+        except Exception as e:
+            for task in critical + secondary:
+                task.cancel()
+            await asyncio.gather(*critical, *secondary, return_exceptions=True)
+            logger.error(f"{self.symbolName}刷新状态信息失败: {e}")
+            raise e
 
-            # 重新获取持仓信息
-            allPosition = await self.wsExchange.fetchPositions()
-            await self.updatePosition(allPosition)
+        targetOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
+        await self.updateOrders(targetOrder)
+        await self.updatePosition(allPosition)
+        self.performance_monitor.record_stage_time('恢复-挂单持仓刷新', (time.perf_counter() - start) * 1000)
 
-            # 重新获取价格信息
-            ticker = await self.wsExchange.fetchTicker(self.symbolName)
+        balance, ticker = await asyncio.gather(*secondary, return_exceptions=True)
+        if isinstance(balance, Exception):
+            logger.warning(f"{self.symbolName}刷新余额失败，沿用最新推送值: {balance}")
+        else:
+            await self.updateBalance(balance[self.coin]['free'], balance[self.coin]['total'])
+        if isinstance(ticker, Exception):
+            logger.warning(f"{self.symbolName}刷新价格失败，沿用最新推送值: {ticker}")
+        else:
             await self.updateLastPrice(float(ticker['last']))
 
-            logger.info(f"{self.symbolName}状态信息刷新完成")
-
-        except Exception as e:
-            logger.error(f"{self.symbolName}刷新状态信息失败: {e}")
-            raise e
+        logger.info(f"{self.symbolName}状态信息刷新完成，耗时: {(time.perf_counter() - start) * 1000:.0f}ms")
 
     # 波动率管理相关方法
     async def startVolatilityMonitoring(self):
         """
         启动波动率监控
         """
-        if self.volatilityEnabled and self.volatilityManager:
+        if self.volatilityEnabled:
             try:
+                if self.volatilityManager is None:
+                    from core.volatilityManager import VolatilityManager
+                    self.volatilityManager = VolatilityManager(
+                        self.symbolName, self.wsExchange, self)
+                if not self.volatilityManager.uses_kline:
+                    # 逐笔波动率由updateLastPrice推送的中间价驱动，不需要K线订阅
+                    logger.info(f"{self.symbolName}波动率监控已启动，来源: {self.volatilityManager.source}")
+                    return None
                 # 创建波动率监控任务
                 volatility_task = asyncio.create_task(
                     self.volatilityManager.watch_kline())
@@ -1160,6 +1248,55 @@ class TradeManager:
             self.volatilityManager.stop()
             logger.info(f"{self.symbolName}波动率监控已停止")
 
+    async def startIntensityCalibration(self):
+        """
+        启动成交强度校准（仅GLFT模式）
+        """
+        trade_config = get_trade_config()
+        if getattr(trade_config, 'SPREAD_MODE', 'fixed') != 'glft' or not get_intensity_config().ENABLED:
+            return None
+        try:
+            if self.intensityCalibrator is None:
+                from core.intensityCalibrator import IntensityCalibrator
+                self.intensityCalibrator = IntensityCalibrator(
+                    self.symbolName, self.wsExchange, self)
+            calibration_task = asyncio.create_task(
+                self.intensityCalibrator.watch_trades())
+            logger.info(f"{self.symbolName}成交强度校准已启动")
+            return calibration_task
+        except Exception as e:
+            logger.error(f"{self.symbolName}启动成交强度校准失败: {e}")
+            return None
+
+    def stopIntensityCalibration(self):
+        """
+        停止成交强度校准
+        """
+        if self.intensityCalibrator:
+            self.intensityCalibrator.stop()
+
+    def startStreamWatchdog(self):
+        """
+        启动数据流看门狗，返回任务；未启用时返回None
+        """
+        if not get_stream_watchdog_config().ENABLED:
+            return None
+        return asyncio.create_task(self.streamWatchdog.watch(lambda: self.networkError))
+
+    def stopStreamWatchdog(self):
+        """
+        停止数据流看门狗
+        """
+        self.streamWatchdog.stop()
+
+    def getStreamStats(self) -> dict:
+        """
+        获取各数据流的消息频率、停滞恢复时间和全量恢复次数
+        """
+        stats = self.streamWatchdog.get_stats()
+        stats['network_recoveries'] = self.fullResyncCount
+        return stats
+
     def setVolatilityEnabled(self, enabled: bool):
         """
         设置是否启用波动率自动调节
@@ -4,12 +4,15 @@ from typing import List, Optional
 from util.sLogger import logger
 import ccxt.pro
 from config.config import get_volatility_config, get_trade_config
+from util.realizedVolatility import EwmaVolatility, RangeVolatility
+from core.streamWatchdog import StreamStalled
 
 
 class VolatilityManager:
     """
     波动率管理器
-    负责监听K线数据，计算ATR(10)波动率，并自动调节TradeManager的价差参数
+    负责计算波动率并自动调节TradeManager的价差参数。
+    波动率来源为'atr'时监听K线计算ATR(10)；其余来源由TradeManager推送的中间价逐笔更新。
     """
     
     def __init__(self, symbolName: str, wsExchange: ccxt.pro.Exchange, tradeManager=None):
@@ -30,9 +33,53 @@ class VolatilityManager:
         # 波动率更新相关
         self.last_update_time = 0
         self.update_interval = self.config.UPDATE_INTERVAL  # 更新间隔（秒）
+
+        # 逐笔估计器，以K线周期为口径输出波动率，与ATR波动率的价差倍数保持一致
+        self.source = self.config.VOLATILITY_SOURCE
+        self.horizon_seconds = ccxt.pro.Exchange.parse_timeframe(self.config.KLINE_TIMEFRAME)
+        self.estimator = self._create_estimator(self.source)
+        self.sigma_per_second = 0.0
+        self.last_tick_update_time = 0.0
         
         logger.info(f"{self.symbolName}波动率管理器初始化完成")
     
+    def _create_estimator(self, source: str):
+        if source == 'atr':
+            return None
+        if source == 'ewma':
+            return EwmaVolatility(self.config.EWMA_HALF_LIFE)
+        if source in ('parkinson', 'garman_klass'):
+            return RangeVolatility(source, self.config.MICRO_BAR_SECONDS, self.config.RANGE_WINDOW)
+        logger.warning(f"{self.symbolName}未知的波动率来源{source}，使用ATR")
+        self.source = 'atr'
+        return None
+
+    @property
+    def uses_kline(self) -> bool:
+        """是否需要订阅K线"""
+        return self.estimator is None
+
+    def on_mid(self, price: float, now: Optional[float] = None):
+        """
+        中间价更新，逐笔估计器O(1)更新，按TICK_UPDATE_INTERVAL节流地调整价差参数
+        """
+        if self.estimator is None:
+            return
+        now = time.time() if now is None else now
+        self.estimator.update(price, now)
+        if now - self.last_tick_update_time < self.config.TICK_UPDATE_INTERVAL:
+            return
+        if self.estimator.count < self.config.MIN_TICK_SAMPLES:
+            return
+        self.last_tick_update_time = now
+        self.sigma_per_second = self.estimator.sigma()
+        if self.sigma_per_second <= 0:
+            return
+        self.current_volatility = self.sigma_per_second * self.horizon_seconds ** 0.5
+        self.last_update_time = now
+        if self.tradeManager:
+            self._update_trade_manager_spreads(self.current_volatility)
+
     def bind_trade_manager(self, trade_manager):
         """绑定TradeManager实例"""
         self.tradeManager = trade_manager
@@ -235,6 +282,8 @@ class VolatilityManager:
             try:
                 # 使用websocket监听K线数据
                 ohlcv_data = await self.wsExchange.watch_ohlcv(self.symbolName, self.config.KLINE_TIMEFRAME)
+                if self.tradeManager is not None:
+                    self.tradeManager.streamWatchdog.touch('ohlcv')
                 
                 if ohlcv_data:
                     # 获取最新的K线数据
@@ -248,6 +297,8 @@ class VolatilityManager:
             except ccxt.NetworkError as e:
                 logger.error(f"{self.symbolName}K线数据获取网络错误: {e}")
                 await asyncio.sleep(5)  # 网络错误时等待5秒重试
+            except StreamStalled as e:
+                logger.warning(f"{e}")
             except ccxt.ExchangeError as e:
                 logger.error(f"{self.symbolName}K线数据获取交易所错误: {e}")
                 await asyncio.sleep(5)
@@ -264,12 +315,27 @@ class VolatilityManager:
         获取当前波动率信息
         """
         return {
+            'source': self.source,
             'current_volatility': self.current_volatility,
+            'sigma_per_second': self.get_sigma_per_second(),
             'atr_values': self.atr_values[-5:] if self.atr_values else [],  # 最近5个ATR值
             'kline_count': len(self.kline_data),
             'last_update_time': self.last_update_time
         }
     
+    def get_sigma_per_second(self) -> float:
+        """
+        将K线周期的ATR波动率换算为每秒相对波动率（GLFT模式使用）
+
+        Returns:
+            每秒相对波动率，尚无波动率数据时返回0
+        """
+        if self.estimator is not None:
+            return self.sigma_per_second
+        if self.current_volatility <= 0:
+            return 0.0
+        return self.current_volatility / self.horizon_seconds ** 0.5
+
     def stop(self):
         """
         停止波动率监控
@@ -3,8 +3,18 @@ from util.sLogger import logger
 import ccxt
 import ccxt.pro
 import asyncio
+import time
 from core.tradeManager import TradeManager
 from config.config import get_websocket_config
+from core.orderStream import get_order_dispatcher
+from core.streamWatchdog import StreamStalled
+from util.records import OrderRecord, to_order
+from util.performanceMonitor import get_performance_monitor
+from core.orderSweeper import get_order_sweeper
+
+
+async def _resolved(value):
+    return value
 
 
 class WebSocketManager:
@@ -12,9 +22,12 @@ class WebSocketManager:
         self.symbolName = symbolName
         self.wsExchange = wsExchange
         self.tradeManager = tradeManage
+        self.watchdog = tradeManage.streamWatchdog
         self.run = run
         self.inWatchOpenOrder = False
         self.openOrders = []
+        # 监听状态变化（开始、停止、监听订单变化）时唤醒watchOpenOrder，空闲时不轮询
+        self._watchStateChanged = asyncio.Event()
         # 新增：订单监听增强机制
         self.orderWatchStartTime = None  # 订单监听开始时间
         self.lastOrderCheckTime = None   # 最后一次主动检查时间
@@ -34,6 +47,7 @@ class WebSocketManager:
                 #  # logger.info(f"{self.symbolName}当前价格: {ticker['last']}")
                 # await self.tradeManager.updateLastPrice(float(ticker['last']))
                 orderbook = await self.wsExchange.watchOrderBook(self.symbolName)
+                self.watchdog.touch('book')
                 # logger.info(f"{self.symbolName}当前订单簿: {orderbook}")
                 bid = orderbook['bids'][0][0]
                 ask = orderbook['asks'][0][0]
@@ -47,6 +61,8 @@ class WebSocketManager:
                     self.isHandlingNetworkError = False
                 else:
                     logger.debug(f"{self.symbolName}价格获取：网络错误处理中，跳过重复调用")
+            except StreamStalled as e:
+                logger.warning(f"{e}")
             except ccxt.ExchangeError as e:
                 logger.error(f"{self.symbolName}价格获取交易所错误: {e}")
             except asyncio.CancelledError:
@@ -60,6 +76,7 @@ class WebSocketManager:
         while self.run:
             try:
                 position = await self.wsExchange.watchPositions()
+                self.watchdog.touch('positions')
                 #   logger.info(f"{self.symbolName}当前持仓: {position}")
                 await self.tradeManager.updatePosition(position)
             except ccxt.NetworkError as e:
@@ -71,6 +88,8 @@ class WebSocketManager:
                     self.isHandlingNetworkError = False
                 else:
                     logger.debug(f"{self.symbolName}持仓获取：网络错误处理中，跳过重复调用")
+            except StreamStalled as e:
+                logger.warning(f"{e}")
             except ccxt.ExchangeError as e:
                 logger.error(f"{self.symbolName}持仓获取交易所错误: {e}")
             except asyncio.CancelledError:
@@ -84,6 +103,7 @@ class WebSocketManager:
         while self.run:
             try:
                 balance = await self.wsExchange.watchBalance()
+                self.watchdog.touch('balance')
                 await self.tradeManager.updateBalance(float(balance[self.tradeManager.coin]['free']), float(balance[self.tradeManager.coin]['total']))
             except ccxt.NetworkError as e:
                 logger.error(f"余额获取网络错误: {e}")
@@ -94,6 +114,8 @@ class WebSocketManager:
                     self.isHandlingNetworkError = False
                 else:
                     logger.debug(f"{self.symbolName}余额获取：网络错误处理中，跳过重复调用")
+            except StreamStalled as e:
+                logger.warning(f"{e}")
             except ccxt.ExchangeError as e:
                 logger.error(f"余额获取交易所错误: {e}")
             except asyncio.CancelledError:
@@ -103,38 +125,95 @@ class WebSocketManager:
                 logger.error(f"余额获取未知错误: {e}")
 
     async def watchMyOrder(self):
-        self.wsExchange.newUpdates = False
+        """
+        订单流：本交易所连接上唯一的watchOrders消费者
+        每批推送先更新TradeManager的挂单簿，再检测监听中的订单是否成交
+        """
         logger.info(f"{self.symbolName}订单获取websocket模块启动")
-        while self.run:
-            try:
-                allOrder = await self.wsExchange.watchOrders()
-                # logger.info(f"当前全部订单: {allOrder}")
-                targetOrder = await tradeUtil.openOrderFilter(allOrder, self.symbolName)
-                # logger.info(f"{self.symbolName}当前订单: {targetOrder}")
-                await self.tradeManager.updateOrders(targetOrder)
-            except ccxt.NetworkError as e:
-                logger.error(f"{self.symbolName}订单获取网络错误: {e}")
-                # 检查是否已经在处理网络错误，避免重复调用
-                if not self.isHandlingNetworkError and not self.tradeManager.networkError:
-                    self.isHandlingNetworkError = True
-                    await self.tradeManager.networkHelper()
-                    self.isHandlingNetworkError = False
-                else:
-                    logger.debug(f"{self.symbolName}订单获取：网络错误处理中，跳过重复调用")
-            except ccxt.ExchangeError as e:
-                logger.error(f"{self.symbolName}订单获取交易所错误: {e}")
-            except asyncio.CancelledError:
-                logger.info(f"{self.symbolName}订单获取任务已取消")
-                self.run = False
-            except Exception as e:
-                logger.error(f"{self.symbolName}订单获取未知错误: {e}")
+        dispatcher = get_order_dispatcher(self.wsExchange)
+        dispatcher.subscribe(self.symbolName, self.tradeManager.updateOrders,
+                             self._onOrderUpdates, self._onOrderStreamError)
+        try:
+            await dispatcher.run()
+        except asyncio.CancelledError:
+            logger.info(f"{self.symbolName}订单获取任务已取消")
+            self.run = False
+        finally:
+            dispatcher.unsubscribe(self.symbolName)
+
+    async def _onOrderStreamError(self, e: Exception):
+        if isinstance(e, ccxt.NetworkError):
+            logger.error(f"{self.symbolName}订单获取网络错误: {e}")
+            # 检查是否已经在处理网络错误，避免重复调用
+            if not self.isHandlingNetworkError and not self.tradeManager.networkError:
+                self.isHandlingNetworkError = True
+                await self.tradeManager.networkHelper()
+                self.isHandlingNetworkError = False
+            else:
+                logger.debug(f"{self.symbolName}订单获取：网络错误处理中，跳过重复调用")
+        elif isinstance(e, StreamStalled):
+            logger.warning(f"{e}")
+        elif isinstance(e, ccxt.ExchangeError):
+            logger.error(f"{self.symbolName}订单获取交易所错误: {e}")
+        else:
+            logger.error(f"{self.symbolName}订单获取未知错误: {e}")
+
+    async def _onOrderUpdates(self, orders_by_id: dict):
+        """成交检测阶段：检查监听中的订单在本批推送中的状态"""
+        # 上一条订单推送之后收到的持仓、余额推送都可能是本批成交的确认
+        previous_push = self.watchdog.last_message('orders')
+        self.watchdog.touch('orders')
+        if not self.inWatchOpenOrder or not self.openOrders:
+            return
+
+        filled_orders = []
+        missing_order_ids = []
+        for order_id in self.openOrders:
+            order = orders_by_id.get(str(order_id))
+            if order is None:
+                # 订单不在推送中，说明可能已经完全成交并从未成交列表中移除
+                missing_order_ids.append(order_id)
+                logger.info(
+                    f"{self.symbolName}订单{order_id}已从websocket更新中消失，可能已完全成交")
+            elif order.status in ['closed', 'filled']:
+                filled_orders.append(order)
+                logger.info(
+                    f"{self.symbolName}websocket检测到订单{order_id}已成交: {order.side} {order.amount} @ {order.price}")
+
+        if any(order.filled for order in filled_orders):
+            # 订单推送报告成交时登记持仓和余额推送，成交处理之前完成，避免推送先到被漏记
+            self.watchdog.expect('positions', since=previous_push)
+            self.watchdog.expect('balance', since=previous_push)
+        if filled_orders or missing_order_ids:
+            logger.info(
+                f"{self.symbolName}检测到订单成交，websocket检测: {len(filled_orders)}个，消失订单: {len(missing_order_ids)}个")
+            # 先停止当前监听，避免重复处理；成交处理放到独立任务中，不阻塞订单流
+            self.stopOrderWatch()
+            asyncio.create_task(self._notifyOrderFilled(filled_orders, missing_order_ids))
+
+    def stopOrderWatch(self):
+        """停止订单监听"""
+        self.inWatchOpenOrder = False
+        self.openOrders = []
+        self.orderWatchStartTime = None
+        self._watchStateChanged.set()
+
+    async def _notifyOrderFilled(self, filled_orders, missing_order_ids):
+        """通知TradeManager处理订单成交"""
+        try:
+            await self.tradeManager.onOrderFilled(filled_orders, missing_order_ids)
+        except Exception as e:
+            logger.error(
+                f"{self.symbolName}通知TradeManager处理订单成交时发生错误: {e}")
 
     async def runOpenOrderWatch(self, *orders):
         # 提取订单ID列表
         order_ids = []
         for order in orders:
             if order is not None:
-                if isinstance(order, dict) and 'id' in order:
+                if isinstance(order, OrderRecord):
+                    order_ids.append(order.id)
+                elif isinstance(order, dict) and 'id' in order:
                     order_ids.append(order['id'])
                 else:
                     order_ids.append(str(order))
@@ -142,9 +221,9 @@ class WebSocketManager:
         self.openOrders = order_ids
         self.inWatchOpenOrder = True
         # 新增：记录监听开始时间
-        import time
         self.orderWatchStartTime = time.time()
         self.lastOrderCheckTime = time.time()
+        self._watchStateChanged.set()
         logger.info(
             f"接收到{self.symbolName}订单监控需求: {order_ids}，开始时间: {self.orderWatchStartTime}")
         
@@ -155,187 +234,172 @@ class WebSocketManager:
             if filled_orders or missing_order_ids:
                 logger.info(f"{self.symbolName}初始检查发现{len(filled_orders)}个已成交订单，{len(missing_order_ids)}个消失订单")
                 # 停止监听并通知TradeManager
-                self.inWatchOpenOrder = False
-                self.openOrders = []
-                self.orderWatchStartTime = None
-                await self.tradeManager.onOrderFilled(filled_orders)
+                self.stopOrderWatch()
+                await self._notifyOrderFilled(filled_orders, missing_order_ids)
         except Exception as e:
             logger.error(f"{self.symbolName}初始订单状态检查失败: {e}")
 
+    def untrackOrders(self, order_ids):
+        """停止监听指定订单（改单或撤单前调用，避免旧订单消失被误判为成交）"""
+        ids = {str(order_id) for order_id in order_ids}
+        self.openOrders = [order_id for order_id in self.openOrders if str(order_id) not in ids]
+        if not self.openOrders:
+            self.stopOrderWatch()
+
     async def isOrderWatchActive(self):
         """检查订单监听是否活跃"""
         return self.inWatchOpenOrder and len(self.openOrders) > 0
 
+    async def _fetchClosedSince(self):
+        """获取监听开始以来的已完成订单，交易所不支持时返回空列表"""
+        if not self.wsExchange.has.get('fetchClosedOrders'):
+            return []
+        start = self.orderWatchStartTime or (time.time() - self.orderWatchTimeout)
+        # 多留一分钟余量，覆盖下单和开始监听之间的时间差
+        return await self.wsExchange.fetchClosedOrders(self.symbolName, int((start - 60) * 1000))
+
+    async def _fetchOrderDetail(self, order_id):
+        try:
+            return await self.wsExchange.fetchOrder(order_id, self.symbolName)
+        except Exception as e:
+            logger.warning(f"{self.symbolName}获取订单{order_id}详情失败: {e}")
+            return None
+
     async def _activeCheckOrderStatus(self):
-        """主动检查订单状态（用于检测瞬间成交的订单）"""
+        """
+        主动检查订单状态（用于检测瞬间成交的订单）
+
+        未成交订单和监听开始以来的已完成订单并发查询；消失的订单先在已完成订单中查找，
+        找不到的再并发逐个查询，任一订单确认成交后立即返回，不再等待其余查询。
+        """
         if not self.inWatchOpenOrder or len(self.openOrders) == 0:
             return [], []
 
+        start = time.perf_counter()
         try:
-            # 获取当前所有未成交订单
-            allOpenOrders = await self.wsExchange.fetchOpenOrders(self.symbolName)
-            logger.debug(f"{self.symbolName}主动检查获取到{len(allOpenOrders)}个未成交订单")
+            # 获取当前所有未成交订单，同时获取近期已完成订单
+            # 监听开始后发起的账户级巡检结果仍然有效时直接复用，不再单独查询
+            open_orders = get_order_sweeper().snapshot(
+                self.symbolName, since=max(self.orderWatchStartTime or 0, time.time() - self.orderCheckInterval))
+            open_request = self.wsExchange.fetchOpenOrders(self.symbolName) if open_orders is None else _resolved(open_orders)
+            open_result, closed_result = await asyncio.gather(
+                open_request, self._fetchClosedSince(), return_exceptions=True)
+            if isinstance(open_result, BaseException):
+                raise open_result
+            if isinstance(closed_result, BaseException):
+                logger.warning(f"{self.symbolName}获取已完成订单失败，改为逐个查询: {closed_result}")
+                closed_result = []
+            logger.debug(f"{self.symbolName}主动检查获取到{len(open_result)}个未成交订单")
 
             # 检查我们监听的订单是否还在未成交列表中
-            missing_orders = []
-            existing_orders = []
-
-            for order_id in self.openOrders:
-                order_found = False
-                for open_order in allOpenOrders:
-                    if str(open_order['id']) == str(order_id):
-                        order_found = True
-                        existing_orders.append(order_id)
-                        break
-
-                if not order_found:
-                    # 订单不在未成交列表中，可能已经成交
-                    missing_orders.append(order_id)
-                    logger.info(
-                        f"{self.symbolName}主动检查发现订单{order_id}已不在未成交列表中")
-
+            open_ids = {str(order['id']) for order in open_result}
+            missing_orders = [order_id for order_id in self.openOrders if str(order_id) not in open_ids]
+            for order_id in missing_orders:
+                logger.info(
+                    f"{self.symbolName}主动检查发现订单{order_id}已不在未成交列表中")
             logger.debug(
-                f"{self.symbolName}主动检查结果: 存在{len(existing_orders)}个订单，消失{len(missing_orders)}个订单")
+                f"{self.symbolName}主动检查结果: 存在{len(self.openOrders) - len(missing_orders)}个订单，消失{len(missing_orders)}个订单")
+            if not missing_orders:
+                return [], []
 
-            # 如果有订单消失，尝试获取这些订单的详细信息
+            closed_by_id = {str(order['id']): order for order in closed_result}
             filled_orders = []
+            unresolved = []
             for order_id in missing_orders:
-                try:
-                    # 尝试获取订单详情
-                    order_detail = await self.wsExchange.fetchOrder(order_id, self.symbolName)
-                    if order_detail and order_detail.get('status') in ['closed', 'filled', 'canceled']:
-                        filled_orders.append(order_detail)
-                        logger.info(
-                            f"{self.symbolName}主动检查确认订单{order_id}状态为{order_detail.get('status')}: {order_detail.get('side')} {order_detail.get('filled')} @ {order_detail.get('average') or order_detail.get('price')}")
-                except Exception as e:
-                    logger.warning(f"{self.symbolName}获取订单{order_id}详情失败: {e}")
-                    # 即使获取详情失败，也认为订单可能已成交
-                    filled_orders.append(
-                        {'id': order_id, 'status': 'filled', 'filled': 0})
+                order_detail = closed_by_id.get(str(order_id))
+                if order_detail is not None:
+                    filled_orders.append(to_order(order_detail))
+                else:
+                    unresolved.append(order_id)
 
+            # 已完成订单中确认了成交就不再逐个查询
+            if unresolved and not any(o.status in ['closed', 'filled'] for o in filled_orders):
+                tasks = {asyncio.ensure_future(self._fetchOrderDetail(order_id)): order_id for order_id in unresolved}
+                pending = set(tasks)
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        confirmed = False
+                        for task in done:
+                            order_id = tasks[task]
+                            order_detail = task.result()
+                            if order_detail and order_detail.get('status') in ['closed', 'filled', 'canceled']:
+                                filled_orders.append(to_order(order_detail))
+                                confirmed = confirmed or order_detail.get('status') in ['closed', 'filled']
+                            elif order_detail is None:
+                                # 即使获取详情失败，也认为订单可能已成交
+                                filled_orders.append(OrderRecord(str(order_id), self.symbolName, status='filled'))
+                        if confirmed:
+                            break
+                finally:
+                    for task in pending:
+                        task.cancel()
+
+            for order_detail in filled_orders:
+                logger.info(
+                    f"{self.symbolName}主动检查确认订单{order_detail.id}状态为{order_detail.status}: {order_detail.side} {order_detail.filled} @ {order_detail.fill_price}")
             return filled_orders, missing_orders
 
         except Exception as e:
             logger.error(f"{self.symbolName}主动检查订单状态时发生错误: {e}")
             return [], []
+        finally:
+            get_performance_monitor().record_stage_time('主动订单检查', (time.perf_counter() - start) * 1000)
+
+    def _nextCheckDeadline(self) -> float:
+        """下一次主动检查的时间：定期检查和监听超时中较早的一个"""
+        deadline = (self.lastOrderCheckTime or 0) + self.orderCheckInterval
+        if self.orderWatchStartTime:
+            deadline = min(deadline, self.orderWatchStartTime + self.orderWatchTimeout)
+        return deadline
 
     async def watchOpenOrder(self):
+        """
+        订单监听的定期主动检查
+        websocket推送中的成交由订单流分发器检测，这里只负责按间隔和超时主动查询订单状态。
+        没有监听订单时等待状态变化事件，不产生任何唤醒；监听中则睡眠到下一次检查时间，
+        即使没有websocket消息也能按时检查。
+        """
         logger.info(f"{self.symbolName}未成交订单获取websocket模块启动")
         while self.run:
-            if self.inWatchOpenOrder:
-                try:
-                    import time
-                    current_time = time.time()
-
-                    # 检查是否需要进行主动检查
-                    should_active_check = False
-                    if self.lastOrderCheckTime is None or (current_time - self.lastOrderCheckTime) >= self.orderCheckInterval:
-                        should_active_check = True
-                        self.lastOrderCheckTime = current_time
-                        logger.debug(
-                            f"{self.symbolName}触发定期主动检查，间隔: {self.orderCheckInterval}秒")
-
-                    # 检查是否超时
-                    if self.orderWatchStartTime and (current_time - self.orderWatchStartTime) >= self.orderWatchTimeout:
-                        logger.warning(
-                            f"{self.symbolName}订单监听超时({self.orderWatchTimeout}秒)，执行主动检查")
-                        should_active_check = True
-
-                    # 执行主动检查
-                    active_check_filled_orders = []
-                    missing_order_ids_from_active = []
-                    if should_active_check:
-                        logger.info(
-                            f"{self.symbolName}执行主动订单状态检查，当前监听订单: {self.openOrders}")
-                        active_check_filled_orders, missing_order_ids_from_active = await self._activeCheckOrderStatus()
-
-                        if active_check_filled_orders or missing_order_ids_from_active:
-                            logger.info(
-                                f"{self.symbolName}主动检查发现{len(active_check_filled_orders)}个已成交订单，{len(missing_order_ids_from_active)}个消失订单")
-
-                    # 正常的websocket监听
-                    allOrder = await self.wsExchange.watchOrders()
-
-                    # 只处理当前监听的订单，过滤掉不相关的订单更新
-                    relevant_orders = []
-                    for order in allOrder:
-                        if str(order['id']) in [str(oid) for oid in self.openOrders]:
-                            relevant_orders.append(order)
-
-                    # 只在有相关订单更新时才记录日志
-                    if relevant_orders:
-                        logger.info(f"监听到相关订单更新: {len(relevant_orders)}个订单")
-                        logger.info(f"当前监听的订单ID: {self.openOrders}")
-                        logger.info(
-                            f"收到的相关订单ID: {[str(o['id']) for o in relevant_orders]}")
-
-                    # 检查监听的订单是否有成交
-                    websocket_filled_orders = []
-                    missing_order_ids = []
-                    for order_id in self.openOrders:
-                        order_found = False
-                        for order in relevant_orders:
-                            # 确保订单ID比较时类型一致
-                            if str(order['id']) == str(order_id):
-                                order_found = True
-                                # 检查订单状态是否为已成交或部分成交
-                                if order['status'] in ['closed', 'filled']:
-                                    websocket_filled_orders.append(order)
-                                    logger.info(
-                                        f"{self.symbolName}websocket检测到订单{order_id}已成交: {order['side']} {order['amount']} @ {order['price']}")
-                                break
-
-                        # 如果订单在相关订单中找不到，说明可能已经完全成交并从未成交列表中移除
-                        if not order_found:
-                            missing_order_ids.append(order_id)
-                            logger.info(
-                                f"{self.symbolName}订单{order_id}已从websocket更新中消失，可能已完全成交")
-
-                    # 合并websocket检测和主动检查的结果
-                    all_filled_orders = websocket_filled_orders + active_check_filled_orders
-
-                    # 去重（避免同一订单被重复处理）
-                    unique_filled_orders = []
-                    processed_order_ids = set()
-                    for order in all_filled_orders:
-                        order_id = str(order.get('id', ''))
-                        if order_id not in processed_order_ids:
-                            unique_filled_orders.append(order)
-                            processed_order_ids.add(order_id)
-
-                    # 如果有订单成交或消失，通知tradeManager进行后续处理
-                    if unique_filled_orders or missing_order_ids:
-                        logger.info(
-                            f"{self.symbolName}检测到订单成交，websocket检测: {len(websocket_filled_orders)}个，主动检查: {len(active_check_filled_orders)}个，消失订单: {len(missing_order_ids)}个")
-                        # 先停止当前监听，避免重复处理
-                        self.inWatchOpenOrder = False
-                        self.openOrders = []
-                        self.orderWatchStartTime = None
-                        # 然后通知tradeManager进行后续处理
-                        try:
-                            await self.tradeManager.onOrderFilled(unique_filled_orders)
-                        except Exception as e:
-                            logger.error(
-                                f"{self.symbolName}通知TradeManager处理订单成交时发生错误: {e}")
-                            # 如果处理失败，重新启动监听以防止程序卡死
-                            await asyncio.sleep(1)
-                            continue
-
-                except ccxt.NetworkError as e:
-                    logger.error(f"{self.symbolName}订单获取网络错误: {e}")
-                    # 检查是否已经在处理网络错误，避免重复调用
-                    if not self.isHandlingNetworkError and not self.tradeManager.networkError:
-                        self.isHandlingNetworkError = True
-                        await self.tradeManager.networkHelper()
-                        self.isHandlingNetworkError = False
-                    else:
-                        logger.debug(f"{self.symbolName}订单获取：网络错误处理中，跳过重复调用")
-                except ccxt.ExchangeError as e:
-                    logger.error(f"{self.symbolName}订单获取交易所错误: {e}")
-                except asyncio.CancelledError:
-                    logger.info(f"{self.symbolName}订单获取任务已取消")
-                    self.run = False
-                except Exception as e:
-                    logger.error(f"{self.symbolName}订单获取未知错误: {e}")
-            else:
-                await asyncio.sleep(0.1)
+            try:
+                self._watchStateChanged.clear()
+                if not self.inWatchOpenOrder:
+                    await self._watchStateChanged.wait()
+                    continue
+
+                current_time = time.time()
+                deadline = self._nextCheckDeadline()
+                if current_time < deadline:
+                    # 监听状态变化时提前醒来重新计算检查时间
+                    try:
+                        await asyncio.wait_for(self._watchStateChanged.wait(), deadline - current_time)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                if (current_time - (self.lastOrderCheckTime or 0)) >= self.orderCheckInterval:
+                    logger.debug(
+                        f"{self.symbolName}触发定期主动检查，间隔: {self.orderCheckInterval}秒")
+                self.lastOrderCheckTime = current_time
+
+                # 检查是否超时，超时后重新计时
+                if self.orderWatchStartTime and (current_time - self.orderWatchStartTime) >= self.orderWatchTimeout:
+                    logger.warning(
+                        f"{self.symbolName}订单监听超时({self.orderWatchTimeout}秒)，执行主动检查")
+                    self.orderWatchStartTime = current_time
+
+                logger.info(
+                    f"{self.symbolName}执行主动订单状态检查，当前监听订单: {self.openOrders}")
+                filled_orders, missing_order_ids = await self._activeCheckOrderStatus()
+                if (filled_orders or missing_order_ids) and self.inWatchOpenOrder:
+                    logger.info(
+                        f"{self.symbolName}主动检查发现{len(filled_orders)}个已成交订单，{len(missing_order_ids)}个消失订单")
+                    self.stopOrderWatch()
+                    await self._notifyOrderFilled(filled_orders, missing_order_ids)
+            except asyncio.CancelledError:
+                logger.info(f"{self.symbolName}订单获取任务已取消")
+                self.run = False
+            except Exception as e:
+                logger.error(f"{self.symbolName}订单主动检查未知错误: {e}")
+                await asyncio.sleep(1)
@@ -1,72 +1,195 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import ccxt
+import ccxt.async_support
 import os
 import datetime
 import time
 import sys
 import json
+import numpy as np
 from dotenv import load_dotenv
+from config.config import get_network_config, get_trade_history_config
+from util.tradeCache import TradeHistoryCache
 
-def fetch_all_trades(exchange, symbol, since_timestamp):
+async def fetch_window_trades(exchange, symbol, start_ms, end_ms, limit, semaphore):
     """
-    分页获取指定交易对的所有交易记录
+    分页获取单个时间窗口[start_ms, end_ms)内的成交记录
     """
-    all_trades = []
-    limit = 100  # 每页获取的记录数
-    now = exchange.milliseconds()
-    empty_count = 0  # 连续空结果的计数器
-    max_empty_attempts = 3  # 最大连续空结果尝试次数
-    
-    while since_timestamp < now and empty_count < max_empty_attempts:
-        try:
-            # 获取一页交易记录
-            trades = exchange.fetch_my_trades(symbol=symbol, since=since_timestamp, limit=limit)
-            
-            if not trades:  # 如果没有更多交易记录
-                empty_count += 1
-                print(f"  -> 获取到空结果，尝试次数: {empty_count}/{max_empty_attempts}")
-                
-                # 如果已经达到最大尝试次数，并且时间戳很近当前时间，说明真的没有更多数据了
-                if empty_count >= max_empty_attempts:
-                    print(f"  -> 达到最大空结果尝试次数，停止查询")
-                    break
-                
-                # 稍微增加时间戳，继续请求下一页
-                since_timestamp += 60000 * limit  # 向前推limit分钟
-                time.sleep(exchange.rateLimit / 1000)
-                continue
-            else:
-                empty_count = 0  # 重置空结果计数器
-                
-            # 添加到总记录中
-            all_trades.extend(trades)
-            
-            # 更新since_timestamp为最后一条记录的时间，避免重复
-            since_timestamp = trades[-1]['timestamp'] + 1
-            
-            print(f"  -> 已获取 {len(trades)} 条记录，总计 {len(all_trades)} 条记录")
-            
-            # 防止API请求过于频繁
-            time.sleep(exchange.rateLimit / 1000)
-            
-        except ccxt.NetworkError as e:
-            print(f"获取 {symbol} 交易记录时发生网络错误: {e}")
-            time.sleep(exchange.rateLimit / 1000)
-            continue
-        except ccxt.ExchangeError as e:
-            print(f"获取 {symbol} 交易记录时交易所返回错误: {e}")
-            break
-        except Exception as e:
-            print(f"获取 {symbol} 交易记录时发生未知错误: {e}")
+    retry_config = get_network_config()
+    window_trades = {}
+    cursor = start_ms
+
+    while cursor < end_ms:
+        attempts = 0
+        while True:
+            try:
+                # 交易所实例开启了enableRateLimit，并发请求会由ccxt统一限速
+                async with semaphore:
+                    trades = await exchange.fetch_my_trades(
+                        symbol=symbol, since=cursor, limit=limit, params={'until': end_ms - 1})
+                break
+            except ccxt.NetworkError as e:
+                attempts += 1
+                if attempts > retry_config.MAX_RETRY_ATTEMPTS:
+                    raise
+                print(f"  -> 获取 {symbol} 交易记录时发生网络错误，重试 {attempts}/{retry_config.MAX_RETRY_ATTEMPTS}: {e}")
+                await asyncio.sleep(retry_config.RETRY_DELAY)
+
+        new_count = 0
+        for trade in trades:
+            if start_ms <= trade['timestamp'] < end_ms and trade['id'] not in window_trades:
+                window_trades[trade['id']] = trade
+                new_count += 1
+
+        # 不足一页说明窗口已取完
+        if len(trades) < limit:
             break
-    
-    return all_trades
+
+        # 以最后一条记录的时间继续翻页，同一毫秒内的重复记录按id去重
+        last_timestamp = trades[-1]['timestamp']
+        if last_timestamp > cursor:
+            cursor = last_timestamp
+        else:
+            # 同一毫秒内的记录超过一页，只能跳到下一毫秒
+            if new_count == 0:
+                print(f"  -> {symbol} 在 {cursor} 毫秒内的成交超过 {limit} 条，部分记录可能缺失")
+            cursor += 1
+
+    return list(window_trades.values())
+
+
+def merge_trades(chunks):
+    """
+    合并多个窗口的成交记录，按id去重并按时间排序
+    """
+    merged = {}
+    for chunk in chunks:
+        for trade in chunk:
+            merged[trade['id']] = trade
+    return sorted(merged.values(), key=lambda t: (t['timestamp'], str(t['id'])))
+
+
+async def fetch_all_trades(exchange, symbol, since_timestamp, until_timestamp=None, semaphore=None):
+    """
+    获取指定交易对的所有交易记录
+
+    长时间范围会按FETCH_WINDOW_HOURS拆分为多个窗口并发获取，最后按时间顺序合并
+    """
+    history_config = get_trade_history_config()
+    if until_timestamp is None:
+        until_timestamp = exchange.milliseconds()
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(history_config.FETCH_MAX_CONCURRENCY)
+
+    window_ms = int(history_config.FETCH_WINDOW_HOURS * 3600 * 1000)
+    windows = [(start, min(start + window_ms, until_timestamp))
+               for start in range(since_timestamp, until_timestamp, window_ms)]
+
+    chunks = await asyncio.gather(*[
+        fetch_window_trades(exchange, symbol, start, end, history_config.FETCH_PAGE_LIMIT, semaphore)
+        for start, end in windows
+    ])
+    trades = merge_trades(chunks)
+    print(f"  -> {symbol} 共 {len(windows)} 个时间窗口，获取到 {len(trades)} 条记录")
+    return trades
+
+
+async def fetch_symbols_trades(exchange, symbols, since_timestamp, until_timestamp=None):
+    """
+    并发获取多个交易对的成交记录
+
+    Returns:
+        (交易对 -> 成交记录列表, 交易对 -> 异常) 两个字典
+    """
+    semaphore = asyncio.Semaphore(get_trade_history_config().FETCH_MAX_CONCURRENCY)
+    results = await asyncio.gather(*[
+        fetch_all_trades(exchange, symbol, since_timestamp, until_timestamp, semaphore)
+        for symbol in symbols
+    ], return_exceptions=True)
+
+    trades_by_symbol = {}
+    errors = {}
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, Exception):
+            errors[symbol] = result
+        else:
+            trades_by_symbol[symbol] = result
+    return trades_by_symbol, errors
+
+async def sync_trade_cache(exchange, cache, symbols, since_timestamp):
+    """
+    增量同步本地成交缓存
+
+    只获取缓存覆盖范围之外的成交：缓存起点之前的部分（如果起始时间更早）以及上次同步结束之后的新成交。
+
+    Returns:
+        交易对 -> 异常 的字典
+    """
+    semaphore = asyncio.Semaphore(get_trade_history_config().FETCH_MAX_CONCURRENCY)
+    until_timestamp = exchange.milliseconds()
+
+    async def sync_symbol(symbol):
+        covered_since = cache.covered_since(symbol)
+        high_water_mark = cache.high_water_mark(symbol)
+        fetched_until = cache.fetched_until(symbol)
+
+        ranges = []
+        if covered_since is None or since_timestamp < covered_since:
+            # 缓存未覆盖的较早部分
+            ranges.append((since_timestamp, covered_since or until_timestamp))
+        if covered_since is not None:
+            # 从上次同步结束（旧缓存没有记录时用最高水位或覆盖起点）开始获取新成交，同一毫秒内的记录按id去重
+            start = next(t for t in (fetched_until, high_water_mark, covered_since) if t is not None)
+            ranges.append((max(start, since_timestamp), until_timestamp))
+
+        chunks = await asyncio.gather(*[
+            fetch_all_trades(exchange, symbol, start, end, semaphore)
+            for start, end in ranges if start < end
+        ])
+        added = cache.merge(symbol, merge_trades(chunks), covered_since=since_timestamp,
+                            fetched_until=until_timestamp)
+        print(f"  -> {symbol} 新增 {added} 条成交记录，缓存共 {cache.symbol_info(symbol)['count']} 条")
+
+    results = await asyncio.gather(*[sync_symbol(symbol) for symbol in symbols], return_exceptions=True)
+    return {symbol: result for symbol, result in zip(symbols, results) if isinstance(result, Exception)}
+
+
+def print_pnl_summary(columns_by_symbol, method='fifo'):
+    """
+    输出已实现盈亏和开平仓配对统计
+
+    默认使用向量化的FIFO配对，LIFO配对需要逐笔扫描，可通过method='lifo'指定
+    """
+    # 分析依赖pandas，只在需要输出盈亏时导入
+    from util.tradeAnalytics import analyze, fills_from_columns
+    for symbol, columns in columns_by_symbol.items():
+        result = analyze(fills_from_columns(symbol, columns), method)
+        summary = result['summary'].iloc[0]
+        inventory = result['inventory'].iloc[0]
+        print(f"\n{symbol} 已实现盈亏（{method.upper()}配对）:")
+        print(f"  - 毛利润: {summary['gross_pnl']:.4f}，手续费: {summary['fees']:.4f}，净利润: {summary['net_pnl']:.4f}")
+        if summary['round_trips'] > 0:
+            print(f"  - 配对次数: {int(summary['round_trips'])}，胜率: {summary['win_rate']:.2%}，"
+                  f"平均持仓时间: {summary['avg_holding_time']:.1f}秒")
+        for _, row in result['liquidity'].iterrows():
+            print(f"  - {row['liquidity']}: {int(row['fills'])} 笔，成交量 {row['volume']:.4f}，手续费 {row['fee']:.4f}")
+        print(f"  - 最大多仓: {inventory['max_long']:.4f}，最大空仓: {inventory['max_short']:.4f}，"
+              f"平均绝对库存: {inventory['mean_abs_inventory']:.4f}")
+
 
 def calculate_total_fees(symbols: list):
     """
     连接交易所，获取指定交易对在指定时间后的所有成交记录，并统计手续费。
     """
+    asyncio.run(calculate_total_fees_async(symbols))
+
+
+async def calculate_total_fees_async(symbols: list):
+    """
+    calculate_total_fees的异步实现，所有交易对和时间窗口并发获取
+    """
     # --- 1. 加载和设置 ---
     
     # --- 1. 加载和设置 ---
@@ -94,7 +217,7 @@ def calculate_total_fees(symbols: list):
     # --- 2. 配置交易所 ---
     exchange_id = 'bitget'
     try:
-        exchange_class = getattr(ccxt, exchange_id)
+        exchange_class = getattr(ccxt.async_support, exchange_id)
     except AttributeError:
         print(f"错误：找不到交易所 '{exchange_id}'。")
         return
@@ -102,6 +225,7 @@ def calculate_total_fees(symbols: list):
     config = {
         'apiKey': api_key,
         'secret': api_secret,
+        'enableRateLimit': True,  # 并发请求由ccxt统一限速
         'options': {
             'defaultType': 'swap',
         },
@@ -136,29 +260,40 @@ def calculate_total_fees(symbols: list):
             return
 
         total_fees = {}  # 使用字典来分别统计不同币种的手续费
+        columns_by_symbol = {}  # 用于盈亏分析的成交列数据
+
+        cache = TradeHistoryCache(get_trade_history_config().CACHE_DIR, exchange_id)
+
+        print(f"正在同步 {len(symbols)} 个交易对的成交记录缓存...")
+        start_time = time.time()
+        errors = await sync_trade_cache(exchange, cache, symbols, since_timestamp)
+        print(f"成交记录同步完成，耗时 {time.time() - start_time:.1f} 秒")
 
         for i, symbol in enumerate(symbols):
-            try:
-                print(f"[{i+1}/{len(symbols)}] 正在获取交易对 {symbol} 的成交记录...")
-                # 使用分页获取所有交易记录
-                trades = fetch_all_trades(exchange, symbol, since_timestamp)
-
-                if trades:
-                    print(f"  -> 在 {symbol} 发现 {len(trades)} 条成交记录，正在处理...")
-                    for trade in trades:
-                        if 'fee' in trade and trade['fee'] is not None and trade['fee'].get('cost') is not None and trade['fee'].get('currency'):
-                            fee_cost = trade['fee']['cost']
-                            fee_currency = trade['fee']['currency']
-                            total_fees[fee_currency] = total_fees.get(fee_currency, 0) + fee_cost
+            if symbol in errors:
+                e = errors[symbol]
+                if isinstance(e, ccxt.NetworkError):
+                    print(f"查询 {symbol} 时发生网络错误: {e}，跳过此交易对。")
+                elif isinstance(e, ccxt.ExchangeError):
+                    print(f"查询 {symbol} 时交易所返回错误: {e}，跳过此交易对。")
                 else:
-                    print(f"  -> 在 {symbol} 没有找到符合条件的成交记录")
+                    print(f"查询 {symbol} 时发生未知错误: {e}，跳过此交易对。")
+                continue
 
-            except ccxt.NetworkError as e:
-                print(f"查询 {symbol} 时发生网络错误: {e}，跳过此交易对。")
-            except ccxt.ExchangeError as e:
-                print(f"查询 {symbol} 时交易所返回错误: {e}，跳过此交易对。")
-            except Exception as e:
-                print(f"查询 {symbol} 时发生未知错误: {e}，跳过此交易对。")
+            # 从本地缓存按时间范围读取手续费列
+            columns = cache.load(symbol, since=since_timestamp)
+            count = len(columns['timestamp'])
+            if count:
+                print(f"[{i+1}/{len(symbols)}] 在 {symbol} 发现 {count} 条成交记录，正在处理...")
+                fee_costs = columns['fee_cost']
+                fee_currencies = columns['fee_currency']
+                for currency in np.unique(fee_currencies):
+                    if currency:
+                        total_fees[str(currency)] = total_fees.get(str(currency), 0) + \
+                            float(fee_costs[fee_currencies == currency].sum())
+                columns_by_symbol[symbol] = columns
+            else:
+                print(f"[{i+1}/{len(symbols)}] 在 {symbol} 没有找到符合条件的成交记录")
 
         # --- 5. 显示结果 ---
         
@@ -175,12 +310,17 @@ def calculate_total_fees(symbols: list):
                 print(f"  - {amount:.8f} {currency}")
         print("="*40)
 
+        if columns_by_symbol:
+            print_pnl_summary(columns_by_symbol)
+
     except Exception as e:
         print(f"\n程序运行出错: {e}")
         print("请检查：")
         print("1. API 密钥是否有误或权限不足（需要有读取交易历史的权限）。")
         print("2. 网络连接是否正常。")
         print("3. 如果你的 Bitget API 密钥设置了密码，请确保在 .env 文件中添加了 EXCHANGE_API_PASSPHRASE。")
+    finally:
+        await exchange.close()
 
 # 运行主函数
 if __name__ == "__main__":
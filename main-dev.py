@@ -100,8 +100,7 @@ async def test_order_fill_detection():
         
         # 停止订单监听
         if wm.inWatchOpenOrder:
-            wm.inWatchOpenOrder = False
-            wm.openOrders = []
+            wm.stopOrderWatch()
             logger.info("已停止订单监听")
         
         # 设置较短的超时时间进行测试
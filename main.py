@@ -9,8 +9,12 @@ from dotenv import load_dotenv
 import signal
 import sys
 import json
-from core.chartManager import chart_manager
+from config.config import get_trade_config
 from core.dataRecorder import data_recorder
+from core.bootstrap import BootstrapContext
+from core.orderSweeper import get_order_sweeper
+from core.riskGate import get_risk_gate
+from util.marketCache import get_market_cache
 
 load_dotenv()
 # 读取沙盒环境配置
@@ -77,7 +81,7 @@ def load_symbols_config():
         os._exit(1)
 
 
-async def runWebsocketTask(symbol_config: dict):
+async def runWebsocketTask(symbol_config: dict, bootstrap: BootstrapContext):
     """为单个交易对运行websocket任务"""
     global symbol_tasks, symbol_managers
 
@@ -97,12 +101,9 @@ async def runWebsocketTask(symbol_config: dict):
             'sandbox': is_sandbox
         })
         logger.info(f"开始初始化交易对 {symbolName}")
-        await exchangeBitget.set_position_mode(True, symbolName, {'productType': 'USDT-FUTURES'})
-        logger.info(f"交易对 {symbolName} 持仓模式设置为双向")
-        await exchangeBitget.set_leverage(level, symbolName, {'productType': 'USDT-FUTURES'})
-        logger.info(f"交易对 {symbolName} 杠杆设置为 {level}")
 
         # 使用配置参数创建交易管理器
+        trade_config = get_trade_config()
         tm = core.tradeManager.TradeManager(
             symbolName,
             exchangeBitget,
@@ -113,9 +114,25 @@ async def runWebsocketTask(symbol_config: dict):
             maxStockRadio=symbol_config.get('maxStockRadio', 0.25),
             orderAmountRatio=symbol_config.get('orderAmountRatio', 0.05),
             coin=symbol_config.get('coin', 'USDT'),
-            direction=symbol_config.get('direction', 'both')
+            direction=symbol_config.get('direction', 'both'),
+            ladderLevels=symbol_config.get('ladderLevels', trade_config.DEFAULT_LADDER_LEVELS),
+            ladderSpacing=symbol_config.get('ladderSpacing', trade_config.DEFAULT_LADDER_SPACING),
+            ladderSizeMultiplier=symbol_config.get('ladderSizeMultiplier', trade_config.DEFAULT_LADDER_SIZE_MULTIPLIER),
+            ladderTolerance=symbol_config.get('ladderTolerance', trade_config.DEFAULT_LADDER_TOLERANCE)
         )
-        await tm.initSymbolInfo()
+
+        async def prepareAccount():
+            # 持仓模式是账户级设置，所有交易对共享一次请求；杠杆依赖持仓模式
+            await bootstrap.timed(symbolName, '持仓模式', bootstrap.ensure_position_mode(exchangeBitget, symbolName))
+            logger.info(f"交易对 {symbolName} 持仓模式设置为双向")
+            await bootstrap.timed(symbolName, '杠杆', exchangeBitget.set_leverage(level, symbolName, {'productType': 'USDT-FUTURES'}))
+            logger.info(f"交易对 {symbolName} 杠杆设置为 {level}")
+
+        # ccxt的所有请求都依赖市场信息，先从共享缓存加载，热启动时无需下载
+        await bootstrap.timed(symbolName, '市场信息', get_market_cache().load_markets(exchangeBitget))
+
+        # 账户设置和状态初始化互不依赖，并发执行
+        await asyncio.gather(prepareAccount(), tm.initSymbolInfo(bootstrap))
         wm = core.websocketManager.WebSocketManager(
             symbolName, exchangeBitget, tm)
 
@@ -126,20 +143,6 @@ async def runWebsocketTask(symbol_config: dict):
             'exchange': exchangeBitget
         }
 
-        # 创建定期检查任务
-        async def periodic_check():
-            """定期检查交易状态并自动恢复"""
-            while True:
-                try:
-                    await asyncio.sleep(10)  # 每10秒检查一次
-                    await tm.checkAndRecoverTrading()
-                except asyncio.CancelledError:
-                    logger.info(f"{symbolName}定期检查任务被取消")
-                    break
-                except Exception as e:
-                    logger.error(f"{symbolName}定期检查任务发生错误: {e}")
-                    await asyncio.sleep(5)  # 出错后等待5秒再继续
-
         # 创建该交易对的任务组
         symbol_task_list = [
             asyncio.create_task(wm.watchTicker()),
@@ -147,15 +150,24 @@ async def runWebsocketTask(symbol_config: dict):
             asyncio.create_task(wm.watchMyPosition()),
             asyncio.create_task(wm.watchMyOrder()),
             asyncio.create_task(wm.watchOpenOrder()),
-            asyncio.create_task(periodic_check()),  # 添加定期检查任务
         ]
         
+        # 启动数据流看门狗任务
+        watchdog_task = tm.startStreamWatchdog()
+        if watchdog_task:
+            symbol_task_list.append(watchdog_task)
+
         # 启动波动率监控任务
         volatility_task = await tm.startVolatilityMonitoring()
         if volatility_task:
             symbol_task_list.append(volatility_task)
             logger.info(f"交易对 {symbolName} 波动率监控任务已添加")
 
+        # GLFT模式下启动成交强度校准任务
+        calibration_task = await tm.startIntensityCalibration()
+        if calibration_task:
+            symbol_task_list.append(calibration_task)
+
         # 存储任务引用
         symbol_tasks[symbolName] = symbol_task_list
 
@@ -163,10 +175,13 @@ async def runWebsocketTask(symbol_config: dict):
         await tm.bindWebsocketManager(wm)
         logger.info(f"交易对 {symbolName} 开始执行初始交易")
         try:
-            await tm.runTrade()
+            await bootstrap.timed(symbolName, '首次挂单', tm.runTrade())
             logger.info(f"交易对 {symbolName} 初始交易执行完成")
         except Exception as e:
             logger.error(f"交易对 {symbolName} 初始交易执行失败: {e}")
+        bootstrap.mark_ready(symbolName)
+        # 交易状态的定期检查由账户级挂单巡检统一执行
+        get_order_sweeper().register(tm)
 
         logger.info(f"交易对 {symbolName} 初始化完成，开始运行")
 
@@ -195,6 +210,8 @@ async def runWebsocketTask(symbol_config: dict):
         logger.info(f"交易对 {symbolName} 任务被取消")
     except Exception as e:
         logger.error(f"交易对 {symbolName} 运行时错误: {e}")
+        if symbolName not in bootstrap.ready_times:
+            bootstrap.mark_failed(symbolName)
     finally:
         # 清理该交易对的资源
         await cleanup_symbol_resources(symbolName)
@@ -204,6 +221,9 @@ async def cleanup_symbol_resources(symbolName: str):
     """清理单个交易对的资源"""
     global symbol_managers, symbol_tasks
 
+    get_order_sweeper().unregister(symbolName)
+    get_risk_gate().unregister(symbolName)
+
     # 清理交易所连接
     if symbolName in symbol_managers:
         # 停止波动率监控
@@ -211,6 +231,8 @@ async def cleanup_symbol_resources(symbolName: str):
         if trade_manager:
             try:
                 trade_manager.stopVolatilityMonitoring()
+                trade_manager.stopIntensityCalibration()
+                trade_manager.stopStreamWatchdog()
                 logger.info(f"交易对 {symbolName} 的波动率监控已停止")
             except Exception as e:
                 logger.error(f"停止交易对 {symbolName} 的波动率监控时出错: {e}")
@@ -238,7 +260,8 @@ async def cleanup_resources():
     # 停止图表管理器并生成最终报告（如果启用了图表功能）
     try:
         if enable_charts:
-            chart_manager.stop_charts()  # 这会生成最终图表
+            from core.chartManager import chart_manager
+            await chart_manager.stop_charts()  # 这会生成最终图表
             logger.info("图表管理器已停止，最终报告已生成")
         data_recorder.stop()
         logger.info("数据记录器已停止")
@@ -264,13 +287,19 @@ async def runMultipleSymbols(symbol_configs: list):
     """运行多个交易对"""
     global shutdown_event
 
+    # 各交易对并发启动，账户级请求通过bootstrap共享
+    bootstrap = BootstrapContext(len(symbol_configs))
+
     # 为每个交易对创建任务
     symbol_main_tasks = []
     for symbol_config in symbol_configs:
-        task = asyncio.create_task(runWebsocketTask(symbol_config))
+        task = asyncio.create_task(runWebsocketTask(symbol_config, bootstrap))
         symbol_main_tasks.append(task)
         logger.info(f"已创建交易对 {symbol_config['symbol']} 的主任务")
 
+    # 所有交易对共用一个账户级挂单巡检任务
+    sweeper_task = asyncio.create_task(get_order_sweeper().run())
+
     try:
         # 等待所有任务完成或关闭事件
         done, pending = await asyncio.wait(
@@ -301,6 +330,8 @@ async def runMultipleSymbols(symbol_configs: list):
         for task in symbol_main_tasks:
             if not task.done():
                 task.cancel()
+    finally:
+        sweeper_task.cancel()
 
 
 async def main_async():
@@ -312,6 +343,8 @@ async def main_async():
         # 根据配置决定是否启动图表管理器
         if enable_charts:
             logger.info("启动图表管理器...")
+            # 图表依赖matplotlib，只在启用时导入
+            from core.chartManager import chart_manager
             chart_manager.start_charts()
         else:
             logger.info("图表功能已禁用，跳过图表启动")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+导入耗时预算报告
+用`python -X importtime`在子进程中导入指定模块，统计每个模块和每个顶层包的导入耗时，
+并与配置中的启动导入预算比较。
+
+用法:
+    python -m util.import_budget [模块名，默认main] [--top N] [--budget-ms 毫秒]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from config.config import get_system_config
+
+_LINE_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$')
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int, int]]:
+    """
+    在子进程中导入模块并解析-X importtime的输出
+
+    Returns:
+        (模块名, 自身耗时us, 累计耗时us, 嵌套深度) 列表，按导入完成顺序排列
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=root, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"导入{module}失败:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def summarize_packages(rows: List[Tuple[str, int, int, int]]) -> Dict[str, int]:
+    """按顶层包汇总自身耗时（微秒）"""
+    totals = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        totals[name.split('.')[0]] += self_us
+    return dict(totals)
+
+
+def print_report(module: str, top: int, budget_ms: float) -> bool:
+    """打印报告，返回是否在预算之内"""
+    rows = measure_imports(module)
+    total_ms = next((cumulative for name, _, cumulative, _ in rows if name == module), 0) / 1000
+
+    print("\n" + "=" * 60)
+    print(f"📦 {module} 导入耗时报告")
+    print("=" * 60)
+    print(f"总耗时: {total_ms:.1f}ms，预算: {budget_ms:.0f}ms")
+
+    print(f"\n累计耗时最高的{top}个模块:")
+    for name, _, cumulative, _ in sorted(rows, key=lambda r: r[2], reverse=True)[:top]:
+        print(f"  {cumulative / 1000:9.1f}ms  {name}")
+
+    print("\n按顶层包汇总的自身耗时:")
+    packages = sorted(summarize_packages(rows).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:top]:
+        print(f"  {self_us / 1000:9.1f}ms  {package}")
+
+    within_budget = total_ms <= budget_ms
+    print("\n" + ("✅ 在预算之内" if within_budget else "⚠️ 超出预算"))
+    print("=" * 60)
+    return within_budget
+
+
+def main():
+    parser = argparse.ArgumentParser(description='导入耗时预算报告')
+    parser.add_argument('module', nargs='?', default='main', help='要测量的模块')
+    parser.add_argument('--top', type=int, default=15, help='显示的条目数量')
+    parser.add_argument('--budget-ms', type=float, default=get_system_config().IMPORT_BUDGET_MS,
+                        help='导入耗时预算（毫秒）')
+    args = parser.parse_args()
+    sys.exit(0 if print_report(args.module, args.top, args.budget_ms) else 1)
+
+
+if __name__ == "__main__":
+    main()
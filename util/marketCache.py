@@ -0,0 +1,150 @@
+import asyncio
+import json
+import os
+import time
+import weakref
+from typing import Dict, Optional
+
+import ccxt
+
+from config.config import get_market_cache_config
+from util.sLogger import logger
+
+
+class MarketCache:
+    """
+    交易所市场信息缓存
+
+    进程内所有交易所实例共享同一份解析好的市场表，并持久化到磁盘供下次启动使用。
+    缓存文件记录格式版本和ccxt版本，任一不一致时视为无效；超过TTL的缓存仍然直接使用，
+    同时在后台重新下载市场信息，完成后更新磁盘缓存和已注册的交易所实例。
+    """
+
+    VERSION = 1
+
+    def __init__(self, cache_dir: str, ttl: float):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        # 缓存键(交易所id + 是否模拟盘) -> {'markets', 'currencies', 'saved_at'}
+        self._tables: Dict[str, dict] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        # 已注册的交易所实例，后台刷新完成后同步新的市场表
+        self._exchanges: Dict[str, weakref.WeakSet] = {}
+
+    @staticmethod
+    def _cache_key(exchange) -> str:
+        # main.py通过构造参数'sandbox'选择模拟盘，set_sandbox_mode则设置isSandboxModeEnabled
+        sandbox = bool(getattr(exchange, 'isSandboxModeEnabled', False) or getattr(exchange, 'sandbox', False))
+        return f"{exchange.id}_{'sandbox' if sandbox else 'live'}"
+
+    def _cache_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        path = self._cache_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"读取市场信息缓存失败，将重新下载: {e}")
+            return None
+        if data.get('version') != self.VERSION or data.get('ccxt_version') != ccxt.__version__:
+            logger.info(f"市场信息缓存版本不一致(缓存ccxt {data.get('ccxt_version')}，当前 {ccxt.__version__})，将重新下载")
+            return None
+        return data
+
+    def _write_disk(self, key: str, table: dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(key)
+        tmp_path = path + '.tmp'
+        data = dict(table, version=self.VERSION, ccxt_version=ccxt.__version__)
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"写入市场信息缓存失败: {e}")
+
+    def _is_stale(self, table: dict) -> bool:
+        return time.time() - table['saved_at'] > self.ttl
+
+    async def load_markets(self, exchange) -> dict:
+        """
+        为交易所实例加载市场信息，用来替代exchange.loadMarkets()
+
+        Returns:
+            与loadMarkets相同的市场字典
+        """
+        key = self._cache_key(exchange)
+        self._exchanges.setdefault(key, weakref.WeakSet()).add(exchange)
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        downloaded = False
+        async with lock:
+            table = self._tables.get(key)
+            if table is None:
+                table = self._read_disk(key)
+                if table is not None:
+                    logger.info(f"从磁盘缓存加载市场信息，共{len(table['markets'])}个市场")
+            if table is None:
+                # 冷启动：只有第一个实例下载，其余实例等待锁后直接使用结果
+                start = time.monotonic()
+                await exchange.load_markets(True)
+                downloaded = True
+                table = self._table_from(exchange)
+                self._write_disk(key, table)
+                logger.info(f"下载市场信息完成，共{len(table['markets'])}个市场，耗时{time.monotonic() - start:.2f}秒")
+            self._tables[key] = table
+
+        if not downloaded:
+            exchange.set_markets(table['markets'], table['currencies'])
+        if self._is_stale(table):
+            self._schedule_refresh(key, exchange)
+        return exchange.markets
+
+    @staticmethod
+    def _table_from(exchange) -> dict:
+        return {
+            'markets': exchange.markets,
+            'currencies': exchange.currencies,
+            'saved_at': time.time(),
+        }
+
+    def _schedule_refresh(self, key: str, exchange):
+        task = self._refresh_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self._refresh_tasks[key] = asyncio.create_task(self._refresh(key, exchange))
+
+    async def _refresh(self, key: str, exchange):
+        """后台重新下载市场信息，并同步到所有已注册的交易所实例"""
+        try:
+            logger.info("市场信息缓存已过期，后台刷新中")
+            await exchange.load_markets(True)
+            table = self._table_from(exchange)
+            self._tables[key] = table
+            self._write_disk(key, table)
+            for other in list(self._exchanges.get(key, ())):
+                if other is not exchange:
+                    other.set_markets(table['markets'], table['currencies'])
+            logger.info(f"市场信息后台刷新完成，共{len(table['markets'])}个市场")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 刷新失败不影响使用旧缓存
+            logger.warning(f"市场信息后台刷新失败，继续使用旧缓存: {e}")
+
+
+_market_cache = None
+
+
+def get_market_cache() -> MarketCache:
+    """获取进程内共享的市场信息缓存"""
+    global _market_cache
+    if _market_cache is None:
+        config = get_market_cache_config()
+        _market_cache = MarketCache(config.CACHE_DIR, config.TTL)
+    return _market_cache
@@ -26,6 +26,7 @@ class PerformanceMonitor:
         self.order_latencies = deque(maxlen=max_samples)  # 订单延迟
         self.network_latencies = deque(maxlen=max_samples)  # 网络延迟
         self.processing_times = deque(maxlen=max_samples)  # 处理时间
+        self.stage_times: Dict[str, deque] = {}  # 分阶段处理时间（阶段名 -> 耗时）
         
         # 计数器
         self.total_orders = 0
@@ -80,6 +81,19 @@ class PerformanceMonitor:
         """
         self.processing_times.append(processing_ms)
         
+    def record_stage_time(self, stage: str, elapsed_ms: float):
+        """
+        记录某个处理阶段的耗时
+        
+        Args:
+            stage: 阶段名称
+            elapsed_ms: 耗时（毫秒）
+        """
+        samples = self.stage_times.get(stage)
+        if samples is None:
+            samples = self.stage_times[stage] = deque(maxlen=self.max_samples)
+        samples.append(elapsed_ms)
+        
     def get_latency_stats(self, data: deque) -> Dict:
         """
         计算延迟统计信息
@@ -144,7 +158,8 @@ class PerformanceMonitor:
             'throughput_per_minute': throughput,
             'order_latency': order_stats,
             'network_latency': network_stats,
-            'processing_time': processing_stats
+            'processing_time': processing_stats,
+            'stage_times': {stage: self.get_latency_stats(samples) for stage, samples in self.stage_times.items()}
         }
         
     def print_performance_report(self):
@@ -191,6 +206,12 @@ class PerformanceMonitor:
             logger.info(f"  平均时间: {processing_stats['avg']:.2f}ms")
             logger.info(f"  P95时间: {processing_stats['p95']:.2f}ms")
             
+        # 分阶段耗时统计
+        if report['stage_times']:
+            logger.info("\n分阶段耗时统计:")
+            for stage, stats in report['stage_times'].items():
+                logger.info(f"  {stage}: 样本数 {stats['count']}, 平均 {stats['avg']:.3f}ms, P95 {stats['p95']:.3f}ms")
+            
         logger.info("="*60)
         
     def should_report(self, interval_seconds: float = 300) -> bool:
@@ -238,6 +259,7 @@ class PerformanceMonitor:
         self.order_latencies.clear()
         self.network_latencies.clear()
         self.processing_times.clear()
+        self.stage_times.clear()
         
         self.total_orders = 0
         self.successful_orders = 0
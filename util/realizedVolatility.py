@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+逐笔已实现波动率估计器
+由中间价序列增量更新，每次更新O(1)，输出每秒相对波动率（对数收益率标准差）。
+
+- EwmaVolatility: 中间价对数收益率方差的指数加权平均（按时间衰减）
+- RangeVolatility: 把中间价聚合为固定时长的微型K线，在滚动窗口上计算
+  Parkinson（最高/最低价）或Garman-Klass（开高低收）方差估计
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+# Parkinson估计量的归一化系数 1/(4 ln2)
+_PARKINSON_FACTOR = 1.0 / (4.0 * math.log(2.0))
+# Garman-Klass估计量中收盘-开盘项的系数 2ln2 - 1
+_GK_CLOSE_FACTOR = 2.0 * math.log(2.0) - 1.0
+
+
+class EwmaVolatility:
+    """
+    中间价对数收益率的EWMA方差
+
+    间隔不均匀的更新按r²/dt换算为每秒方差，再以exp(-dt/τ)的权重衰减旧值。
+    """
+
+    def __init__(self, half_life: float):
+        self.tau = half_life / math.log(2.0)
+        self.variance = 0.0
+        self.last_price: Optional[float] = None
+        self.last_time: Optional[float] = None
+        self.count = 0
+
+    def update(self, price: float, now: float):
+        if price <= 0:
+            return
+        if self.last_price is not None and now > self.last_time:
+            dt = now - self.last_time
+            r = math.log(price / self.last_price)
+            alpha = 1.0 - math.exp(-dt / self.tau)
+            self.variance += alpha * (r * r / dt - self.variance)
+            self.count += 1
+        self.last_price = price
+        self.last_time = now
+
+    def sigma(self) -> float:
+        """每秒波动率"""
+        return math.sqrt(self.variance) if self.variance > 0 else 0.0
+
+
+class RangeVolatility:
+    """
+    基于微型K线的滚动窗口区间波动率
+
+    method为'parkinson'或'garman_klass'。每根K线收盘时计算一项方差贡献，
+    以定长deque和累加和维护窗口均值；没有报价的空档按零波幅K线计入。
+    """
+
+    def __init__(self, method: str, bar_seconds: float, window: int):
+        if method not in ('parkinson', 'garman_klass'):
+            raise ValueError(f"未知的区间波动率估计方法: {method}")
+        self.method = method
+        self.bar_seconds = bar_seconds
+        self.window = window
+        self.terms = deque(maxlen=window)
+        self.total = 0.0
+        self.bar_start: Optional[float] = None
+        self.open = self.high = self.low = self.close = 0.0
+
+    def _push(self, term: float):
+        if len(self.terms) == self.window:
+            self.total -= self.terms[0]
+        self.terms.append(term)
+        self.total += term
+
+    def _close_bar(self):
+        hl = math.log(self.high / self.low)
+        if self.method == 'parkinson':
+            term = _PARKINSON_FACTOR * hl * hl
+        else:
+            co = math.log(self.close / self.open)
+            term = max(0.5 * hl * hl - _GK_CLOSE_FACTOR * co * co, 0.0)
+        self._push(term)
+
+    def update(self, price: float, now: float):
+        if price <= 0:
+            return
+        if self.bar_start is None:
+            self.bar_start = now
+            self.open = self.high = self.low = self.close = price
+            return
+        elapsed = int((now - self.bar_start) // self.bar_seconds)
+        if elapsed > 0:
+            self._close_bar()
+            # 中间没有报价的K线波幅为零，最多补满一个窗口
+            for _ in range(min(elapsed - 1, self.window)):
+                self._push(0.0)
+            self.bar_start += elapsed * self.bar_seconds
+            self.open = self.high = self.low = self.close
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        self.close = price
+
+    @property
+    def count(self) -> int:
+        return len(self.terms)
+
+    def sigma(self) -> float:
+        """每秒波动率"""
+        if not self.terms or self.total <= 0:
+            return 0.0
+        return math.sqrt(self.total / len(self.terms) / self.bar_seconds)
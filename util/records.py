@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+订单和持仓的紧凑记录
+ccxt返回的订单、持仓字典带有交易所原始字符串组成的info，每次使用都要重新解析。
+在数据进入系统时（websocket推送、REST查询、下单回报）一次性转换为__slots__记录：
+数值字段转换为float，交易对名称驻留（sys.intern），只有日志级别为DEBUG时才保留原始字典。
+"""
+
+import logging
+import sys
+from typing import Iterable, List, Optional
+
+from util.sLogger import logger
+
+
+def _float(value) -> float:
+    if value is None:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _keep_raw() -> bool:
+    return logger.isEnabledFor(logging.DEBUG)
+
+
+def _symbol(value) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class OrderRecord:
+    """订单记录"""
+
+    __slots__ = ('id', 'symbol', 'side', 'status', 'price', 'amount', 'filled', 'average', 'cost',
+                 'fee', 'reduceOnly', 'timestamp', 'raw')
+
+    def __init__(self, id: str, symbol: Optional[str] = None, side: Optional[str] = None,
+                 status: Optional[str] = None, price: float = 0.0, amount: float = 0.0, filled: float = 0.0,
+                 average: float = 0.0, cost: float = 0.0, fee: float = 0.0, reduceOnly: bool = False,
+                 timestamp: Optional[int] = None, raw: Optional[dict] = None):
+        self.id = id
+        self.symbol = _symbol(symbol)
+        self.side = side
+        self.status = status
+        self.price = price
+        self.amount = amount
+        self.filled = filled
+        self.average = average
+        self.cost = cost
+        self.fee = fee
+        self.reduceOnly = reduceOnly
+        self.timestamp = timestamp
+        self.raw = raw
+
+    @classmethod
+    def from_ccxt(cls, order: dict) -> 'OrderRecord':
+        fee = order.get('fee')
+        return cls(
+            id=str(order.get('id')),
+            symbol=order.get('symbol'),
+            side=order.get('side'),
+            status=order.get('status'),
+            price=_float(order.get('price')),
+            amount=_float(order.get('amount')),
+            filled=_float(order.get('filled')),
+            average=_float(order.get('average')),
+            cost=_float(order.get('cost')),
+            fee=_float(fee.get('cost')) if isinstance(fee, dict) else 0.0,
+            reduceOnly=bool(order.get('reduceOnly')),
+            timestamp=order.get('timestamp'),
+            raw=order if _keep_raw() else None,
+        )
+
+    def replace(self, **changes) -> 'OrderRecord':
+        """返回修改了部分字段的副本"""
+        record = OrderRecord.__new__(OrderRecord)
+        for name in self.__slots__:
+            setattr(record, name, changes.get(name, getattr(self, name)))
+        return record
+
+    @property
+    def fill_price(self) -> float:
+        """成交均价，缺失时使用委托价"""
+        return self.average or self.price
+
+    def __repr__(self):
+        return (f"OrderRecord({self.id}, {self.symbol}, {self.side}, {self.status}, "
+                f"{self.amount}@{self.price}, filled={self.filled}, reduceOnly={self.reduceOnly})")
+
+
+class PositionRecord:
+    """持仓记录"""
+
+    __slots__ = ('symbol', 'side', 'contracts', 'marginSize', 'entryPrice', 'unrealizedPnl', 'raw')
+
+    def __init__(self, symbol: Optional[str], side: Optional[str], contracts: float = 0.0,
+                 marginSize: float = 0.0, entryPrice: float = 0.0, unrealizedPnl: float = 0.0,
+                 raw: Optional[dict] = None):
+        self.symbol = _symbol(symbol)
+        self.side = side
+        self.contracts = contracts
+        self.marginSize = marginSize
+        self.entryPrice = entryPrice
+        self.unrealizedPnl = unrealizedPnl
+        self.raw = raw
+
+    @classmethod
+    def from_ccxt(cls, position: dict) -> 'PositionRecord':
+        info = position.get('info') or {}
+        return cls(
+            symbol=position.get('symbol'),
+            side=position.get('side'),
+            contracts=_float(position.get('contracts')),
+            marginSize=_float(info.get('marginSize')),
+            entryPrice=_float(position.get('entryPrice')),
+            unrealizedPnl=_float(position.get('unrealizedPnl')),
+            raw=position if _keep_raw() else None,
+        )
+
+    def __repr__(self):
+        return (f"PositionRecord({self.symbol}, {self.side}, contracts={self.contracts}, "
+                f"marginSize={self.marginSize}, entryPrice={self.entryPrice})")
+
+
+def to_order(order) -> OrderRecord:
+    """转换单个订单，已经是记录时直接返回"""
+    return order if isinstance(order, OrderRecord) else OrderRecord.from_ccxt(order)
+
+
+def to_orders(orders: Iterable) -> List[OrderRecord]:
+    return [to_order(order) for order in orders]
+
+
+def to_positions(positions: Iterable, symbol: Optional[str] = None) -> List[PositionRecord]:
+    """转换持仓列表，指定symbol时只转换该交易对的持仓"""
+    records = []
+    for position in positions:
+        if isinstance(position, PositionRecord):
+            if symbol is None or position.symbol == symbol:
+                records.append(position)
+        elif symbol is None or position.get('symbol') == symbol:
+            records.append(PositionRecord.from_ccxt(position))
+    return records
@@ -4,6 +4,14 @@ from logging.handlers import RotatingFileHandler
 from datetime import datetime
 from config.config import get_log_config
 
+class LazyRotatingFileHandler(RotatingFileHandler):
+    """第一次打开文件时才创建日志目录"""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 class SingletonLogger:
     _instance = None # 用于存储单例实例
     _initialized = False # 标记是否已初始化配置
@@ -42,17 +50,16 @@ class SingletonLogger:
                 console_handler.setFormatter(formatter)
                 self.logger.addHandler(console_handler)
 
-                if not os.path.exists(log_dir):
-                    os.makedirs(log_dir)
-
                 current_date = datetime.now().strftime("%Y-%m-%d-%H-%M-%S")
                 log_file_name = os.path.join(log_dir, f"{name}_{current_date}.log")
 
-                file_handler = RotatingFileHandler(
+                # 日志目录和文件在第一次写入时才创建，导入模块时不做文件操作
+                file_handler = LazyRotatingFileHandler(
                     log_file_name,
                     maxBytes=max_bytes,
                     backupCount=backup_count,
-                    encoding='utf-8'
+                    encoding='utf-8',
+                    delay=True
                 )
                 file_handler.setLevel(file_level)
                 file_handler.setFormatter(formatter)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成交分析引擎
+基于numpy/pandas计算逐笔已实现盈亏、开平仓配对、maker/taker拆分、持仓时间和库存路径统计
+
+输入可以是DataRecorder的TradeRecord列表、ccxt fetch_my_trades的返回值，
+或TradeHistoryCache读取的列数据，统一转换为fills表后计算。
+
+双向持仓模式下多头和空头是两条独立的持仓腿（leg列为'long'/'short'），开平仓配对在每条腿内进行，
+带方向的数量由开平决定（多头开仓为正、平仓为负，空头相反），不使用side；
+无法确定持仓方向的成交（单向持仓、DataRecorder记录）leg为'net'，按买卖方向和净持仓配对。
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from util.tradeCache import trade_leg
+
+# 数量换算为整数单位时的倍数，避免浮点累加误差产生极小的配对片段
+QUANTITY_SCALE = 10 ** 8
+
+FILL_COLUMNS = ['timestamp', 'symbol', 'side', 'amount', 'price', 'fee', 'liquidity', 'order_id', 'leg', 'effect']
+
+
+def fills_from_trade_records(records: Iterable) -> pd.DataFrame:
+    """
+    将DataRecorder.TradeRecord列表转换为fills表（没有持仓方向，按净持仓处理）
+    """
+    rows = [(r.timestamp, r.symbol, r.side, r.amount, r.price, r.fee, 'unknown', r.order_id, '', '') for r in records]
+    return _normalize(pd.DataFrame(rows, columns=FILL_COLUMNS))
+
+
+def fills_from_ccxt_trades(trades: Iterable[dict]) -> pd.DataFrame:
+    """
+    将ccxt fetch_my_trades的返回值转换为fills表（时间戳换算为秒）
+    """
+    rows = []
+    for t in trades:
+        fee = t.get('fee') or {}
+        rows.append((t['timestamp'] / 1000.0, t.get('symbol'), t.get('side'), t.get('amount'), t.get('price'),
+                     fee.get('cost') or 0.0, t.get('takerOrMaker') or 'unknown', t.get('order'),
+                     *trade_leg(t)))
+    return _normalize(pd.DataFrame(rows, columns=FILL_COLUMNS))
+
+
+def fills_from_columns(symbol: str, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """
+    将TradeHistoryCache.load返回的列数据转换为fills表
+    """
+    liquidity = np.where(columns['taker_or_maker'] == '', 'unknown', columns['taker_or_maker'])
+    df = pd.DataFrame({
+        'timestamp': columns['timestamp'] / 1000.0,
+        'symbol': symbol,
+        'side': columns['side'],
+        'amount': columns['amount'],
+        'price': columns['price'],
+        'fee': columns['fee_cost'],
+        'liquidity': liquidity,
+        'order_id': columns['order'],
+        'leg': columns['pos_side'],
+        'effect': columns['trade_side'],
+    })
+    return _normalize(df)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """统一列类型，按交易对和时间排序，并计算带方向的数量"""
+    df = df.astype({'timestamp': 'float64', 'amount': 'float64', 'price': 'float64', 'fee': 'float64'})
+    df['side'] = df['side'].str.lower()
+    df['leg'] = df['leg'].fillna('').replace('', 'net')
+    df['effect'] = df['effect'].fillna('')
+    df = df.sort_values(['symbol', 'timestamp'], kind='stable').reset_index(drop=True)
+    # 净持仓按买卖方向；双向持仓按开平和持仓腿：多头开仓/空头平仓为正，多头平仓/空头开仓为负
+    leg = df['leg'].to_numpy()
+    effect = df['effect'].to_numpy()
+    hedged = (leg != 'net') & ((effect == 'open') | (effect == 'close'))
+    side_sign = np.where(df['side'].to_numpy() == 'buy', 1, -1)
+    leg_sign = np.where(effect == 'open', 1, -1) * np.where(leg == 'short', -1, 1)
+    sign = np.where(hedged, leg_sign, side_sign)
+    df['units'] = sign * np.rint(df['amount'].to_numpy() * QUANTITY_SCALE).astype(np.int64)
+    return df
+
+
+def _fifo_segments(units: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    FIFO配对（向量化）
+
+    在净持仓口径下，FIFO配对等价于"第k个买入单位与第k个卖出单位配对"，
+    因此只需把买卖累计数量的分界点合并排序，就能一次得到所有配对片段。
+    """
+    buy_idx = np.flatnonzero(units > 0)
+    sell_idx = np.flatnonzero(units < 0)
+    if len(buy_idx) == 0 or len(sell_idx) == 0:
+        return {'buy': np.array([], dtype=np.int64), 'sell': np.array([], dtype=np.int64),
+                'units': np.array([], dtype=np.int64)}
+
+    buy_cum = np.cumsum(units[buy_idx])
+    sell_cum = np.cumsum(-units[sell_idx])
+    matched = min(buy_cum[-1], sell_cum[-1])
+
+    bounds = np.union1d(buy_cum, sell_cum)
+    bounds = bounds[bounds <= matched]
+    seg_units = np.diff(np.concatenate(([0], bounds)))
+
+    # 片段终点所在的买入/卖出成交
+    buy_pos = np.searchsorted(buy_cum, bounds, side='left')
+    sell_pos = np.searchsorted(sell_cum, bounds, side='left')
+    return {'buy': buy_idx[buy_pos], 'sell': sell_idx[sell_pos], 'units': seg_units}
+
+
+def _lifo_segments(units: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    LIFO配对
+
+    平仓单位总是与最近一次开仓的单位配对，本质上是一个栈，无法用累计量一次求解，
+    这里对整数化后的数量做一次线性扫描，每笔成交的入栈/出栈均摊为O(1)。
+    """
+    stack: List[List[int]] = []  # [成交下标, 剩余单位数]，同一时刻栈内只有一个方向
+    buys, sells, seg_units = [], [], []
+    for i, qty in enumerate(units.tolist()):
+        remaining = abs(qty)
+        while remaining and stack and (units[stack[-1][0]] > 0) != (qty > 0):
+            top = stack[-1]
+            matched = min(remaining, top[1])
+            if qty > 0:
+                buys.append(i)
+                sells.append(top[0])
+            else:
+                buys.append(top[0])
+                sells.append(i)
+            seg_units.append(matched)
+            remaining -= matched
+            top[1] -= matched
+            if top[1] == 0:
+                stack.pop()
+        if remaining:
+            stack.append([i, remaining])
+    return {'buy': np.array(buys, dtype=np.int64), 'sell': np.array(sells, dtype=np.int64),
+            'units': np.array(seg_units, dtype=np.int64)}
+
+
+def match_round_trips(fills: pd.DataFrame, method: str = 'fifo') -> pd.DataFrame:
+    """
+    开平仓配对
+
+    Args:
+        fills: fills表
+        method: 'fifo' 或 'lifo'
+
+    Returns:
+        每个配对片段一行：open_index/close_index为fills表中的行号，
+        direction为'long'(先买后卖)或'short'(先卖后买)，pnl为毛利润（不含手续费）
+    """
+    if method not in ('fifo', 'lifo'):
+        raise ValueError(f"未知的配对方式: {method}")
+    matcher = _fifo_segments if method == 'fifo' else _lifo_segments
+
+    timestamps = fills['timestamp'].to_numpy()
+    prices = fills['price'].to_numpy()
+    units = fills['units'].to_numpy()
+
+    parts = []
+    # 每个交易对的每条持仓腿单独配对，rows按时间排序
+    for (symbol, leg), rows in fills.groupby(['symbol', 'leg'], sort=False).indices.items():
+        seg = matcher(units[rows])
+        parts.append((symbol, leg, rows[seg['buy']], rows[seg['sell']], seg['units']))
+
+    if not parts:
+        return pd.DataFrame(columns=['symbol', 'open_index', 'close_index', 'direction', 'amount',
+                                     'open_price', 'close_price', 'open_time', 'close_time',
+                                     'holding_time', 'pnl'])
+
+    symbols = np.concatenate([np.full(len(p[4]), p[0], dtype=object) for p in parts])
+    legs = np.concatenate([np.full(len(p[4]), p[1], dtype=object) for p in parts])
+    buy = np.concatenate([p[2] for p in parts])
+    sell = np.concatenate([p[3] for p in parts])
+    seg_units = np.concatenate([p[4] for p in parts])
+
+    # 持仓腿已知时方向由腿决定，净持仓按先后顺序判断
+    by_time = (timestamps[buy] < timestamps[sell]) | ((timestamps[buy] == timestamps[sell]) & (buy < sell))
+    is_long = np.where(legs == 'long', True, np.where(legs == 'short', False, by_time))
+    open_index = np.where(is_long, buy, sell)
+    close_index = np.where(is_long, sell, buy)
+    amount = seg_units / QUANTITY_SCALE
+
+    return pd.DataFrame({
+        'symbol': symbols,
+        'open_index': open_index,
+        'close_index': close_index,
+        'direction': np.where(is_long, 'long', 'short'),
+        'amount': amount,
+        'open_price': prices[open_index],
+        'close_price': prices[close_index],
+        'open_time': timestamps[open_index],
+        'close_time': timestamps[close_index],
+        'holding_time': timestamps[close_index] - timestamps[open_index],
+        'pnl': amount * (prices[sell] - prices[buy]),
+    })
+
+
+def realized_pnl_per_fill(fills: pd.DataFrame, round_trips: pd.DataFrame) -> pd.DataFrame:
+    """
+    逐笔已实现盈亏：配对片段的盈亏记在平仓成交上，手续费记在每笔成交上
+    """
+    gross = np.bincount(round_trips['close_index'].to_numpy(dtype=np.int64),
+                        weights=round_trips['pnl'].to_numpy(), minlength=len(fills))
+    closed = np.bincount(round_trips['close_index'].to_numpy(dtype=np.int64),
+                         weights=round_trips['amount'].to_numpy(), minlength=len(fills))
+    result = fills[['timestamp', 'symbol', 'side', 'amount', 'price', 'fee', 'liquidity']].copy()
+    result['closed_amount'] = closed
+    result['gross_pnl'] = gross
+    result['net_pnl'] = gross - fills['fee'].to_numpy()
+    result['cum_net_pnl'] = result.groupby('symbol', sort=False)['net_pnl'].cumsum()
+    return result
+
+
+def liquidity_split(fills: pd.DataFrame) -> pd.DataFrame:
+    """maker/taker拆分统计"""
+    notional = fills['amount'] * fills['price']
+    return fills.assign(notional=notional).groupby(['symbol', 'liquidity']).agg(
+        fills=('amount', 'size'),
+        volume=('amount', 'sum'),
+        notional=('notional', 'sum'),
+        fee=('fee', 'sum'),
+    ).reset_index()
+
+
+def inventory_path_stats(fills: pd.DataFrame, initial_positions: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """
+    库存路径统计：最大多/空库存、时间加权平均绝对库存、空仓时间占比、穿越零点次数
+
+    双向持仓时多头和空头腿分别累计：最大多/空库存取各自腿的路径，
+    平均绝对库存和空仓时间按两条腿的总持仓（多头 + |空头|）计算，穿越零点按净持仓计算。
+    initial_positions为各交易对的初始净持仓。
+    """
+    initial_positions = initial_positions or {}
+    symbol_col = fills['symbol']
+    leg_cum = fills.groupby(['symbol', 'leg'], sort=False)['units'].cumsum() / QUANTITY_SCALE
+
+    # 每条腿的持仓在本腿成交之间保持不变，按交易对向前填充到每一行
+    def leg_path(leg):
+        return leg_cum.where(fills['leg'] == leg).groupby(symbol_col, sort=False).ffill().fillna(0.0).to_numpy()
+
+    initial = symbol_col.map(lambda s: initial_positions.get(s, 0.0)).to_numpy()
+    long_leg, short_leg, net_leg = leg_path('long'), leg_path('short'), leg_path('net') + initial
+    long_exposure = long_leg + np.clip(net_leg, 0, None)
+    short_exposure = short_leg + np.clip(net_leg, None, 0)
+    positions = long_exposure + short_exposure
+
+    df = pd.DataFrame({'symbol': symbol_col, 'position': positions,
+                       'long_exposure': long_exposure, 'short_exposure': short_exposure})
+    gross = long_exposure - short_exposure
+    # 每个持仓状态持续到同一交易对的下一笔成交
+    next_time = fills.groupby('symbol', sort=False)['timestamp'].shift(-1)
+    df['duration'] = (next_time - fills['timestamp']).fillna(0.0).to_numpy()
+    df['abs_time'] = gross * df['duration']
+    df['flat_time'] = np.where(gross == 0, df['duration'], 0.0)
+    sign = np.sign(df['position'])
+    prev_sign = sign.groupby(df['symbol'], sort=False).shift(1).fillna(0)
+    df['zero_cross'] = (sign * prev_sign < 0).astype(int)
+
+    stats = df.groupby('symbol', sort=False).agg(
+        max_long=('long_exposure', 'max'),
+        max_short=('short_exposure', 'min'),
+        final_position=('position', 'last'),
+        total_time=('duration', 'sum'),
+        abs_time=('abs_time', 'sum'),
+        flat_time=('flat_time', 'sum'),
+        zero_crossings=('zero_cross', 'sum'),
+    )
+    total_time = stats['total_time'].where(stats['total_time'] > 0)
+    stats['mean_abs_inventory'] = stats['abs_time'] / total_time
+    stats['flat_ratio'] = stats['flat_time'] / total_time
+    stats['max_long'] = stats['max_long'].clip(lower=0)
+    stats['max_short'] = stats['max_short'].clip(upper=0)
+    return stats.drop(columns=['abs_time', 'flat_time']).reset_index()
+
+
+def analyze(fills: pd.DataFrame, method: str = 'fifo') -> Dict[str, pd.DataFrame]:
+    """
+    完整分析
+
+    Returns:
+        包含round_trips、fills、liquidity、inventory、summary的字典
+    """
+    round_trips = match_round_trips(fills, method)
+    per_fill = realized_pnl_per_fill(fills, round_trips)
+
+    trips = round_trips.assign(win=round_trips['pnl'] > 0)
+    summary = per_fill.groupby('symbol', sort=False).agg(
+        fills=('amount', 'size'),
+        volume=('amount', 'sum'),
+        gross_pnl=('gross_pnl', 'sum'),
+        fees=('fee', 'sum'),
+        net_pnl=('net_pnl', 'sum'),
+    )
+    trip_stats = trips.groupby('symbol', sort=False).agg(
+        round_trips=('pnl', 'size'),
+        win_rate=('win', 'mean'),
+        avg_holding_time=('holding_time', 'mean'),
+        median_holding_time=('holding_time', 'median'),
+    )
+    summary = summary.join(trip_stats).reset_index()
+
+    return {
+        'fills': per_fill,
+        'round_trips': round_trips,
+        'liquidity': liquidity_split(fills),
+        'inventory': inventory_path_stats(fills),
+        'summary': summary,
+    }
+
+
+if __name__ == "__main__":
+    # 双向持仓模式配对检查：Bitget平多成交的side为buy、tradeSide为close
+    def _fill(ts, side, price, trade_side):
+        return {'timestamp': ts * 1000, 'symbol': 'BTC/USDT:USDT', 'side': side, 'amount': 1.0, 'price': price,
+                'fee': {'cost': 0.0}, 'order': str(ts), 'info': {'tradeSide': trade_side}}
+
+    hedge_fills = fills_from_ccxt_trades([
+        _fill(1, 'buy', 100.0, 'open'),    # 开多
+        _fill(2, 'sell', 105.0, 'open'),   # 开空
+        _fill(3, 'buy', 110.0, 'close'),   # 平多
+        _fill(4, 'sell', 101.0, 'close'),  # 平空
+    ])
+    for method in ('fifo', 'lifo'):
+        result = analyze(hedge_fills, method)
+        trips = result['round_trips'].sort_values('open_time')
+        inventory = result['inventory'].iloc[0]
+        assert trips['direction'].tolist() == ['long', 'short'], trips
+        assert np.allclose(trips['pnl'], [10.0, 4.0]), trips
+        assert inventory['final_position'] == 0.0 and inventory['max_long'] == 1.0 and inventory['max_short'] == -1.0
+        print(f"双向持仓{method.upper()}配对: {trips[['direction', 'open_price', 'close_price', 'pnl']].values.tolist()}")
+
+    # 单向持仓按买卖方向配对
+    net_fills = fills_from_ccxt_trades([
+        _fill(1, 'buy', 100.0, 'buy_single'),
+        _fill(2, 'sell', 110.0, 'sell_single'),
+    ])
+    assert analyze(net_fills)['summary']['gross_pnl'].iloc[0] == 10.0
+    print("单向持仓配对: 通过")
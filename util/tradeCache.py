@@ -0,0 +1,225 @@
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def trade_leg(trade: dict) -> Tuple[str, str]:
+    """
+    成交所属的持仓腿和开平方向
+
+    Bitget双向持仓模式下side表示持仓方向而不是买卖方向：平多的成交side为buy、tradeSide为close，
+    因此持仓腿由side决定（buy为多头，sell为空头），开平由tradeSide决定。
+    原始数据带posSide或tradeSide为reduce_close_long这类带方向的值时，以其中的方向为准。
+    单向持仓模式（tradeSide为buy_single/sell_single）返回两个空字符串，按净持仓处理。
+
+    Returns:
+        (持仓腿 'long'/'short'/'', 开平 'open'/'close'/'')
+    """
+    info = trade.get('info') or {}
+    trade_side = str(info.get('tradeSide') or '').lower()
+    if 'open' in trade_side:
+        effect = 'open'
+    elif 'close' in trade_side:
+        effect = 'close'
+    else:
+        return '', ''
+    pos_side = str(info.get('posSide') or '').lower()
+    if pos_side not in ('long', 'short'):
+        if trade_side.endswith('_long'):
+            pos_side = 'long'
+        elif trade_side.endswith('_short'):
+            pos_side = 'short'
+        else:
+            pos_side = 'long' if (trade.get('side') or '').lower() == 'buy' else 'short'
+    return pos_side, effect
+
+
+class TradeHistoryCache:
+    """
+    本地成交历史缓存
+
+    每个交易对的成交记录按列存放在一个.npz文件中，并按时间戳排序，
+    按时间范围读取时用二分查找定位，无需扫描整个文件。
+    manifest.json记录每个交易对的覆盖范围、最高水位（最后一条成交的时间戳）
+    和已同步到的时间（最近一次成功获取的结束时间），再次运行时只需要获取该时间之后的新成交。
+    """
+
+    VERSION = 3
+    # 列名 -> numpy类型
+    COLUMNS = {
+        'timestamp': np.int64,
+        'id': str,
+        'order': str,
+        'side': str,
+        'price': np.float64,
+        'amount': np.float64,
+        'cost': np.float64,
+        'fee_cost': np.float64,
+        'fee_currency': str,
+        'taker_or_maker': str,
+        'pos_side': str,    # 持仓腿 'long'/'short'，单向持仓为空
+        'trade_side': str,  # 开平 'open'/'close'，单向持仓为空
+    }
+
+    def __init__(self, cache_dir: str, exchange_id: str = 'bitget'):
+        self.cache_dir = os.path.join(cache_dir, exchange_id)
+        self.manifest_path = os.path.join(self.cache_dir, 'manifest.json')
+        self._columns_cache: Dict[str, Dict[str, np.ndarray]] = {}
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                if manifest.get('version') == self.VERSION:
+                    return manifest
+            except (OSError, ValueError):
+                pass
+        # 版本不一致或文件损坏时重建缓存
+        return {'version': self.VERSION, 'symbols': {}}
+
+    def _save_manifest(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _symbol_file(self, symbol: str) -> str:
+        return os.path.join(self.cache_dir, re.sub(r'[^A-Za-z0-9_.-]', '_', symbol) + '.npz')
+
+    def symbol_info(self, symbol: str) -> Optional[dict]:
+        """返回交易对的缓存信息：count、covered_since、high_water_mark、fetched_until"""
+        return self.manifest['symbols'].get(symbol)
+
+    def high_water_mark(self, symbol: str) -> Optional[int]:
+        """返回缓存中最后一条成交的时间戳（毫秒），没有缓存时返回None"""
+        info = self.symbol_info(symbol)
+        return info['high_water_mark'] if info else None
+
+    def fetched_until(self, symbol: str) -> Optional[int]:
+        """返回最近一次成功同步的结束时间戳（毫秒），没有新成交的交易对也会推进"""
+        info = self.symbol_info(symbol)
+        return info.get('fetched_until') if info else None
+
+    def covered_since(self, symbol: str) -> Optional[int]:
+        """返回缓存覆盖范围的起始时间戳（毫秒）"""
+        info = self.symbol_info(symbol)
+        return info['covered_since'] if info else None
+
+    def load(self, symbol: str, since: Optional[int] = None, until: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        按时间范围[since, until]读取缓存的列数据
+        """
+        columns = self._read_columns(symbol)
+        timestamps = columns['timestamp']
+        start = 0 if since is None else int(np.searchsorted(timestamps, since, side='left'))
+        end = len(timestamps) if until is None else int(np.searchsorted(timestamps, until, side='right'))
+        return {name: values[start:end] for name, values in columns.items()}
+
+    def _read_columns(self, symbol: str) -> Dict[str, np.ndarray]:
+        if symbol in self._columns_cache:
+            return self._columns_cache[symbol]
+
+        path = self._symbol_file(symbol)
+        if self.symbol_info(symbol) and os.path.exists(path):
+            with np.load(path, allow_pickle=False) as data:
+                columns = {name: data[name] for name in self.COLUMNS}
+        else:
+            columns = self._empty_columns()
+        self._columns_cache[symbol] = columns
+        return columns
+
+    def _empty_columns(self) -> Dict[str, np.ndarray]:
+        return {name: np.array([], dtype=dtype) for name, dtype in self.COLUMNS.items()}
+
+    def _to_columns(self, trades: List[dict]) -> Dict[str, np.ndarray]:
+        """把ccxt成交记录转换为列数据"""
+        rows = {name: [] for name in self.COLUMNS}
+        for trade in trades:
+            fee = trade.get('fee') or {}
+            rows['timestamp'].append(int(trade['timestamp']))
+            rows['id'].append(str(trade['id']))
+            rows['order'].append(str(trade.get('order') or ''))
+            rows['side'].append(trade.get('side') or '')
+            rows['price'].append(float(trade.get('price') or 0.0))
+            rows['amount'].append(float(trade.get('amount') or 0.0))
+            rows['cost'].append(float(trade.get('cost') or 0.0))
+            rows['fee_cost'].append(float(fee.get('cost') or 0.0))
+            rows['fee_currency'].append(fee.get('currency') or '')
+            rows['taker_or_maker'].append(trade.get('takerOrMaker') or '')
+            pos_side, trade_side = trade_leg(trade)
+            rows['pos_side'].append(pos_side)
+            rows['trade_side'].append(trade_side)
+        return {name: np.array(values, dtype=self.COLUMNS[name]) for name, values in rows.items()}
+
+    def merge(self, symbol: str, trades: List[dict], covered_since: Optional[int] = None,
+              fetched_until: Optional[int] = None) -> int:
+        """
+        合并新获取的成交记录到缓存
+
+        Args:
+            symbol: 交易对
+            trades: ccxt格式的成交记录
+            covered_since: 本次获取的起始时间戳，用于扩展缓存覆盖范围
+            fetched_until: 本次获取的结束时间戳，下次同步从这里开始
+
+        Returns:
+            新增的成交记录数量
+        """
+        existing = self._read_columns(symbol)
+        incoming = self._to_columns(trades)
+
+        # 按成交id去重
+        known_ids = set(existing['id'].tolist())
+        keep = np.array([trade_id not in known_ids for trade_id in incoming['id'].tolist()], dtype=bool)
+        added = int(keep.sum()) if len(keep) else 0
+
+        info = self.symbol_info(symbol) or {'count': 0, 'covered_since': covered_since, 'high_water_mark': None}
+        if covered_since is not None:
+            info['covered_since'] = covered_since if info['covered_since'] is None else min(info['covered_since'], covered_since)
+        if fetched_until is not None:
+            info['fetched_until'] = max(info.get('fetched_until') or fetched_until, fetched_until)
+
+        if added:
+            merged = {name: np.concatenate([existing[name], incoming[name][keep]]) for name in self.COLUMNS}
+            order = np.argsort(merged['timestamp'], kind='stable')
+            merged = {name: values[order] for name, values in merged.items()}
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._symbol_file(symbol)
+            tmp_path = path + '.tmp.npz'
+            np.savez(tmp_path, **merged)
+            os.replace(tmp_path, path)
+            self._columns_cache[symbol] = merged
+
+            info['count'] = len(merged['timestamp'])
+            info['high_water_mark'] = int(merged['timestamp'][-1])
+
+        self.manifest['symbols'][symbol] = info
+        self._save_manifest()
+        return added
+
+    def load_trades(self, symbol: str, since: Optional[int] = None, until: Optional[int] = None) -> List[dict]:
+        """按时间范围读取缓存，并转换回ccxt格式的成交记录"""
+        columns = self.load(symbol, since, until)
+        trades = []
+        for i in range(len(columns['timestamp'])):
+            trades.append({
+                'id': str(columns['id'][i]),
+                'order': str(columns['order'][i]) or None,
+                'symbol': symbol,
+                'timestamp': int(columns['timestamp'][i]),
+                'side': str(columns['side'][i]),
+                'price': float(columns['price'][i]),
+                'amount': float(columns['amount'][i]),
+                'cost': float(columns['cost'][i]),
+                'fee': {'cost': float(columns['fee_cost'][i]), 'currency': str(columns['fee_currency'][i]) or None},
+                'takerOrMaker': str(columns['taker_or_maker'][i]) or None,
+                'info': {'posSide': str(columns['pos_side'][i]), 'tradeSide': str(columns['trade_side'][i])},
+            })
+        return trades
@@ -1,18 +1,20 @@
 from util.sLogger import logger
+from util.records import to_order
 import asyncio
 
+# 筛选交易对的未成交订单（REST查询结果），转换为订单记录
 async def openOrderFilter(orders,symbolName):
     target = []
     for order in orders:
         if order['symbol'] == symbolName and order['status'] == 'open':
-            target.append(order)
+            target.append(to_order(order))
             # logger.info(f"找到{symbolName}未成交订单: {order['id']}")
     return target
 
 #根据id查找订单
 async def findOrderById(orders,orderId):
     for order in orders:
-        if order['id'] == orderId:
+        if order.id == orderId:
             return order
     return None
 
@@ -22,8 +24,8 @@ async def positionMarginSize(position,symbolName):
     marginSize = 0.0
     for pos in position:
       # logger.info(pos)
-      if pos['symbol'] == symbolName:
-          marginSize += float(pos['info']['marginSize'])
+      if pos.symbol == symbolName:
+          marginSize += pos.marginSize
     return marginSize
 
 # 获取指定交易对的所有仓位（支持双向持仓）
@@ -31,7 +33,7 @@ async def getPositionsBySymbol(positions, symbolName):
     """获取指定交易对的所有仓位"""
     symbol_positions = []
     for pos in positions:
-        if pos['symbol'] == symbolName:
+        if pos.symbol == symbolName:
             symbol_positions.append(pos)
     return symbol_positions
 
@@ -42,11 +44,11 @@ async def calculateNetPosition(positions, symbolName):
     short_size = 0.0
     
     for pos in positions:
-        if pos['symbol'] == symbolName:
-            if pos['side'] == 'long':
-                long_size += float(pos['contracts'])
-            elif pos['side'] == 'short':
-                short_size += float(pos['contracts'])
+        if pos.symbol == symbolName:
+            if pos.side == 'long':
+                long_size += pos.contracts
+            elif pos.side == 'short':
+                short_size += pos.contracts
     
     # 净持仓 = 做多数量 - 做空数量
     net_position = long_size - short_size
@@ -56,7 +58,7 @@ async def calculateNetPosition(positions, symbolName):
 async def getPositionBySide(positions, symbolName, side):
     """获取指定交易对和方向的仓位"""
     for pos in positions:
-        if pos['symbol'] == symbolName and pos['side'] == side:
+        if pos.symbol == symbolName and pos.side == side:
             return pos
     return None
 
@@ -67,9 +69,9 @@ async def checkOpenOrder(openOrders):
     buyCount = 0
     sellCount = 0
     for order in openOrders:
-        if order['info']['side'] == 'buy':
+        if order.side == 'buy':
             buyCount += 1
-        elif order['info']['side'] == 'sell':
+        elif order.side == 'sell':
             sellCount += 1
     if buyCount == 1 and sellCount == 1:
         return True